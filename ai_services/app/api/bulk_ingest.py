@@ -0,0 +1,380 @@
+"""
+Bulk ingestion of a directory or manifest of documents.
+
+Chunks from all files share embedding batches, and finished indexes are
+written concurrently, so a backfill avoids per-request model and index
+overhead. A failing file is reported and skipped; the run continues.
+
+Usage (from ai_services/):
+    python -m app.api.bulk_ingest path/to/archive/
+    python -m app.api.bulk_ingest manifest.json --json
+
+A manifest is a JSON list of paths or {"filepath", "documentId"} objects,
+or a text file with one path per line. Relative paths are resolved
+against the manifest's directory.
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from app.api.ingest import (
+    SUPPORTED_EXTENSIONS, iter_pages, publish_index, reuse_index,
+)
+from app.core.chunking import iter_chunks, count_truncated, PAGE_SEPARATOR
+from app.core.embeddings import embed_texts
+from app.core.pipeline import Pipeline
+from app.core.config import config
+from app.core.dedup import strip_furniture, drop_near_duplicates
+from app.persistence.faiss_store import faiss_store, CONTENT_DIR
+from app.persistence.document_registry import document_registry, hash_file
+import logging
+
+logger = logging.getLogger(__name__)
+
+INGESTED = "ingested"
+DEDUPLICATED = "deduplicated"
+FAILED = "failed"
+
+
+class BulkIngestRequest(BaseModel):
+    directory: Optional[str] = None
+    manifest: Optional[str] = None
+    recursive: bool = True
+
+
+class BulkFileResult(BaseModel):
+    filepath: str
+    documentId: str
+    status: str = INGESTED
+    faissIndexPath: str = ""
+    chunks: int = 0
+    pages: int = 0
+    boilerplateLines: int = 0
+    duplicateChunks: int = 0
+    error: Optional[str] = None
+
+
+class BulkIngestResponse(BaseModel):
+    files: list[BulkFileResult]
+    succeeded: int
+    failed: int
+    pages: int
+    chunks: int
+    seconds: float
+    pagesPerSecond: float
+    chunksPerSecond: float
+
+
+def _document_id_for(filepath: str, root: str) -> str:
+    """Default document id: the path relative to the input root, made filesystem-safe."""
+    relative = os.path.splitext(os.path.relpath(filepath, root))[0]
+    return relative.replace(os.sep, "__").replace(" ", "_")
+
+
+def _check_document_id(document_id: str) -> str:
+    """Reject manifest document ids that would escape the index directory."""
+    if not document_id or document_id != os.path.basename(document_id) or document_id.startswith("."):
+        raise ValueError(f"Invalid documentId in manifest: {document_id!r}")
+    return document_id
+
+
+def collect_files(request: BulkIngestRequest) -> list[BulkFileResult]:
+    """Expand a directory or manifest into the files to ingest."""
+    if bool(request.directory) == bool(request.manifest):
+        raise ValueError("Provide exactly one of 'directory' or 'manifest'")
+
+    files = []
+    if request.directory:
+        root = request.directory
+        if not os.path.isdir(root):
+            raise ValueError(f"Not a directory: {root}")
+        for dirpath, dirnames, filenames in os.walk(root):
+            if not request.recursive:
+                dirnames.clear()
+            for name in sorted(filenames):
+                if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                    path = os.path.join(dirpath, name)
+                    files.append(BulkFileResult(filepath=path, documentId=_document_id_for(path, root)))
+        return files
+
+    root = os.path.dirname(os.path.abspath(request.manifest))
+    with open(request.manifest, 'r', encoding='utf-8') as f:
+        if request.manifest.endswith(".json"):
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"filepath": entry}
+        path = entry["filepath"]
+        if not os.path.isabs(path):
+            path = os.path.join(root, path)
+        document_id = entry.get("documentId")
+        files.append(BulkFileResult(
+            filepath=path,
+            documentId=_check_document_id(document_id) if document_id else _document_id_for(path, root),
+        ))
+    return files
+
+
+class _FileState:
+    """Per-file build state while its chunks move through the shared pipeline."""
+
+    def __init__(self, result: BulkFileResult, bytes_hash: str):
+        self.result = result
+        self.bytes_hash = bytes_hash
+        self.writer = faiss_store.open_writer(os.path.join(CONTENT_DIR, bytes_hash))
+        self.text_digest = hashlib.sha256()
+        self.pages = set()
+        self.truncated = 0
+        self.cleanup = {}
+
+
+def run_bulk_ingest(request: BulkIngestRequest) -> BulkIngestResponse:
+    """
+    Ingest every file of a directory or manifest in one shared pipeline.
+
+    Stages (threads with bounded queues):
+        chunk  - extract and chunk files one after another, tagging each
+                 chunk with its file, followed by an end-of-file marker
+        embed  - fill EMBED_BATCH_SIZE batches across file boundaries and
+                 embed them
+        index  - (caller thread) route vectors to per-file index writers;
+                 completed files are written and registered concurrently
+
+    Files already in the document registry, or duplicated within the run,
+    only get a ref to the existing index. Reuse and publishing happen
+    under the registry's per-hash lock, like single-document ingest.
+    """
+    started = time.perf_counter()
+    results = collect_files(request)
+    logger.info(f"Bulk ingest of {len(results)} files")
+
+    states: dict[int, _FileState] = {}
+    duplicates: list[tuple[int, str]] = []  # Deferred until their original is written
+    seen_hashes: set[str] = set()
+    for idx, result in enumerate(results):
+        try:
+            bytes_hash = hash_file(result.filepath)
+        except OSError as e:
+            result.status, result.error = FAILED, str(e)
+            continue
+        content_id = document_registry.find(bytes_hash=bytes_hash)
+        if bytes_hash in seen_hashes or (
+            content_id and os.path.exists(faiss_store.content_index_path(content_id))
+        ):
+            duplicates.append((idx, bytes_hash))
+            continue
+        seen_hashes.add(bytes_hash)
+        states[idx] = _FileState(result, bytes_hash)
+
+    def fail(idx: int, error: str):
+        state = states.pop(idx, None)
+        if state is not None:
+            state.result.status, state.result.error = FAILED, error
+            logger.error(f"Bulk ingest failed for {state.result.filepath}: {error}")
+
+    def chunk_stage():
+        for idx, state in list(states.items()):
+            try:
+                def pages():
+                    for number, text in iter_pages(state.result.filepath, content_hash=state.bytes_hash):
+                        state.pages.add(number)
+                        state.text_digest.update(text.encode('utf-8'))
+                        state.text_digest.update(PAGE_SEPARATOR.encode('utf-8'))
+                        yield number, text
+
+                page_stream = pages()
+                if config.INGEST_DEDUP_ENABLED:
+                    page_stream = strip_furniture(page_stream, state.cleanup)
+                chunks = iter_chunks(page_stream)
+                if config.INGEST_DEDUP_ENABLED:
+                    chunks = drop_near_duplicates(chunks, state.writer.duplicates, state.writer.structure)
+                for chunk in chunks:
+                    yield ("chunk", idx, chunk)
+                yield ("end", idx, None)
+            except Exception as e:
+                yield ("error", idx, str(e))
+
+    def embed_stage(items):
+        batch, finished = [], []
+
+        def flush():
+            texts = [chunk.text for _, chunk in batch]
+            truncated = {}
+            try:
+                vectors = embed_texts(texts) if texts else []
+                for idx in {idx for idx, _ in batch}:
+                    truncated[idx] = count_truncated([chunk.text for i, chunk in batch if i == idx])
+                error = None
+            except Exception as e:
+                vectors, error = None, str(e)
+            return {"batch": list(batch), "vectors": vectors, "truncated": truncated,
+                    "finished": list(finished), "error": error}
+
+        for kind, idx, payload in items:
+            if kind == "chunk":
+                batch.append((idx, payload))
+                if len(batch) >= config.EMBED_BATCH_SIZE:
+                    yield flush()
+                    batch, finished = [], []
+            else:
+                # Markers wait for the batch holding the file's last chunks
+                finished.append((kind, idx, payload))
+        if batch or finished:
+            yield flush()
+
+    pipeline = Pipeline(queue_depth=config.INGEST_QUEUE_DEPTH)
+    pipeline.add_stage("chunk", chunk_stage)
+    pipeline.add_stage("embed", embed_stage)
+
+    writes: dict[int, Future] = {}
+    with ThreadPoolExecutor(max_workers=config.BULK_INGEST_WRITERS, thread_name_prefix="bulk-write") as pool:
+        for item in pipeline.run():
+            if item["error"]:
+                for idx in {idx for idx, _ in item["batch"]}:
+                    fail(idx, f"Embedding failed: {item['error']}")
+            else:
+                by_file: dict[int, list] = {}
+                for (idx, chunk), vector in zip(item["batch"], item["vectors"]):
+                    by_file.setdefault(idx, []).append((chunk, vector))
+                for idx, entries in by_file.items():
+                    state = states.get(idx)
+                    if state is None:
+                        continue
+                    state.writer.add(
+                        [vector for _, vector in entries],
+                        [chunk.text for chunk, _ in entries],
+                        [[c.start, c.end, c.page_start, c.page_end] for c, _ in entries],
+                    )
+                    state.truncated += item["truncated"].get(idx, 0)
+
+            for kind, idx, payload in item["finished"]:
+                if kind == "error":
+                    fail(idx, payload)
+                elif idx in states:
+                    writes[idx] = pool.submit(_write_index, states[idx])
+
+        for idx, future in writes.items():
+            try:
+                future.result()
+            except Exception as e:
+                fail(idx, f"Index write failed: {e}")
+
+    # Duplicates reference the index written above or in an earlier run
+    for idx, bytes_hash in duplicates:
+        result = results[idx]
+        with document_registry.lock(bytes_hash):
+            content_id = document_registry.find(bytes_hash=bytes_hash)
+            if not content_id:
+                result.status, result.error = FAILED, "Original of duplicate failed to ingest"
+                continue
+            response = reuse_index(result.documentId, content_id, bytes_hash, time.perf_counter())
+        result.status = DEDUPLICATED
+        result.faissIndexPath = response.faissIndexPath
+        result.chunks, result.pages = response.chunks, response.pages
+
+    return _summarize(results, time.perf_counter() - started, pipeline.seconds)
+
+
+def _write_index(state: _FileState):
+    """
+    Write one file's index and register it (runs in the writer pool).
+
+    Another ingest of the same bytes may have finished while this file was
+    being embedded; it then holds the registry entry, and this build is
+    dropped in favour of a ref to it.
+    """
+    result = state.result
+    with document_registry.lock(state.bytes_hash):
+        content_id = document_registry.find(bytes_hash=state.bytes_hash)
+        if content_id and os.path.exists(faiss_store.content_index_path(content_id)):
+            response = reuse_index(result.documentId, content_id, state.bytes_hash, time.perf_counter())
+            result.status = DEDUPLICATED
+            result.faissIndexPath = response.faissIndexPath
+            result.chunks, result.pages = response.chunks, response.pages
+        else:
+            state.writer.close()
+            result.chunks = len(state.writer.chunks)
+            result.pages = len(state.pages)
+            result.boilerplateLines = state.cleanup.get("boilerplate_lines", 0)
+            result.duplicateChunks = len(state.writer.duplicates)
+            result.faissIndexPath, _ = publish_index(
+                result.documentId, state.bytes_hash, state.text_digest.hexdigest(),
+                chunks=result.chunks, pages=result.pages, truncated=state.truncated,
+            )
+    state.writer.chunks = []
+    state.writer.index = None
+
+
+def _summarize(results: list[BulkFileResult], seconds: float, stage_seconds: dict) -> BulkIngestResponse:
+    succeeded = [r for r in results if r.status != FAILED]
+    # Deduplicated files cost no extraction or embedding, so only built files count toward throughput
+    built = [r for r in results if r.status == INGESTED]
+    pages = sum(r.pages for r in built)
+    chunks = sum(r.chunks for r in built)
+    seconds = max(seconds, 1e-6)
+
+    response = BulkIngestResponse(
+        files=results,
+        succeeded=len(succeeded),
+        failed=len(results) - len(succeeded),
+        pages=pages,
+        chunks=chunks,
+        seconds=round(seconds, 3),
+        pagesPerSecond=round(pages / seconds, 2),
+        chunksPerSecond=round(chunks / seconds, 2),
+    )
+    logger.info(
+        f"Bulk ingest finished: {response.succeeded} succeeded, {response.failed} failed, "
+        f"{response.pagesPerSecond} pages/s, {response.chunksPerSecond} chunks/s (stages: {stage_seconds})"
+    )
+    return response
+
+
+async def bulk_ingest(request: BulkIngestRequest) -> BulkIngestResponse:
+    """Ingest a directory or manifest of documents."""
+    return await run_in_threadpool(run_bulk_ingest, request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of documents or manifest file")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not descend into subdirectories")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+
+    if os.path.isdir(args.source):
+        request = BulkIngestRequest(directory=args.source, recursive=not args.no_recursive)
+    else:
+        request = BulkIngestRequest(manifest=args.source)
+    report = run_bulk_ingest(request)
+
+    if args.json:
+        print(report.model_dump_json(indent=2))
+        return
+
+    for result in report.files:
+        line = f"{result.status:<13} {result.filepath}"
+        if result.error:
+            line += f"  ({result.error})"
+        print(line)
+    print(
+        f"\n{report.succeeded} succeeded, {report.failed} failed in {report.seconds:.1f}s: "
+        f"{report.pages} pages ({report.pagesPerSecond}/s), {report.chunks} chunks ({report.chunksPerSecond}/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
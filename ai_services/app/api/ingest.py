@@ -1,67 +1,430 @@
 import os
+import time
+import shutil
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional
 from PyPDF2 import PdfReader
 from docx import Document as DocxDocument
-from app.core.chunking import chunk_text
+from app.core.chunking import iter_chunks, count_truncated, PAGE_SEPARATOR
 from app.core.embeddings import embed_texts
-from app.persistence.faiss_store import faiss_store
+from app.core.pipeline import Pipeline
+from app.core.config import config
+from app.core.dedup import strip_furniture, drop_near_duplicates
+from app.persistence.faiss_store import faiss_store, CONTENT_DIR
+from app.persistence.document_registry import document_registry, hash_file
+from app.persistence.text_cache import text_cache
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Extractor used per file type; part of the text cache key
+EXTRACTORS = {".pdf": "pypdf2", ".docx": "docx-paragraphs", ".txt": "utf8"}
+SUPPORTED_EXTENSIONS = tuple(EXTRACTORS)
+
+
 class IngestRequest(BaseModel):
     filepath: str
 
 
+class PageTiming(BaseModel):
+    page: int
+    seconds: float
+    chars: int
+
+
 class IngestResponse(BaseModel):
     faissIndexPath: str
     chunks: int
+    pages: int = 0
+    truncatedChunks: int = 0  # Chunks longer than the embedder's max_seq_length
+    extractSeconds: float = 0.0
+    pageTimings: list[PageTiming] = []
+    stageSeconds: dict[str, float] = {}  # Busy time of each pipeline stage
+    totalSeconds: float = 0.0
+    contentHash: str = ""  # SHA-256 of the document bytes
+    deduplicated: bool = False  # True when an existing index was reused
+    boilerplateLines: int = 0  # Repeated header/footer lines stripped
+    boilerplateChars: int = 0
+    duplicateChunks: int = 0  # Near-duplicate chunks dropped before embedding
+    indexShrinkage: float = 0.0  # Fraction of chunks dropped
+    embedSecondsSaved: float = 0.0  # Estimated from the measured embedding time per chunk
 
 
-def extract_text(filepath: str) -> str:
-    """Extract text from PDF, DOCX, or TXT file."""
-    ext = os.path.splitext(filepath)[1].lower()
+_pdf_pool: ProcessPoolExecutor = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Create the PDF extraction process pool on first use."""
+    global _pdf_pool
+
+    if _pdf_pool is None:
+        logger.info(f"Starting PDF extraction pool with {config.PDF_EXTRACT_WORKERS} workers")
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=config.PDF_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return _pdf_pool
+
+
+def _extract_page_range(filepath: str, start: int, stop: int) -> list[tuple[int, str, float]]:
+    """Extract pages [start, stop) in a worker; returns (page_number, text, seconds) per page."""
+    reader = PdfReader(filepath)
+    pages = []
+    for index in range(start, stop):
+        started = time.perf_counter()
+        text = reader.pages[index].extract_text() or ""
+        pages.append((index + 1, text, time.perf_counter() - started))
+    return pages
+
+
+def _iter_pdf_pages(filepath: str) -> Iterator[tuple[int, str, float]]:
+    """
+    Yield (page_number, text, seconds) for a PDF in page order.
+
+    Large PDFs are split into page ranges extracted in parallel by the
+    process pool; results are merged back in page order as they arrive.
+    """
+    page_count = len(PdfReader(filepath).pages)
+
+    if config.PDF_EXTRACT_WORKERS <= 1 or page_count < config.PDF_PARALLEL_MIN_PAGES:
+        yield from _extract_page_range(filepath, 0, page_count)
+        return
+
+    size = config.PDF_PAGES_PER_TASK
+    pool = _get_pdf_pool()
+    futures = [
+        pool.submit(_extract_page_range, filepath, start, min(start + size, page_count))
+        for start in range(0, page_count, size)
+    ]
+    logger.info(f"Extracting {page_count} pages in {len(futures)} parallel ranges")
+
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
 
+
+def _extract_pages(filepath: str, ext: str, timings: Optional[list]) -> Iterator[tuple[int, str]]:
+    """Parse a file, yielding (page_number, text) as pages are read."""
     if ext == ".pdf":
-        reader = PdfReader(filepath)
-        text = "\n\n".join(page.extract_text() for page in reader.pages)
+        for number, text, seconds in _iter_pdf_pages(filepath):
+            if timings is not None:
+                timings.append(PageTiming(page=number, seconds=round(seconds, 4), chars=len(text)))
+            yield number, text
     elif ext == ".docx":
         doc = DocxDocument(filepath)
-        text = "\n\n".join(para.text for para in doc.paragraphs)
+        for para in doc.paragraphs:
+            yield 1, para.text
     elif ext == ".txt":
         with open(filepath, 'r', encoding='utf-8') as f:
-            text = f.read()
-    else:
+            yield 1, f.read()
+
+
+def iter_pages(
+    filepath: str,
+    timings: Optional[list] = None,
+    content_hash: Optional[str] = None,
+) -> Iterator[tuple[int, str]]:
+    """
+    Yield (page_number, text) from a PDF, DOCX, or TXT file as it is read.
+
+    DOCX files have no pages; their paragraphs are yielded as page 1. TXT
+    files are yielded whole as page 1. Extracted pages are written to the
+    text cache as they are read, and a file whose bytes were extracted
+    before is served from it without parsing.
+
+    Args:
+        filepath: Path to the document
+        timings: Optional list that receives a PageTiming per parsed PDF page
+        content_hash: SHA-256 of the file, if the caller already computed it
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    extractor = EXTRACTORS.get(ext)
+    if extractor is None:
         raise ValueError(f"Unsupported file type: {ext}")
 
-    return text
+    content_hash = content_hash or hash_file(filepath)
+    cached = text_cache.get(content_hash, extractor)
+    if cached:
+        logger.info(f"Text cache hit for {os.path.basename(filepath)} ({len(cached['pages'])} segments)")
+        for number, text in cached["pages"]:
+            yield number, text
+        return
 
+    # Pages are written to the cache as they are read; only complete extractions are kept
+    cache_writer = text_cache.open_writer(content_hash, extractor)
+    extract_seconds = 0.0
+    source = _extract_pages(filepath, ext, timings)
+    try:
+        while True:
+            started = time.perf_counter()
+            item = next(source, None)
+            extract_seconds += time.perf_counter() - started
+            if item is None:
+                break
+            cache_writer.add(*item)
+            yield item
+    except BaseException:
+        cache_writer.abort()
+        raise
 
-async def ingest_document(request: IngestRequest) -> IngestResponse:
+    cache_writer.close(
+        filename=os.path.basename(filepath),
+        extractSeconds=round(extract_seconds, 3),
+    )
+
+
+def count_pages(filepath: str) -> int:
+    """Number of pages iter_pages will report for a file (1 for DOCX and TXT)."""
+    if os.path.splitext(filepath)[1].lower() == ".pdf":
+        return len(PdfReader(filepath).pages)
+    return 1
+
+
+def extract_text(filepath: str) -> str:
+    """Extract text from PDF, DOCX, or TXT file."""
+    return PAGE_SEPARATOR.join(text for _, text in iter_pages(filepath))
+
+
+def run_ingest(
+    filepath: str,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> IngestResponse:
     """
-    Ingest document: extract text, chunk, embed, and create FAISS index.
+    Ingest a document, reusing the index of an identical earlier upload.
+
+    Indexes are content-addressed: each document directory only holds a
+    ref.json pointing at the shared index for its content hash, so a
+    byte-identical upload costs one file hash and no embedding.
+
+    Args:
+        filepath: Path to the uploaded document
+        on_progress: Optional callback receiving {stage, pages, chunks}
+            after every indexed batch and before the index is written
     """
-    filepath = request.filepath
     logger.info(f"Ingesting document: {filepath}")
+    started = time.perf_counter()
+    document_id = os.path.basename(os.path.dirname(filepath))
+    bytes_hash = hash_file(filepath)
 
-    # Extract text
-    text = extract_text(filepath)
-    logger.info(f"Extracted {len(text)} characters")
+    # Concurrent uploads of the same bytes wait here and then reuse the first index
+    with document_registry.lock(bytes_hash):
+        content_id = document_registry.find(bytes_hash=bytes_hash)
+        if content_id and os.path.exists(faiss_store.content_index_path(content_id)):
+            return reuse_index(document_id, content_id, bytes_hash, started)
+        if content_id:
+            document_registry.forget(content_id)
+        return _build_index(filepath, document_id, bytes_hash, on_progress, started)
 
-    # Chunk text
-    chunks = chunk_text(text)
 
-    # Embed chunks
-    embeddings = embed_texts(chunks)
+def reuse_index(document_id: str, content_id: str, bytes_hash: str, started: float) -> IngestResponse:
+    """Point a duplicate document at an existing index."""
+    index_path = faiss_store.write_ref(document_id, content_id, bytes_hash)
+    stats = document_registry.metadata(content_id)
+    logger.info(f"Document {document_id} is a duplicate of {content_id}; reusing its index")
 
-    # Create FAISS index
-    document_id = os.path.basename(os.path.dirname(filepath))
-    index_path = faiss_store.create_index(embeddings, chunks, document_id)
+    return IngestResponse(
+        faissIndexPath=index_path,
+        chunks=stats.get("chunks", 0),
+        pages=stats.get("pages", 0),
+        truncatedChunks=stats.get("truncatedChunks", 0),
+        totalSeconds=round(time.perf_counter() - started, 3),
+        contentHash=bytes_hash,
+        deduplicated=True,
+    )
+
+
+def publish_index(
+    document_id: str,
+    bytes_hash: str,
+    text_hash: str,
+    chunks: int,
+    pages: int,
+    truncated: int,
+) -> tuple[str, str]:
+    """
+    Register a freshly written content index and point the document at it.
+
+    Returns:
+        Tuple of (document index path, content id actually referenced)
+    """
+    content_id = bytes_hash
+
+    # Different bytes, same text (e.g. re-saved PDF): keep only the first index
+    existing = document_registry.find(text_hash=text_hash)
+    if existing and existing != content_id and os.path.exists(faiss_store.content_index_path(existing)):
+        logger.info(f"Document {document_id} has the same text as {existing}; discarding the new index")
+        shutil.rmtree(os.path.dirname(faiss_store.content_index_path(content_id)), ignore_errors=True)
+        content_id = existing
+
+    document_registry.register(
+        content_id, bytes_hash, text_hash,
+        chunks=chunks, pages=pages, truncatedChunks=truncated,
+    )
+    return faiss_store.write_ref(document_id, content_id, bytes_hash), content_id
+
+
+def _build_index(
+    filepath: str,
+    document_id: str,
+    bytes_hash: str,
+    on_progress: Optional[Callable[[dict], None]],
+    started: float,
+) -> IngestResponse:
+    """
+    Extract, chunk, embed, and index a document as a pipeline.
+
+    The four stages run concurrently, connected by bounded queues: pages
+    flow into the chunker, chunk batches into the embedder, and vector
+    batches into the index writer. Parsing overlaps with embedding, so
+    total time approaches that of the slowest stage. The queues bound the
+    pages and in-flight batches held between stages, but the index writer
+    still keeps every chunk, span and vector until close(), so memory
+    grows linearly with the number of chunks (roughly the chunk text plus
+    dimension * 4 bytes per chunk).
+    """
+    content_id = bytes_hash
+    writer = faiss_store.open_writer(os.path.join(CONTENT_DIR, content_id))
+    pages = set()
+    page_timings = []
+    truncated = 0
+    text_digest = hashlib.sha256()
+    cleanup = {}  # Boilerplate stripped by strip_furniture
+
+    def extract_stage():
+        for number, text in iter_pages(filepath, timings=page_timings, content_hash=bytes_hash):
+            pages.add(number)
+            text_digest.update(text.encode('utf-8'))
+            text_digest.update(PAGE_SEPARATOR.encode('utf-8'))
+            yield number, text
+
+    def chunk_stage(page_stream):
+        batch = []
+        if config.INGEST_DEDUP_ENABLED:
+            page_stream = strip_furniture(page_stream, cleanup)
+        chunks = iter_chunks(page_stream)
+        if config.INGEST_DEDUP_ENABLED:
+            chunks = drop_near_duplicates(chunks, writer.duplicates, writer.structure)
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= config.EMBED_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def embed_stage(batches):
+        nonlocal truncated
+        for batch in batches:
+            texts = [chunk.text for chunk in batch]
+            truncated += count_truncated(texts)
+            yield batch, texts, embed_texts(texts)
+
+    pipeline = Pipeline(queue_depth=config.INGEST_QUEUE_DEPTH)
+    pipeline.add_stage("extract", extract_stage)
+    pipeline.add_stage("chunk", chunk_stage)
+    pipeline.add_stage("embed", embed_stage)
+
+    index_seconds = 0.0
+    for batch, texts, embeddings in pipeline.run():
+        batch_started = time.perf_counter()
+        writer.add(
+            embeddings,
+            texts,
+            [[c.start, c.end, c.page_start, c.page_end] for c in batch],
+        )
+        index_seconds += time.perf_counter() - batch_started
+        if on_progress:
+            on_progress({"stage": "indexing", "pages": len(pages), "chunks": len(writer.chunks)})
+
+    if on_progress:
+        on_progress({"stage": "writing", "pages": len(pages), "chunks": len(writer.chunks)})
+    write_started = time.perf_counter()
+    writer.close()
+    index_seconds += time.perf_counter() - write_started
+
+    chunks = len(writer.chunks)
+    if truncated:
+        logger.warning(f"{truncated} of {chunks} chunks exceed the embedder's max sequence length")
+
+    index_path, content_id = publish_index(
+        document_id, bytes_hash, text_digest.hexdigest(),
+        chunks=chunks, pages=len(pages), truncated=truncated,
+    )
+
+    stage_seconds = dict(pipeline.seconds, index=round(index_seconds, 3))
+    total_seconds = time.perf_counter() - started
+
+    dropped = len(writer.duplicates)
+    embed_per_chunk = stage_seconds["embed"] / chunks if chunks else 0.0
+    if dropped or cleanup.get("boilerplate_lines"):
+        logger.info(
+            f"Removed {cleanup.get('boilerplate_lines', 0)} boilerplate lines and {dropped} near-duplicate "
+            f"chunks ({dropped / (chunks + dropped):.1%} of the index)"
+        )
+    logger.info(f"Document ingested successfully: {index_path} in {total_seconds:.2f}s (stages: {stage_seconds})")
 
-    logger.info(f"Document ingested successfully: {index_path}")
-    
     return IngestResponse(
         faissIndexPath=index_path,
-        chunks=len(chunks),
+        chunks=chunks,
+        pages=len(pages),
+        truncatedChunks=truncated,
+        extractSeconds=stage_seconds["extract"],
+        pageTimings=page_timings,
+        stageSeconds=stage_seconds,
+        totalSeconds=round(total_seconds, 3),
+        contentHash=bytes_hash,
+        deduplicated=content_id != bytes_hash,
+        boilerplateLines=cleanup.get("boilerplate_lines", 0),
+        boilerplateChars=cleanup.get("boilerplate_chars", 0),
+        duplicateChunks=dropped,
+        indexShrinkage=round(dropped / (chunks + dropped), 4) if chunks + dropped else 0.0,
+        embedSecondsSaved=round(dropped * embed_per_chunk, 3),
     )
+
+
+def delete_index(document_id: str) -> bool:
+    """
+    Delete a document's index and any content index no other document references.
+
+    The document's ref.json goes first; the shared content index is removed
+    (and its registry hashes forgotten) only when no remaining ref.json
+    points at it. This runs under the content's registry lock, so an
+    identical upload either reuses the index before it is checked or
+    rebuilds it afterwards.
+
+    Returns:
+        True if the document had an index
+    """
+    if not document_id or document_id != os.path.basename(document_id) or document_id in (".", "..", CONTENT_DIR):
+        raise ValueError(f"Invalid documentId: {document_id!r}")
+
+    ref = faiss_store.read_ref(document_id)
+    deleted = faiss_store.delete_document(document_id)
+    if not ref:
+        return deleted
+
+    content_id = ref["contentId"]
+    with document_registry.lock(content_id):
+        if content_id not in faiss_store.referenced_content_ids():
+            document_registry.forget(content_id)
+            faiss_store.delete_content_index(content_id)
+    return deleted
+
+
+async def delete_document_index(document_id: str) -> bool:
+    """Delete a document's index, collecting its content index once unreferenced."""
+    return await run_in_threadpool(delete_index, document_id)
+
+
+async def ingest_document(request: IngestRequest) -> IngestResponse:
+    """Ingest document: extract, chunk, embed, and index incrementally."""
+    return run_ingest(request.filepath)
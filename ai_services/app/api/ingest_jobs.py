@@ -0,0 +1,290 @@
+import copy
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from pydantic import BaseModel
+from app.api.ingest import IngestRequest, IngestResponse, run_ingest, count_pages
+from app.core.config import config
+from app.persistence.job_store import job_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Minimum seconds between retention sweeps of finished jobs
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+class QueueFull(Exception):
+    """Raised when INGEST_MAX_QUEUED jobs are already waiting."""
+
+
+class JobProgress(BaseModel):
+    pages: int = 0
+    totalPages: int = 0
+    chunks: int = 0
+    percent: float = 0.0
+
+
+class JobTimings(BaseModel):
+    submittedAt: float
+    startedAt: Optional[float] = None
+    finishedAt: Optional[float] = None
+    queueSeconds: Optional[float] = None
+    runSeconds: Optional[float] = None
+    stageSeconds: dict[str, float] = {}
+
+
+class IngestJobResponse(BaseModel):
+    jobId: str
+    filepath: str
+    status: str
+    stage: str
+    progress: JobProgress
+    timings: JobTimings
+    attempts: int = 0
+    result: Optional[IngestResponse] = None
+    error: Optional[str] = None
+
+
+class IngestJobManager:
+    """
+    Runs ingest jobs in the background on a bounded worker pool.
+
+    Every state change is persisted through job_store, so jobs that were
+    queued or running when the service stopped are picked up again by
+    `resume`. Interrupted jobs restart from the beginning; the index writer
+    only publishes the index once it is complete. A job is claimed in the
+    job store for as long as this process owns it, so when several
+    workers start at once each interrupted job is resumed by exactly one.
+    Finished jobs are forgotten after INGEST_JOB_RETENTION_HOURS.
+    """
+
+    def __init__(self, workers: int = None, max_queued: int = None, retention_hours: float = None):
+        self.workers = workers or config.INGEST_WORKERS
+        self.max_queued = max_queued or config.INGEST_MAX_QUEUED
+        self.retention_seconds = (retention_hours or config.INGEST_JOB_RETENTION_HOURS) * 3600
+        self._executor: ThreadPoolExecutor = None
+        self._jobs: dict[str, dict] = {}
+        self._claims: dict[str, int] = {}  # Job id -> job_store claim held while this process owns the job
+        self._last_pruned = 0.0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            logger.info(f"Starting ingest worker pool with {self.workers} workers")
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest")
+        return self._executor
+
+    def _queued_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] == QUEUED)
+
+    def _enter_stage(self, job_id: str, stage: str, **fields):
+        """Move a job to a new stage, closing out the time spent in the previous one."""
+        now = time.time()
+        with self._lock:
+            job = self._jobs[job_id]
+            previous = job["stage"]
+            if previous != stage and job.get("_stageStartedAt"):
+                stage_seconds = job["timings"]["stageSeconds"]
+                stage_seconds[previous] = round(
+                    stage_seconds.get(previous, 0.0) + now - job["_stageStartedAt"], 3
+                )
+            if previous != stage:
+                job["_stageStartedAt"] = now
+            job["stage"] = stage
+            job.update(fields)
+            snapshot = copy.deepcopy(job)
+        job_store.save(snapshot)
+
+    def submit(self, filepath: str) -> dict:
+        """
+        Queue a document for ingestion.
+
+        Raises:
+            QueueFull: If too many jobs are already waiting
+        """
+        if time.time() - self._last_pruned >= PRUNE_INTERVAL_SECONDS:
+            self.prune()
+
+        with self._lock:
+            if self._queued_count() >= self.max_queued:
+                raise QueueFull(f"{self.max_queued} ingest jobs already queued")
+            job = {
+                "id": uuid.uuid4().hex,
+                "filepath": filepath,
+                "status": QUEUED,
+                "stage": QUEUED,
+                "progress": JobProgress().model_dump(),
+                "timings": JobTimings(submittedAt=time.time()).model_dump(),
+                "attempts": 0,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[job["id"]] = job
+            self._claims[job["id"]] = job_store.claim(job["id"])
+            snapshot = copy.deepcopy(job)
+        job_store.save(snapshot)
+
+        self._get_executor().submit(self._run, job["id"])
+        logger.info(f"Queued ingest job {job['id']} for {filepath}")
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Current state of a job, from memory or the job store."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return copy.deepcopy(job)
+        return job_store.load(job_id)
+
+    def resume(self) -> int:
+        """
+        Re-queue jobs that were queued or running when the service stopped.
+
+        Jobs still claimed by a live worker are skipped, and the record is
+        re-read after claiming so a job finished in the meantime is not
+        run again.
+        """
+        self.prune()
+
+        resumed = 0
+        for job in job_store.load_all():
+            if job["status"] not in (QUEUED, RUNNING):
+                continue
+            claim = job_store.claim(job["id"])
+            if claim is None:
+                continue
+            job = job_store.load(job["id"])
+            if job is None or job["status"] not in (QUEUED, RUNNING):
+                job_store.release(claim)
+                continue
+
+            job.update(status=QUEUED, stage=QUEUED, _stageStartedAt=None)
+            job["progress"] = JobProgress().model_dump()
+            with self._lock:
+                self._jobs[job["id"]] = job
+                self._claims[job["id"]] = claim
+            job_store.save(job)
+            self._get_executor().submit(self._run, job["id"])
+            resumed += 1
+
+        if resumed:
+            logger.info(f"Resumed {resumed} ingest jobs")
+        return resumed
+
+    def _run(self, job_id: str):
+        """Worker body: ingest one document and record progress and outcome."""
+        started = time.time()
+        with self._lock:
+            job = self._jobs[job_id]
+            timings = job["timings"]
+            timings["startedAt"] = started
+            timings["queueSeconds"] = round(started - timings["submittedAt"], 3)
+            attempts = job.get("attempts", 0) + 1
+        self._enter_stage(job_id, "extracting", status=RUNNING, attempts=attempts)
+
+        try:
+            total_pages = count_pages(self._jobs[job_id]["filepath"])
+
+            def on_progress(update: dict):
+                percent = min(update["pages"] / total_pages, 1.0) * 100 if total_pages else 0.0
+                progress = JobProgress(
+                    pages=update["pages"],
+                    totalPages=total_pages,
+                    chunks=update["chunks"],
+                    percent=round(percent, 1),
+                ).model_dump()
+                self._enter_stage(job_id, update["stage"], progress=progress)
+
+            result = run_ingest(self._jobs[job_id]["filepath"], on_progress=on_progress)
+            self._finish(job_id, COMPLETED, result=result.model_dump())
+        except Exception as e:
+            logger.error(f"Ingest job {job_id} failed: {e}")
+            self._finish(job_id, FAILED, error=str(e))
+
+    def _finish(self, job_id: str, status: str, **fields):
+        finished = time.time()
+        with self._lock:
+            job = self._jobs[job_id]
+            timings = job["timings"]
+            timings["finishedAt"] = finished
+            timings["runSeconds"] = round(finished - timings["startedAt"], 3)
+            if status == COMPLETED:
+                job["progress"]["percent"] = 100.0
+        self._enter_stage(job_id, status, status=status, **fields)
+        with self._lock:
+            claim = self._claims.pop(job_id, None)
+        if claim is not None:
+            job_store.release(claim)
+        logger.info(f"Ingest job {job_id} {status} in {self._jobs[job_id]['timings']['runSeconds']}s")
+
+    def prune(self) -> int:
+        """
+        Forget completed and failed jobs that finished more than the
+        retention period ago, in memory and in the job store.
+
+        Returns:
+            Number of jobs removed
+        """
+        cutoff = time.time() - self.retention_seconds
+        self._last_pruned = time.time()
+
+        def expired(job: dict) -> bool:
+            finished = job["timings"].get("finishedAt")
+            return job["status"] in (COMPLETED, FAILED) and finished is not None and finished < cutoff
+
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items() if expired(job)]:
+                del self._jobs[job_id]
+
+        removed = 0
+        for job in job_store.load_all():
+            if not expired(job):
+                continue
+            claim = job_store.claim(job["id"])
+            if claim is None:
+                continue
+            job_store.delete(job["id"])
+            job_store.release(claim)
+            removed += 1
+
+        if removed:
+            logger.info(f"Pruned {removed} ingest jobs finished over {self.retention_seconds / 3600:.0f}h ago")
+        return removed
+
+
+def to_response(job: dict) -> IngestJobResponse:
+    """Convert a stored job record to its API representation."""
+    return IngestJobResponse(
+        jobId=job["id"],
+        filepath=job["filepath"],
+        status=job["status"],
+        stage=job["stage"],
+        progress=JobProgress(**job["progress"]),
+        timings=JobTimings(**job["timings"]),
+        attempts=job.get("attempts", 0),
+        result=job.get("result"),
+        error=job.get("error"),
+    )
+
+
+async def submit_ingest_job(request: IngestRequest) -> IngestJobResponse:
+    """Queue a document for background ingestion and return its job."""
+    return to_response(ingest_jobs.submit(request.filepath))
+
+
+async def get_ingest_job(job_id: str) -> Optional[IngestJobResponse]:
+    """Look up an ingest job by id."""
+    job = ingest_jobs.get(job_id)
+    return to_response(job) if job else None
+
+
+# Global instance
+ingest_jobs = IngestJobManager()
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
-from app.pipelines.rag_chain import run_rag_query
+from app.pipelines.rag_chain import run_rag_query, run_rag_batch_query
+from app.core.deadline import Deadline
+from app.core.config import config
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,21 +16,64 @@ class QueryRequest(BaseModel):
 class QueryResponse(BaseModel):
     answer: str
     sources: list[str]
+    degraded: list[str] = []  # Pipeline stages skipped or shortened to meet the deadline
 
 
-async def query_document(request: QueryRequest) -> QueryResponse:
+class BatchQueryRequest(BaseModel):
+    questions: list[str]
+    faissIndexPath: str
+    userPrompt: str = ""
+
+
+class BatchAnswer(BaseModel):
+    question: str
+    answer: str
+    sources: list[str]
+
+
+class BatchQueryResponse(BaseModel):
+    answers: list[BatchAnswer]
+    degraded: list[str] = []
+
+
+async def query_document(request: QueryRequest, deadline: Deadline = None) -> QueryResponse:
     """Execute RAG query against document index with optional user prompt."""
     logger.info(f"Query requested: {request.query}")
     if request.userPrompt:
         logger.info(f"User prompt provided: {request.userPrompt}")
     
-    result = run_rag_query(
+    result = await run_rag_query(
         index_path=request.faissIndexPath,
         query=request.query,
         user_prompt=request.userPrompt,
+        deadline=deadline,
     )
     
     return QueryResponse(
         answer=result["answer"],
         sources=result["sources"],
+        degraded=result["degraded"],
+    )
+
+
+async def query_document_batch(request: BatchQueryRequest, deadline: Deadline = None) -> BatchQueryResponse:
+    """Answer several questions against one document index with shared retrieval."""
+    questions = [q.strip() for q in request.questions if q.strip()]
+    if not questions:
+        raise ValueError("At least one question is required")
+    if len(questions) > config.RAG_BATCH_MAX_QUESTIONS:
+        raise ValueError(f"At most {config.RAG_BATCH_MAX_QUESTIONS} questions per batch")
+
+    logger.info(f"Batch query requested: {len(questions)} questions")
+
+    result = await run_rag_batch_query(
+        index_path=request.faissIndexPath,
+        questions=questions,
+        user_prompt=request.userPrompt,
+        deadline=deadline,
+    )
+
+    return BatchQueryResponse(
+        answers=[BatchAnswer(**answer) for answer in result["answers"]],
+        degraded=result["degraded"],
     )
@@ -1,10 +1,10 @@
-import os
-import json
-import time
-from datetime import datetime, timedelta
+from functools import partial
 from pydantic import BaseModel
 from app.scraping.tldrlegal import scrape_tldrlegal
 from app.scraping.indiankanoon import scrape_indiankanoon
+from app.scraping.rate_limiter import rate_limiter
+from app.scraping.circuit_breaker import breaker_stats
+from app.persistence.scrape_cache import scrape_cache
 from app.core.config import config
 import logging
 
@@ -20,42 +20,11 @@ class ScrapeResponse(BaseModel):
     provider: str = "unknown"
 
 
-def get_cached_scrape(term: str) -> dict | None:
-    """Check if term is in cache and not expired."""
-    cache_file = os.path.join(config.SCRAPE_CACHE, f"{term}.json")
-    
-    if not os.path.exists(cache_file):
-        return None
-
-    with open(cache_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    cached_time = datetime.fromisoformat(data['timestamp'])
-    expiry = cached_time + timedelta(hours=config.SCRAPE_CACHE_TTL_HOURS)
-
-    if datetime.now() > expiry:
-        logger.info(f"Cache expired for term: {term}")
-        return None
-
-    logger.info(f"Cache hit for term: {term}")
-    return data
-
-
-def save_scrape_cache(term: str, explanation: str, provider: str):
-    """Save scraped result to cache."""
-    cache_file = os.path.join(config.SCRAPE_CACHE, f"{term}.json")
-    
-    data = {
-        "term": term,
-        "explanation": explanation,
-        "provider": provider,
-        "timestamp": datetime.now().isoformat(),
-    }
-
-    with open(cache_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
-
-    logger.info(f"Cached scrape result for: {term}")
+# Providers tried in order for a free-form term
+PROVIDERS = [
+    ("tldrlegal", scrape_tldrlegal),
+    ("indiankanoon", scrape_indiankanoon),
+]
 
 
 async def scrape_context(request: ScrapeRequest) -> ScrapeResponse:
@@ -69,39 +38,32 @@ async def scrape_context(request: ScrapeRequest) -> ScrapeResponse:
             provider="disabled",
         )
 
-    # Check cache
-    cached = get_cached_scrape(term)
-    if cached:
-        return ScrapeResponse(
-            explanation=cached["explanation"],
-            provider=cached["provider"],
-        )
-
-    # Try providers
+    # Try providers through the shared cache
     explanation = None
-    provider = "unknown"
+    provider = "none"
 
-    try:
-        explanation = scrape_tldrlegal(term)
-        provider = "tldrlegal"
-    except Exception as e:
-        logger.warning(f"TLDRLegal scrape failed: {e}")
-
-    if not explanation:
+    for name, scraper in PROVIDERS:
         try:
-            explanation = scrape_indiankanoon(term)
-            provider = "indiankanoon"
+            explanation = await scrape_cache.fetch(name, term, partial(scraper, term))
         except Exception as e:
-            logger.warning(f"IndianKanoon scrape failed: {e}")
+            logger.warning(f"{name} scrape failed: {e}")
+        if explanation:
+            provider = name
+            break
 
     if not explanation:
         explanation = f"No external explanation found for '{term}'."
-        provider = "none"
-
-    # Cache result
-    save_scrape_cache(term, explanation, provider)
 
     return ScrapeResponse(
         explanation=explanation,
         provider=provider,
     )
+
+
+def scrape_stats() -> dict:
+    """Scraper metrics for this worker process."""
+    return {
+        "rateLimiter": rate_limiter.stats(),
+        "cache": scrape_cache.stats(),
+        "circuitBreakers": breaker_stats(),
+    }
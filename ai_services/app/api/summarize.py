@@ -1,22 +1,162 @@
+import os
+import json
+import time
+from typing import Iterator, Optional
 from pydantic import BaseModel
-from app.pipelines.summarize_chain import summarize_document
+from starlette.concurrency import run_in_threadpool
+from app.api.ingest import extract_text, EXTRACTORS
+from app.core.chunking import PAGE_SEPARATOR
+from app.core.config import config
+from app.persistence.faiss_store import faiss_store
+from app.persistence.text_cache import text_cache
+from app.pipelines.summarize_chain import summarize_document, summarize_documents, stream_summary
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class DocumentNotFound(Exception):
+    """Raised when a documentId or filepath cannot be resolved to text."""
+
+
 class SummarizeRequest(BaseModel):
-    text: str
+    # Exactly one of: the text itself, an ingested document id, or a file on the shared volume
+    text: Optional[str] = None
+    documentId: Optional[str] = None
+    filepath: Optional[str] = None
+    mode: str = "auto"  # "auto", "truncate" or "map_reduce"
 
 
 class SummarizeResponse(BaseModel):
     summary: str
+    mode: str = "truncate"
+    chunks: int = 1
+    degraded: list[str] = []  # Cost caps hit while summarizing
+    cached: bool = False
+
+
+class BatchDocument(BaseModel):
+    id: str
+    text: Optional[str] = None
+    documentId: Optional[str] = None
+    filepath: Optional[str] = None
+
+
+class BatchSummarizeRequest(BaseModel):
+    documents: list[BatchDocument]
+
+
+def _ingested_text(document_id: str) -> str:
+    """Text of an ingested document: the extracted-text cache, else its chunk store."""
+    if not document_id or document_id != os.path.basename(document_id) or document_id.startswith("."):
+        raise ValueError(f"Invalid documentId: {document_id!r}")
+
+    ref = faiss_store.read_ref(document_id)
+    if ref:
+        for extractor in EXTRACTORS.values():
+            cached = text_cache.get(ref["contentHash"], extractor)
+            if cached:
+                logger.info(f"Resolved text for {document_id} from the text cache")
+                return PAGE_SEPARATOR.join(text for _, text in cached["pages"])
+
+    index_path = os.path.join(config.VECTOR_INDEXES, document_id, "index.faiss")
+    try:
+        text = faiss_store.reconstruct_text(index_path)
+    except FileNotFoundError:
+        raise DocumentNotFound(f"Document not ingested: {document_id}")
+    logger.info(f"Resolved text for {document_id} from its chunk store")
+    return text
+
+
+def resolve_text(text: Optional[str], document_id: Optional[str], filepath: Optional[str]) -> str:
+    """
+    Resolve the text to summarize from exactly one of text, documentId or filepath.
+
+    Files go through extract_text, so a file that was already ingested is
+    served from the extracted-text cache instead of being parsed again.
+
+    Raises:
+        ValueError: If not exactly one source is given
+        DocumentNotFound: If the document or file does not exist
+    """
+    if sum(1 for source in (text, document_id, filepath) if source) != 1:
+        raise ValueError("Provide exactly one of 'text', 'documentId' or 'filepath'")
+
+    if text:
+        return text
+    if document_id:
+        return _ingested_text(document_id)
+    if not os.path.isfile(filepath):
+        raise DocumentNotFound(f"File not found: {filepath}")
+    return extract_text(filepath)
+
+
+def run_summarize(request: SummarizeRequest) -> SummarizeResponse:
+    """Resolve the text and summarize it; blocking, so callers on the event loop use summarize()."""
+    logger.info("Summarization requested")
+
+    text = resolve_text(request.text, request.documentId, request.filepath)
+    result = summarize_document(text, mode=request.mode)
+
+    return SummarizeResponse(**result)
 
 
 async def summarize(request: SummarizeRequest) -> SummarizeResponse:
     """Generate legal summary of document text."""
-    logger.info("Summarization requested")
-    
-    summary = summarize_document(request.text)
-    
-    return SummarizeResponse(summary=summary)
+    return await run_in_threadpool(run_summarize, request)
+
+
+def summarize_batch(request: BatchSummarizeRequest) -> Iterator[str]:
+    """
+    Summarize many documents, streaming one NDJSON line per document as it
+    finishes and a final stats line with throughput.
+    """
+    logger.info(f"Batch summarization requested: {len(request.documents)} documents")
+    started = time.monotonic()
+    completed = failed = 0
+
+    documents = []
+    for doc in request.documents:
+        try:
+            documents.append((doc.id, resolve_text(doc.text, doc.documentId, doc.filepath)))
+        except Exception as e:
+            logger.error(f"Could not resolve text for batch document {doc.id}: {e}")
+            failed += 1
+            yield json.dumps({"id": doc.id, "error": str(e)}) + "\n"
+
+    for result in summarize_documents(documents):
+        if "error" in result:
+            failed += 1
+        else:
+            completed += 1
+        yield json.dumps(result) + "\n"
+
+    elapsed = time.monotonic() - started
+    stats = {
+        "documents": len(request.documents),
+        "completed": completed,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "documentsPerMinute": round(completed / elapsed * 60, 2) if elapsed > 0 else None,
+    }
+    logger.info(f"Batch summarization complete: {stats}")
+    yield json.dumps({"stats": stats}) + "\n"
+
+
+def summarize_stream(request: SummarizeRequest) -> Iterator[str]:
+    """
+    Stream a summary as server-sent events: 'progress' while map-reduce runs,
+    one 'bullet' per bullet point as it is decoded, then 'done' or 'error'.
+    """
+    logger.info("Streaming summarization requested")
+
+    try:
+        text = resolve_text(request.text, request.documentId, request.filepath)
+    except Exception as e:
+        logger.error(f"Could not resolve text to summarize: {e}")
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        return
+
+    for event in stream_summary(text, mode=request.mode):
+        name = event.pop("event")
+        yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
@@ -1,28 +1,237 @@
+import bisect
+import copy
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Iterator
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.config import config
+from app.core.embeddings import get_embedding_model
 import logging
 
 logger = logging.getLogger(__name__)
 
+SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# Separator placed between extracted pages; offsets refer to the pages joined with it
+PAGE_SEPARATOR = "\n\n"
+
+# Buffered characters before the streaming chunker splits and emits chunks
+STREAM_BUFFER_CHARS = 20000
+
+# Chunking measures text with its own copy of the embedder's tokenizer, so it never
+# contends with embedding (see embeddings.encode). The copy is shared by every
+# counter and count_truncated, and fast tokenizers are not safe to call concurrently.
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """The chunker's private copy of the embedding model's tokenizer."""
+    global _tokenizer
+
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            _tokenizer = copy.deepcopy(get_embedding_model().tokenizer)
+    return _tokenizer
+
+
+@dataclass
+class Chunk:
+    """A chunk of document text with its source location."""
+
+    text: str
+    start: int  # Character offset in the page-joined document text
+    end: int
+    page_start: int  # 1-based page numbers
+    page_end: int
+
+
+class TokenLengthCounter:
+    """
+    Length function measuring text in embedding-model tokens.
+
+    Uses the embedder's fast tokenizer; lengths are memoized because the
+    splitter measures the same pieces repeatedly, and `prime` tokenizes
+    many pieces in a single batched call. A counter holds per-document
+    state, so each chunking call builds its own (see new_splitter).
+    """
+
+    def __init__(self, tokenizer, max_cached: int = 50000):
+        self.tokenizer = tokenizer
+        self.max_cached = max_cached
+        self._lengths: dict[str, int] = {}
+
+    def prime(self, texts: list[str]):
+        """Tokenize all uncached texts in one batch."""
+        missing = [t for t in set(texts) if t not in self._lengths]
+        if not missing:
+            return
+        if len(self._lengths) + len(missing) > self.max_cached:
+            self._lengths.clear()
+        with _tokenizer_lock:
+            encoded = self.tokenizer(missing, add_special_tokens=False, return_attention_mask=False)
+        self._lengths.update(zip(missing, (len(ids) for ids in encoded["input_ids"])))
+
+    def __call__(self, text: str) -> int:
+        length = self._lengths.get(text)
+        if length is None:
+            self.prime([text])
+            length = self._lengths[text]
+        return length
+
+    def clear(self):
+        self._lengths.clear()
+
+
+class TokenTextSplitter(RecursiveCharacterTextSplitter):
+    """Recursive splitter that batch-tokenizes the pieces it is about to merge."""
+
+    def __init__(self, counter: TokenLengthCounter, **kwargs):
+        super().__init__(length_function=counter, **kwargs)
+        self.counter = counter
+
+    def _merge_splits(self, splits, separator):
+        self.counter.prime(list(splits) + [separator])
+        return super()._merge_splits(splits, separator)
+
+
+_chunk_size: int = None
+
+
+def get_chunk_size() -> int:
+    """Chunk size in tokens, capped at what the embedder can encode."""
+    global _chunk_size
+
+    if _chunk_size is None:
+        model = get_embedding_model()
+        # Leave room for the [CLS]/[SEP] tokens the encoder adds
+        max_tokens = model.max_seq_length - 2
+        _chunk_size = min(config.CHUNK_SIZE_TOKENS, max_tokens)
+        if _chunk_size < config.CHUNK_SIZE_TOKENS:
+            logger.warning(f"CHUNK_SIZE_TOKENS capped at {_chunk_size} (embedder max_seq_length {model.max_seq_length})")
+
+    return _chunk_size
+
+
+def new_splitter() -> TokenTextSplitter:
+    """
+    Build a token-measured splitter with its own length cache.
+
+    Splitters are cheap; one per chunking call keeps concurrent ingests
+    from sharing (and clearing) each other's memoized lengths.
+    """
+    return TokenTextSplitter(
+        TokenLengthCounter(get_tokenizer()),
+        chunk_size=get_chunk_size(),
+        chunk_overlap=config.CHUNK_OVERLAP_TOKENS,
+        separators=SEPARATORS,
+    )
+
+
+def count_truncated(chunks: list[str]) -> int:
+    """Count chunks the embedder would truncate at its max_seq_length."""
+    if not chunks:
+        return 0
+    tokenizer = get_tokenizer()
+    with _tokenizer_lock:
+        encoded = tokenizer(chunks, add_special_tokens=True, return_attention_mask=False)
+    max_seq_length = get_embedding_model().max_seq_length
+    return sum(1 for ids in encoded["input_ids"] if len(ids) > max_seq_length)
+
 
 def chunk_text(text: str) -> list[str]:
     """
     Split text into overlapping chunks for embedding.
-    
+
+    Chunk size is measured in embedding-model tokens so no chunk is
+    silently truncated by the encoder.
+
     Args:
         text: Input document text
-    
+
     Returns:
         List of text chunks
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=config.CHUNK_SIZE,
-        chunk_overlap=config.CHUNK_OVERLAP,
-        length_function=len,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
-
-    chunks = splitter.split_text(text)
+    chunks = new_splitter().split_text(text)
     logger.info(f"Split text into {len(chunks)} chunks")
-    
+
     return chunks
+
+
+def iter_chunks(pages: Iterable[tuple[int, str]]) -> Iterator[Chunk]:
+    """
+    Chunk text incrementally as pages are extracted.
+
+    Pages are buffered until STREAM_BUFFER_CHARS, split, and every chunk
+    except the trailing ones (which may continue on the next page) is
+    yielded. The chunker itself holds only the buffer, never the whole
+    document; callers decide how much of the output to keep.
+
+    Args:
+        pages: (page_number, text) pairs in document order; a page may be
+            delivered as several consecutive segments with the same number
+
+    Yields:
+        Chunk objects with character offsets into the pages joined by
+        PAGE_SEPARATOR, and the pages each chunk spans
+    """
+    splitter = new_splitter()
+    buffer = ""
+    buffer_start = 0  # Document offset of buffer[0]
+    page_offsets: list[int] = []  # Document offset where each segment starts
+    page_numbers: list[int] = []
+    length = 0  # Document length so far
+    total = 0
+
+    def page_at(offset: int) -> int:
+        return page_numbers[max(bisect.bisect_right(page_offsets, offset) - 1, 0)]
+
+    def split(final: bool) -> Iterator[Chunk]:
+        nonlocal buffer, buffer_start
+        pieces = splitter.split_text(buffer)
+        keep = 0 if final else min(2, len(pieces))
+        emit = pieces[:len(pieces) - keep]
+
+        search_from = 0
+        next_start = None
+        for i, piece in enumerate(pieces):
+            position = buffer.find(piece, search_from)
+            if position < 0:
+                position = search_from
+            if i == len(emit):
+                next_start = position
+                break
+            search_from = position + 1
+            start = buffer_start + position
+            end = start + len(piece)
+            yield Chunk(piece, start, end, page_at(start), page_at(max(end - 1, start)))
+
+        if final or next_start is None:
+            buffer_start += len(buffer)
+            buffer = ""
+        else:
+            buffer_start += next_start
+            buffer = buffer[next_start:]
+
+    for page_number, text in pages:
+        text = text or ""
+        if page_offsets:
+            buffer += PAGE_SEPARATOR
+            length += len(PAGE_SEPARATOR)
+        page_offsets.append(length)
+        page_numbers.append(page_number)
+        buffer += text
+        length += len(text)
+
+        if len(buffer) >= STREAM_BUFFER_CHARS:
+            for chunk in split(final=False):
+                total += 1
+                yield chunk
+            splitter.counter.clear()
+
+    if buffer.strip():
+        for chunk in split(final=True):
+            total += 1
+            yield chunk
+
+    logger.info(f"Streamed {total} chunks from {len(set(page_numbers))} pages")
@@ -0,0 +1,112 @@
+import re
+import numpy as np
+from app.core.embeddings import encode
+from app.core.config import config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sentence boundaries: end punctuation followed by whitespace, or blank lines
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?;:])\s+(?=[A-Z0-9("\'])|\n\s*\n')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return len(text) // 4
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split a chunk into sentences, dropping empty fragments."""
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def compress_chunks(
+    query_embeddings: list[list[float]],
+    chunks: list[str],
+    token_budget: int = None,
+    neighbours: int = None,
+) -> tuple[list[str], dict]:
+    """
+    Extractive compression of retrieved chunks before the LLM call.
+
+    Every sentence of every chunk is embedded in one batch and scored
+    against the query (the best score over several queries for batch
+    requests). The top-scoring sentences and their neighbours are kept, in
+    document order, until the token budget is spent.
+
+    Args:
+        query_embeddings: One or more query vectors
+        chunks: Retrieved chunk texts, in context order
+        token_budget: Maximum estimated tokens to keep (default: from config)
+        neighbours: Sentences to keep on each side of a selected sentence
+
+    Returns:
+        Tuple of (compressed chunks aligned with the input, empty when nothing
+        was kept; stats dict with original and compressed token counts)
+    """
+    token_budget = token_budget or config.RAG_CONTEXT_TOKEN_BUDGET
+    neighbours = neighbours if neighbours is not None else config.RAG_COMPRESSION_NEIGHBOURS
+
+    sentences = []  # (chunk_idx, position_in_chunk, text)
+    per_chunk = []
+    for chunk_idx, chunk in enumerate(chunks):
+        chunk_sentences = split_sentences(chunk)
+        per_chunk.append(len(chunk_sentences))
+        sentences.extend((chunk_idx, pos, text) for pos, text in enumerate(chunk_sentences))
+
+    original_tokens = sum(estimate_tokens(c) for c in chunks)
+    stats = {"original_tokens": original_tokens, "compressed_tokens": original_tokens}
+
+    if not sentences or original_tokens <= token_budget:
+        return list(chunks), stats
+
+    # One vectorized pass: embed all sentences, score against every query
+    sentence_vectors = encode(
+        [text for _, _, text in sentences],
+        batch_size=64,
+        normalize_embeddings=True,
+    )
+    queries = np.asarray(query_embeddings, dtype='float32').reshape(-1, sentence_vectors.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-12
+    scores = (sentence_vectors @ queries.T).max(axis=1)
+
+    # Greedily take best sentences with their neighbours until the budget is spent
+    offsets = np.cumsum([0] + per_chunk)
+    kept = set()
+    used_tokens = 0
+    for sentence_idx in np.argsort(-scores):
+        chunk_idx, pos, _ = sentences[sentence_idx]
+        start = offsets[chunk_idx]
+        window = range(max(pos - neighbours, 0), min(pos + neighbours + 1, per_chunk[chunk_idx]))
+        added = [start + p for p in window if start + p not in kept]
+        cost = sum(estimate_tokens(sentences[i][2]) for i in added)
+        if used_tokens + cost > token_budget:
+            if used_tokens:
+                continue
+            added = [sentence_idx]  # Always keep at least the single best sentence
+            cost = estimate_tokens(sentences[sentence_idx][2])
+        kept.update(added)
+        used_tokens += cost
+        if used_tokens >= token_budget:
+            break
+
+    # Rebuild chunks in original order, marking gaps between kept sentences
+    compressed = []
+    for chunk_idx in range(len(chunks)):
+        parts = []
+        previous = None
+        for sentence_idx in range(offsets[chunk_idx], offsets[chunk_idx + 1]):
+            if sentence_idx not in kept:
+                continue
+            if previous is not None and sentence_idx != previous + 1:
+                parts.append("...")
+            parts.append(sentences[sentence_idx][2])
+            previous = sentence_idx
+        compressed.append(" ".join(parts))
+
+    stats["compressed_tokens"] = sum(estimate_tokens(c) for c in compressed)
+    logger.info(
+        f"Compressed context from ~{stats['original_tokens']} to ~{stats['compressed_tokens']} tokens "
+        f"({len(kept)} of {len(sentences)} sentences)"
+    )
+    return compressed, stats
@@ -35,11 +35,62 @@ class Config:
     RAG_TOP_K = int(os.getenv("RAG_TOP_K", "20"))  # Increased to 20 for maximum relevant context
     RAG_TEMPERATURE = 0.3  # Slightly higher for more natural responses
     RAG_MAX_OUTPUT_TOKENS = 8192  # Increased to 8192 for very detailed explanations
+    # Adaptive top-k: RAG_TOP_K is the search depth, the cut-off follows the distance elbow
+    RAG_MIN_K = int(os.getenv("RAG_MIN_K", "3"))
+    # Squared L2 distance on normalized mpnet vectors (2 - 2 * cosine); 1.3 ~ cosine 0.35
+    RAG_RELEVANCE_THRESHOLD = float(os.getenv("RAG_RELEVANCE_THRESHOLD", "1.3"))
+    RAG_ELBOW_MIN_GAP = float(os.getenv("RAG_ELBOW_MIN_GAP", "0.08"))  # Smaller gaps are not treated as an elbow
+    # Extractive context compression before the LLM call
+    RAG_COMPRESSION_ENABLED = os.getenv("RAG_COMPRESSION_ENABLED", "true").lower() == "true"
+    RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "3000"))
+    RAG_COMPRESSION_NEIGHBOURS = 1  # Sentences kept on each side of a selected sentence
+    RAG_BATCH_MAX_QUESTIONS = int(os.getenv("RAG_BATCH_MAX_QUESTIONS", "10"))
     MAX_CONTEXT_CHARS = 900000  # Increased to 900K to utilize Gemini's 1M token context window (roughly 1M tokens)
 
-    # Chunking configuration - Optimized for better semantic coherence
-    CHUNK_SIZE = 1200  # Increased from 950 for more complete context per chunk
-    CHUNK_OVERLAP = 200  # Increased from 100 to maintain better continuity
+    # Request deadlines - default budget sits just under the backend's 120s axios timeout
+    REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "110"))
+    REQUEST_DEADLINE_MAX_SECONDS = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", "600"))
+    SCRAPE_STAGE_MIN_SECONDS = 20  # Skip web scraping below this remaining budget
+    SCRAPE_STAGE_FULL_SECONDS = 60  # Below this, scrape one term with a single attempt
+    LLM_STAGE_MIN_SECONDS = 5  # Fail fast rather than start an LLM call that cannot finish
+
+    # Chunking configuration - measured in embedding-model tokens
+    # all-mpnet-base-v2 truncates at 384 tokens; chunks are capped below that
+    CHUNK_SIZE_TOKENS = int(os.getenv("CHUNK_SIZE_TOKENS", "320"))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))  # Chunks embedded and indexed per step at ingest
+
+    # PDF extraction - page ranges are extracted in parallel worker processes
+    PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) - 1)))))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+    PDF_PARALLEL_MIN_PAGES = 32  # Smaller PDFs are extracted in-process
+
+    # Ingest jobs - documents ingested in the background by a bounded worker pool
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_MAX_QUEUED = int(os.getenv("INGEST_MAX_QUEUED", "100"))
+    INGEST_QUEUE_DEPTH = int(os.getenv("INGEST_QUEUE_DEPTH", "4"))  # Items buffered between pipeline stages
+    INGEST_JOB_RETENTION_HOURS = float(os.getenv("INGEST_JOB_RETENTION_HOURS", "168"))  # Finished jobs kept this long
+    INGEST_DEDUP_ENABLED = os.getenv("INGEST_DEDUP_ENABLED", "true").lower() == "true"  # Strip page furniture, drop near-duplicate chunks
+    DEDUP_MAX_HAMMING = 3  # SimHash bit distance at which chunks count as near-duplicates
+    BULK_INGEST_WRITERS = int(os.getenv("BULK_INGEST_WRITERS", "4"))  # Concurrent index writes during bulk ingest
+
+    # Summarization - map-reduce over the full document
+    SUMMARIZER_MAX_INPUT_TOKENS = 512  # T5 encoder window
+    SUMMARY_MAP_MAX_LENGTH = 128  # Tokens generated per chunk summary
+    SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+    SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "1"))  # >1 fans map batches out to worker processes
+    SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "64"))  # Cost cap: chunks summarized per document
+    SUMMARY_MAX_SECONDS = float(os.getenv("SUMMARY_MAX_SECONDS", "100"))  # Cost cap: wall-clock budget
+    SUMMARY_MAX_REDUCE_DEPTH = 4
+
+    # Summarizer runtime: "fp32" (reference), "int8" (dynamic quantization) or "onnx"
+    SUMMARIZER_RUNTIME = os.getenv("SUMMARIZER_RUNTIME", "fp32")
+    # Cores are shared between uvicorn workers and summarizer pool workers
+    SUMMARIZER_INTRA_OP_THREADS = int(os.getenv(
+        "SUMMARIZER_INTRA_OP_THREADS",
+        str(max(1, (os.cpu_count() or 1) // (int(os.getenv("WEB_CONCURRENCY", "1")) * max(SUMMARY_WORKERS, 1)))),
+    ))
+    SUMMARIZER_INTER_OP_THREADS = int(os.getenv("SUMMARIZER_INTER_OP_THREADS", "1"))
 
     # Storage paths
     DATA_ROOT = os.getenv("DATA_ROOT", "data")
@@ -47,10 +98,38 @@ class Config:
     MODELS_DIR = os.path.join(DATA_ROOT, "models")
     CACHE_DIR = os.path.join(DATA_ROOT, "cache")
     SCRAPE_CACHE = os.path.join(CACHE_DIR, "scrape")
+    SUMMARY_CACHE = os.path.join(CACHE_DIR, "summaries")
+    SUMMARY_CACHE_MAX_MB = int(os.getenv("SUMMARY_CACHE_MAX_MB", "256"))
+    INGEST_JOBS_DIR = os.path.join(DATA_ROOT, "jobs")
+
+    # Extracted-text cache - shared with the Streamlit processor when both point at the same directory
+    TEXT_CACHE_DIR = os.getenv("TEXT_CACHE_DIR", os.path.join(CACHE_DIR, "text"))
+    TEXT_CACHE_MAX_MB = int(os.getenv("TEXT_CACHE_MAX_MB", "512"))
+    TEXT_CACHE_MAX_AGE_DAYS = int(os.getenv("TEXT_CACHE_MAX_AGE_DAYS", "30"))
 
     # Scraping
     SCRAPE_ENABLED = os.getenv("SCRAPE_ENABLED", "true").lower() == "true"
     SCRAPE_CACHE_TTL_HOURS = 72
+    SCRAPE_CACHE_DB = os.path.join(SCRAPE_CACHE, "scrape.db")
+    SCRAPE_CACHE_STALE_HOURS = int(os.getenv("SCRAPE_CACHE_STALE_HOURS", "168"))  # Served past expiry while refreshing
+    SCRAPE_NEGATIVE_TTL_HOURS = int(os.getenv("SCRAPE_NEGATIVE_TTL_HOURS", "6"))  # "Not found" results
+    SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "10000"))
+    SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "20"))  # Pooled keep-alive connections
+    SCRAPE_PER_HOST_CONCURRENCY = int(os.getenv("SCRAPE_PER_HOST_CONCURRENCY", "2"))
+    SCRAPE_HTTP2 = os.getenv("SCRAPE_HTTP2", "false").lower() == "true"  # Needs the 'h2' package
+    SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "15"))
+    SCRAPE_KEEPALIVE_SECONDS = 30
+    # Token bucket per host, shared by every worker process through lock files
+    SCRAPE_RATE_PER_SECOND = float(os.getenv("SCRAPE_RATE_PER_SECOND", "1.0"))
+    SCRAPE_RATE_BURST = int(os.getenv("SCRAPE_RATE_BURST", "1"))
+    SCRAPE_RATE_STATE_DIR = os.path.join(CACHE_DIR, "ratelimit")
+    # Circuit breaker per provider: open after consecutive failures, probe again after the reset time
+    SCRAPE_BREAKER_FAILURES = int(os.getenv("SCRAPE_BREAKER_FAILURES", "3"))
+    SCRAPE_BREAKER_RESET_SECONDS = float(os.getenv("SCRAPE_BREAKER_RESET_SECONDS", "60"))
+    SCRAPE_BREAKER_HALF_OPEN_PROBES = int(os.getenv("SCRAPE_BREAKER_HALF_OPEN_PROBES", "1"))
+    # Overridable so the scrapers can run against a local fixture server
+    INDIANKANOON_BASE_URL = os.getenv("INDIANKANOON_BASE_URL", "https://indiankanoon.org")
+    TLDRLEGAL_BASE_URL = os.getenv("TLDRLEGAL_BASE_URL", "https://tldrlegal.com")
 
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -62,3 +141,7 @@ config = Config()
 os.makedirs(config.VECTOR_INDEXES, exist_ok=True)
 os.makedirs(config.MODELS_DIR, exist_ok=True)
 os.makedirs(config.SCRAPE_CACHE, exist_ok=True)
+os.makedirs(config.SCRAPE_RATE_STATE_DIR, exist_ok=True)
+os.makedirs(config.SUMMARY_CACHE, exist_ok=True)
+os.makedirs(config.INGEST_JOBS_DIR, exist_ok=True)
+os.makedirs(config.TEXT_CACHE_DIR, exist_ok=True)
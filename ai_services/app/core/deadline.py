@@ -0,0 +1,91 @@
+import time
+import asyncio
+from typing import Awaitable, TypeVar
+from app.core.config import config
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a required pipeline stage has no time budget left."""
+
+
+class Deadline:
+    """
+    Time budget for a single request.
+
+    Each pipeline stage checks the remaining budget before it starts:
+    required stages raise DeadlineExceeded when the budget is gone, optional
+    stages are skipped or shortened and recorded in `degraded`.
+    """
+
+    def __init__(self, budget_seconds: float = None):
+        budget = budget_seconds if budget_seconds is not None else config.REQUEST_DEADLINE_SECONDS
+        self.budget = max(float(budget), 0.0)
+        self._expires_at = time.monotonic() + self.budget
+        self.degraded: list[str] = []
+
+    @classmethod
+    def from_header(cls, timeout_ms: str | None) -> "Deadline":
+        """
+        Build a deadline from the X-Request-Timeout-Ms header value.
+
+        Falls back to the configured default when the header is missing or
+        invalid, and never exceeds the configured maximum.
+        """
+        budget = config.REQUEST_DEADLINE_SECONDS
+        if timeout_ms:
+            try:
+                budget = min(float(timeout_ms) / 1000.0, config.REQUEST_DEADLINE_MAX_SECONDS)
+            except ValueError:
+                logger.warning(f"Ignoring invalid request timeout header: {timeout_ms}")
+        return cls(budget)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str, min_seconds: float = 0.0):
+        """Raise DeadlineExceeded if a required stage cannot start in time."""
+        remaining = self.remaining()
+        if remaining <= min_seconds:
+            raise DeadlineExceeded(
+                f"Deadline exceeded before stage '{stage}' "
+                f"({remaining:.2f}s left, {min_seconds:.2f}s needed)"
+            )
+
+    async def within(self, stage: str, awaitable: Awaitable[T]) -> T:
+        """
+        Await a required stage, cancelling it when the budget runs out.
+
+        Raises:
+            DeadlineExceeded: If the stage is still running at the deadline
+        """
+        budget = self.remaining()
+        try:
+            return await asyncio.wait_for(awaitable, budget)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Deadline exceeded during stage '{stage}' ({budget:.2f}s budget)")
+
+    def allows(self, stage: str, min_seconds: float) -> bool:
+        """
+        Check whether an optional stage fits in the remaining budget.
+
+        Records the stage as degraded when it has to be skipped.
+        """
+        if self.remaining() > min_seconds:
+            return True
+        self.degrade(stage)
+        return False
+
+    def degrade(self, stage: str):
+        """Record that a stage was skipped or shortened."""
+        if stage not in self.degraded:
+            logger.warning(f"Degrading stage '{stage}' ({self.remaining():.2f}s left)")
+            self.degraded.append(stage)
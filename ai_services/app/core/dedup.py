@@ -0,0 +1,201 @@
+import re
+import hashlib
+from collections import Counter, defaultdict
+from typing import Iterable, Iterator, Optional
+import numpy as np
+from app.core.chunking import Chunk
+from app.core.structure import StructureIndex
+from app.core.config import config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pages sampled before deciding which lines are page furniture
+FURNITURE_SAMPLE_PAGES = 8
+
+# Lines from the top and bottom of each page considered for furniture
+FURNITURE_EDGE_LINES = 6
+
+# Fraction of sampled pages a line must appear on to count as furniture
+FURNITURE_MIN_FRACTION = 0.5
+
+# Word shingle size for SimHash signatures
+SHINGLE_SIZE = 3
+
+# Chunks shorter than this (in words) are never treated as duplicates
+DEDUP_MIN_WORDS = 8
+
+_WORD = re.compile(r'\w+')
+
+
+def _normalize_line(line: str) -> str:
+    """Normalize a line so page numbers and spacing do not hide repeats."""
+    return re.sub(r'\d+', '#', " ".join(line.split()).lower())
+
+
+def _edge_lines(text: str) -> list[str]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) <= 2 * FURNITURE_EDGE_LINES:
+        return lines
+    return lines[:FURNITURE_EDGE_LINES] + lines[-FURNITURE_EDGE_LINES:]
+
+
+def _learn_furniture(pages: list[tuple[int, str]]) -> set[str]:
+    """Normalized edge lines repeated across enough distinct pages."""
+    counts = Counter()
+    for _, text in pages:
+        counts.update({_normalize_line(line) for line in _edge_lines(text)})
+    threshold = max(2, FURNITURE_MIN_FRACTION * len(pages))
+    return {line for line, count in counts.items() if count >= threshold and line}
+
+
+def _blank(text: str, furniture: set[str]) -> tuple[str, int, int]:
+    """
+    Blank furniture lines at the page edges, keeping every character offset.
+
+    Returns:
+        Tuple of (cleaned text, lines removed, characters removed)
+    """
+    edges = {_normalize_line(line) for line in _edge_lines(text)}
+    lines = text.split("\n")
+    removed_lines = removed_chars = 0
+    for i, line in enumerate(lines):
+        normalized = _normalize_line(line)
+        if normalized in furniture and normalized in edges:
+            removed_chars += len(line.strip())
+            lines[i] = " " * len(line)
+            removed_lines += 1
+    return "\n".join(lines), removed_lines, removed_chars
+
+
+def strip_furniture(pages: Iterable[tuple[int, str]], stats: dict) -> Iterator[tuple[int, str]]:
+    """
+    Remove repeated headers, footers, page numbers and cause-title lines.
+
+    The first FURNITURE_SAMPLE_PAGES pages are buffered to learn which
+    lines repeat at the top or bottom of most pages; from then on pages
+    stream through. Furniture lines are replaced by spaces rather than
+    deleted, so chunk offsets still point into the extracted text.
+    Documents without distinct pages (DOCX, TXT) pass through unchanged.
+
+    Args:
+        pages: (page_number, text) pairs in document order
+        stats: Dict updated with "boilerplate_lines" and "boilerplate_chars"
+    """
+    stats.setdefault("boilerplate_lines", 0)
+    stats.setdefault("boilerplate_chars", 0)
+    pages = iter(pages)
+
+    sample = []
+    for page in pages:
+        sample.append(page)
+        if len(sample) >= FURNITURE_SAMPLE_PAGES:
+            break
+
+    furniture = set()
+    if len({number for number, _ in sample}) >= 3:
+        furniture = _learn_furniture(sample)
+        if furniture:
+            logger.info(f"Stripping {len(furniture)} repeated header/footer lines")
+
+    def clean(number: int, text: str) -> tuple[int, str]:
+        if not furniture:
+            return number, text
+        cleaned, lines, chars = _blank(text, furniture)
+        stats["boilerplate_lines"] += lines
+        stats["boilerplate_chars"] += chars
+        return number, cleaned
+
+    for number, text in sample:
+        yield clean(number, text)
+    for number, text in pages:
+        yield clean(number, text)
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash of a text's word shingles, or None for very short texts.
+    """
+    words = [w.lower() for w in _WORD.findall(text)]
+    if len(words) < DEDUP_MIN_WORDS:
+        return None
+
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') for s in shingles],
+        dtype=np.uint64,
+    )
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0).astype(np.int64) * 2 - len(hashes)
+    return int(sum(1 << i for i in range(64) if votes[i] > 0))
+
+
+class NearDuplicateFilter:
+    """
+    Detects chunks whose SimHash is within DEDUP_MAX_HAMMING bits of an
+    earlier chunk of the same document.
+
+    Signatures are split into bands so candidates are found by exact band
+    lookup: with 4 bands of 16 bits, any two signatures within 3 bits
+    share at least one band.
+    """
+
+    BANDS = 4
+    BAND_BITS = 16
+
+    def __init__(self, max_distance: int = None):
+        self.max_distance = max_distance if max_distance is not None else config.DEDUP_MAX_HAMMING
+        self._signatures: dict[int, int] = {}
+        self._bands: list[dict[int, list[int]]] = [defaultdict(list) for _ in range(self.BANDS)]
+
+    def _band_values(self, signature: int) -> list[int]:
+        mask = (1 << self.BAND_BITS) - 1
+        return [(signature >> (band * self.BAND_BITS)) & mask for band in range(self.BANDS)]
+
+    def check(self, chunk_id: int, text: str) -> Optional[int]:
+        """
+        Return the id of an earlier near-duplicate of text, or None after
+        recording text as chunk_id.
+        """
+        signature = simhash(text)
+        if signature is None:
+            return None
+
+        bands = self._band_values(signature)
+        for band, value in enumerate(bands):
+            for candidate in self._bands[band].get(value, ()):
+                if bin(signature ^ self._signatures[candidate]).count("1") <= self.max_distance:
+                    return candidate
+
+        self._signatures[chunk_id] = signature
+        for band, value in enumerate(bands):
+            self._bands[band][value].append(chunk_id)
+        return None
+
+
+def drop_near_duplicates(
+    chunks: Iterable[Chunk],
+    duplicates: list,
+    structure: Optional[StructureIndex] = None,
+) -> Iterator[Chunk]:
+    """
+    Filter near-duplicate chunks out of a chunk stream.
+
+    Kept chunks are numbered in order, matching the ids the index writer
+    assigns them. Each dropped chunk is appended to duplicates as
+    [start, end, page_start, page_end, kept_chunk_id], so text rebuilt from
+    the index (FAISSStore.reconstruct_text) still covers the dropped span,
+    and its section headings and references are added to structure under
+    kept_chunk_id, so structural lookups still find it.
+    """
+    near_duplicates = NearDuplicateFilter()
+    kept = 0
+    for chunk in chunks:
+        original = near_duplicates.check(kept, chunk.text)
+        if original is not None:
+            duplicates.append([chunk.start, chunk.end, chunk.page_start, chunk.page_end, original])
+            if structure is not None:
+                structure.add(original, chunk.text)
+            continue
+        kept += 1
+        yield chunk
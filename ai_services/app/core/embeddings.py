@@ -1,3 +1,4 @@
+import threading
 from sentence_transformers import SentenceTransformer
 from app.core.config import config
 import logging
@@ -7,6 +8,9 @@ logger = logging.getLogger(__name__)
 # Global model instance (loaded once)
 _embedding_model: SentenceTransformer = None
 
+# encode() runs the model's fast tokenizer, which is not safe to call from several threads at once
+_encode_lock = threading.Lock()
+
 
 def get_embedding_model() -> SentenceTransformer:
     """Load and cache the embedding model."""
@@ -20,6 +24,13 @@ def get_embedding_model() -> SentenceTransformer:
     return _embedding_model
 
 
+def encode(texts: list[str], **kwargs):
+    """Run the embedding model on texts; the one entry point to model.encode (see _encode_lock)."""
+    model = get_embedding_model()
+    with _encode_lock:
+        return model.encode(texts, show_progress_bar=False, **kwargs)
+
+
 def embed_texts(texts: list[str], batch_size: int = 16) -> list[list[float]]:
     """
     Convert text chunks to dense vectors.
@@ -31,16 +42,19 @@ def embed_texts(texts: list[str], batch_size: int = 16) -> list[list[float]]:
     Returns:
         List of embedding vectors
     """
-    model = get_embedding_model()
-    
     logger.info(f"Embedding {len(texts)} texts")
-    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+    embeddings = encode(texts, batch_size=batch_size)
     
     return embeddings.tolist()
 
 
 def embed_query(query: str) -> list[float]:
     """Embed a single query string."""
-    model = get_embedding_model()
-    embedding = model.encode([query], show_progress_bar=False)[0]
+    embedding = encode([query])[0]
     return embedding.tolist()
+
+
+def embed_queries(queries: list[str], batch_size: int = 16) -> list[list[float]]:
+    """Embed several query strings in one batched encode call."""
+    embeddings = encode(queries, batch_size=batch_size)
+    return embeddings.tolist()
@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Queue markers: end of stream, and an upstream failure to re-raise downstream
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class Pipeline:
+    """
+    Producer/consumer pipeline of generator stages running in threads.
+
+    Each stage is a function taking an iterator of inputs (nothing for the
+    first stage) and yielding outputs. Stages are connected by bounded
+    queues, so a fast stage blocks instead of buffering ahead, and all
+    stages work concurrently: end-to-end time approaches that of the
+    slowest stage. An exception in any stage stops the others and is
+    re-raised to the consumer.
+
+    Example:
+        pipeline = Pipeline(queue_depth=4)
+        pipeline.add_stage("extract", lambda: iter_pages(path))
+        pipeline.add_stage("chunk", iter_chunks)
+        for chunk in pipeline.run():
+            ...
+    """
+
+    def __init__(self, queue_depth: int = 4):
+        self.queue_depth = queue_depth
+        self.seconds: dict[str, float] = {}  # Busy time per stage, excluding queue waits
+        self._stages: list[tuple[str, Callable]] = []
+        self._stop = threading.Event()
+
+    def add_stage(self, name: str, fn: Callable[..., Iterable]):
+        self._stages.append((name, fn))
+        self.seconds[name] = 0.0
+
+    def _put(self, outbox: queue.Queue, item):
+        while not self._stop.is_set():
+            try:
+                outbox.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Cancelled()
+
+    def _drain(self, inbox: queue.Queue, waits: list) -> Iterator:
+        """Yield items from a queue until end of stream, re-raising upstream failures."""
+        while True:
+            started = time.perf_counter()
+            while True:
+                if self._stop.is_set():
+                    raise _Cancelled()
+                try:
+                    item = inbox.get(timeout=0.1)
+                    break
+                except queue.Empty:
+                    continue
+            waits[0] += time.perf_counter() - started
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+
+    def _run_stage(self, name: str, fn: Callable, inbox: queue.Queue, outbox: queue.Queue):
+        waits = [0.0]
+        busy = 0.0
+        try:
+            outputs = iter(fn(self._drain(inbox, waits)) if inbox is not None else fn())
+            while True:
+                started = time.perf_counter()
+                waited = waits[0]
+                try:
+                    item = next(outputs)
+                except StopIteration:
+                    busy += time.perf_counter() - started - (waits[0] - waited)
+                    break
+                busy += time.perf_counter() - started - (waits[0] - waited)
+                self._put(outbox, item)
+            self._put(outbox, _DONE)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            logger.error(f"Pipeline stage '{name}' failed: {e}")
+            try:
+                self._put(outbox, _Failed(e))
+            except _Cancelled:
+                pass
+        finally:
+            self.seconds[name] = round(busy, 3)
+
+    def run(self) -> Iterator:
+        """Start every stage and yield the outputs of the last one."""
+        inbox = None
+        threads = []
+        for name, fn in self._stages:
+            outbox = queue.Queue(maxsize=self.queue_depth)
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(name, fn, inbox, outbox),
+                name=f"pipeline-{name}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+            inbox = outbox
+
+        try:
+            yield from self._drain(inbox, [0.0])
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,140 @@
+import re
+import threading
+from collections import defaultdict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Structural unit names and their abbreviations
+_KINDS = {
+    "section": "section", "sec": "section", "s": "section",
+    "article": "article", "art": "article",
+    "clause": "clause", "cl": "clause",
+    "schedule": "schedule",
+    "rule": "rule",
+    "regulation": "regulation", "reg": "regulation",
+    "paragraph": "paragraph", "para": "paragraph",
+}
+# Plurals ("Sections 3 and 4", "ss. 3, 4") map to the same kinds
+_KINDS.update({name + "s": kind for name, kind in list(_KINDS.items())})
+
+# Numbers with optional letter suffix and sub-clauses ("498A", "14.2"), or upper-case roman numerals
+_IDENTIFIER = r'(\d+[A-Za-z]{0,3}(?:\.\d+[A-Za-z]?)*|[IVXLC]+)\b'
+
+# "Section 498A", "cl. 14.2", "s. 302", "Schedule II" anywhere in text or queries, and
+# lists under a plural or singular name: "Sections 3 and 4", "Articles 14, 19 and 21"
+_REFERENCE = re.compile(
+    r'\b((?i:sections?|secs?|articles?|arts?|clauses?|cls?|schedules?|rules?|regulations?|regs?'
+    r'|paragraphs?|paras?)\.?|[sS]{1,2}\.)\s*'
+    r'(' + _IDENTIFIER + r'(?:(?:[ \t]*,[ \t]*(?:(?:and|or|&)[ \t]+)?|[ \t]+(?:and|or|&)[ \t]+)' + _IDENTIFIER + r')*)'
+)
+
+_LIST_ITEM = re.compile(_IDENTIFIER)
+
+# Headings at the start of a line: "Section 14 - ...", "SCHEDULE II"
+_KIND_HEADING = re.compile(
+    r'^[ \t]*((?i:section|article|clause|schedule|rule|regulation|paragraph))\s+' + _IDENTIFIER,
+    re.MULTILINE,
+)
+
+# Numbered headings at the start of a line followed by a title on the same line:
+# "14.2 Termination", "498A. Husband or relative", "7 - Notices". At most three
+# digits, so year lines ("2019 (3) SCC 45") and bare page numbers do not count,
+# and the title must be a capitalized word, not an all-caps running header.
+_NUMBERED_HEADING = re.compile(
+    r'^[ \t]*(\d{1,3}[A-Z]{0,3}(?:\.\d+)*)(?:[.)]|[ \t]+[-\u2013\u2014])?[ \t]+(?=[A-Z][a-z]+\b)',
+    re.MULTILINE,
+)
+
+# Kinds that numbered headings can stand in for
+_NUMBERED_KINDS = {"section", "article", "clause", "rule", "regulation", "paragraph"}
+
+
+def _key(kind: str, identifier: str) -> str:
+    return f"{_KINDS[kind.lower().rstrip('.')]}:{identifier.lower()}"
+
+
+def find_references(text: str) -> list[str]:
+    """
+    Find structural references such as "Section 498A", "clause 14.2" or
+    "Sections 3 and 4".
+
+    Returns:
+        Normalized keys like "section:498a", in order of first appearance
+    """
+    keys = []
+    for match in _REFERENCE.finditer(text):
+        kind = match.group(1)
+        identifiers = [item.group(1) for item in _LIST_ITEM.finditer(match.group(2))]
+        numeric = identifiers[0][0].isdigit()
+        # "s." and "ss." only count as section abbreviations before a number
+        if kind.lower() in ("s.", "ss.") and not numeric:
+            continue
+        for identifier in identifiers:
+            # A list continues with identifiers of the same style ("Section 5, I think" is not Section I)
+            if identifier[0].isdigit() != numeric:
+                break
+            key = _key(kind, identifier)
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+class StructureIndex:
+    """
+    Maps section, article, clause and schedule identifiers to chunk ids.
+
+    Headings (identifiers at the start of a line) are recorded as
+    definitions; other occurrences are recorded as mentions. Text dropped
+    as a near-duplicate is added under the id of the chunk kept in its
+    place, so add() may be called from the chunking thread while the index
+    writer adds kept chunks.
+    """
+
+    def __init__(self, definitions: dict = None, mentions: dict = None):
+        self.definitions: dict[str, list[int]] = defaultdict(list, definitions or {})
+        self.mentions: dict[str, list[int]] = defaultdict(list, mentions or {})
+        self._lock = threading.Lock()
+
+    def add(self, chunk_id: int, text: str):
+        """Record the structural identifiers found in one chunk."""
+        defined = set()
+        for match in _KIND_HEADING.finditer(text):
+            defined.add(_key(match.group(1), match.group(2)))
+        for match in _NUMBERED_HEADING.finditer(text):
+            defined.add(f"number:{match.group(1).lower()}")
+        mentioned = [key for key in find_references(text) if key not in defined]
+
+        with self._lock:
+            for key in defined:
+                if chunk_id not in self.definitions[key]:
+                    self.definitions[key].append(chunk_id)
+            for key in mentioned:
+                if chunk_id not in self.mentions[key]:
+                    self.mentions[key].append(chunk_id)
+
+    def lookup(self, key: str, max_mentions: int = 5) -> list[int]:
+        """
+        Chunk ids for a reference key: its definition chunks if known, else
+        numbered headings with the same identifier, else the first
+        max_mentions mentions (none when max_mentions is 0).
+        """
+        if self.definitions.get(key):
+            return self.definitions[key]
+
+        kind, identifier = key.split(":", 1)
+        if kind in _NUMBERED_KINDS and self.definitions.get(f"number:{identifier}"):
+            return self.definitions[f"number:{identifier}"]
+
+        return self.mentions.get(key, [])[:max_mentions]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "definitions": {key: sorted(ids) for key, ids in self.definitions.items()},
+                "mentions": {key: sorted(ids) for key, ids in self.mentions.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StructureIndex":
+        return cls(data.get("definitions"), data.get("mentions"))
@@ -1,10 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.ingest import ingest_document, IngestRequest, IngestResponse
-from app.api.summarize import summarize, SummarizeRequest, SummarizeResponse
-from app.api.query import query_document, QueryRequest, QueryResponse
-from app.api.scrape import scrape_context, ScrapeRequest, ScrapeResponse
+from app.api.ingest import ingest_document, delete_document_index, IngestRequest, IngestResponse
+from app.api.bulk_ingest import bulk_ingest, BulkIngestRequest, BulkIngestResponse
+from app.api.ingest_jobs import (
+    submit_ingest_job, get_ingest_job, IngestJobResponse, QueueFull, ingest_jobs,
+)
+from app.api.summarize import (
+    summarize, SummarizeRequest, SummarizeResponse,
+    summarize_batch, BatchSummarizeRequest,
+    summarize_stream, DocumentNotFound,
+)
+from app.api.query import (
+    query_document, QueryRequest, QueryResponse,
+    query_document_batch, BatchQueryRequest, BatchQueryResponse,
+)
+from app.api.scrape import scrape_context, scrape_stats, ScrapeRequest, ScrapeResponse
+from app.scraping.http_client import http_client
 from app.core.config import config
+from app.core.deadline import Deadline, DeadlineExceeded
 import logging
 import time
 
@@ -35,6 +50,18 @@ app.add_middleware(
 _start_time = time.time()
 
 
+@app.on_event("startup")
+async def resume_ingest_jobs():
+    """Re-queue ingest jobs interrupted by the last shutdown."""
+    ingest_jobs.resume()
+
+
+@app.on_event("shutdown")
+async def close_scrape_client():
+    """Close pooled scraper connections."""
+    await http_client.aclose()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -56,26 +83,120 @@ async def ingest(request: IngestRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ingest/bulk", response_model=BulkIngestResponse)
+async def ingest_bulk(request: BulkIngestRequest):
+    """Ingest a directory or manifest of documents with shared embedding batches."""
+    try:
+        return await bulk_ingest(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Bulk ingest error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/ingest/jobs", response_model=IngestJobResponse, status_code=202)
+async def ingest_async(request: IngestRequest):
+    """Queue a document for background ingestion; poll /ingest/{job_id} for progress."""
+    try:
+        return await submit_ingest_job(request)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        logger.error(f"Ingest job submit error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/ingest/{job_id}", response_model=IngestJobResponse)
+async def ingest_status(job_id: str):
+    """Report stage, progress and timings of an ingest job."""
+    job = await get_ingest_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingest job not found: {job_id}")
+    return job
+
+
+@app.delete("/documents/{document_id}/index")
+async def delete_index(document_id: str):
+    """Delete a document's index; shared content indexes go once nothing references them."""
+    try:
+        deleted = await delete_document_index(document_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Index delete error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"No index for document: {document_id}")
+    return {"documentId": document_id, "deleted": True}
+
+
 @app.post("/summarize", response_model=SummarizeResponse)
 async def create_summary(request: SummarizeRequest):
     """Generate legal summary of document."""
     try:
         return await summarize(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DocumentNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Summarization error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/summarize/stream")
+async def create_summary_stream(request: SummarizeRequest):
+    """Generate legal summary, streaming bullet points over SSE as they are decoded."""
+    return StreamingResponse(
+        summarize_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/summarize/batch")
+async def create_summaries(request: BatchSummarizeRequest):
+    """Summarize many documents, streaming NDJSON results as each finishes."""
+    return StreamingResponse(summarize_batch(request), media_type="application/x-ndjson")
+
+
 @app.post("/query", response_model=QueryResponse)
-async def query(request: QueryRequest):
+async def query(
+    request: QueryRequest,
+    x_request_timeout_ms: str | None = Header(default=None),
+):
     """Execute RAG query against document index."""
     try:
-        return await query_document(request)
+        deadline = Deadline.from_header(x_request_timeout_ms)
+        return await query_document(request, deadline=deadline)
+    except DeadlineExceeded as e:
+        logger.error(f"Query deadline exceeded: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"Query error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def query_batch(
+    request: BatchQueryRequest,
+    x_request_timeout_ms: str | None = Header(default=None),
+):
+    """Answer several questions against one document with a single LLM call."""
+    try:
+        deadline = Deadline.from_header(x_request_timeout_ms)
+        return await query_document_batch(request, deadline=deadline)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DeadlineExceeded as e:
+        logger.error(f"Batch query deadline exceeded: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch query error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/scrape", response_model=ScrapeResponse)
 async def scrape(request: ScrapeRequest):
     """Scrape external explanation for a legal term."""
@@ -86,6 +207,13 @@ async def scrape(request: ScrapeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/scrape/stats")
+async def get_scrape_stats():
+    """Rate limiter, cache and circuit breaker state for the scrapers."""
+    # Counting cache rows is a SQLite query
+    return await run_in_threadpool(scrape_stats)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5000)
@@ -0,0 +1,160 @@
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from app.core.config import config
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Per-hash ingest locks are striped over this many byte-range locks, so lock state stays bounded
+HASH_LOCK_STRIPES = 1024
+
+
+def hash_file(filepath: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocumentRegistry:
+    """
+    Content-hash registry of ingested documents.
+
+    Maps the SHA-256 of a document's bytes, and of its extracted text, to
+    the content-addressed index built for it, so an identical upload can
+    reference that index instead of being embedded again. The registry is
+    a single JSON file in config.VECTOR_INDEXES, rewritten atomically.
+
+    Several worker processes share the file: updates re-read it and write
+    it back under an exclusive fcntl lock on `registry.json.lock`, and
+    lookups reload it whenever another process has replaced it. Per-hash
+    ingest locks are byte-range locks on `registry.json.hashlocks`, one
+    byte per stripe, combined with a thread lock per stripe in-process.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(config.VECTOR_INDEXES, "registry.json")
+        self._lock = threading.Lock()
+        self._stripe_locks = [threading.Lock() for _ in range(HASH_LOCK_STRIPES)]
+        self._stamp = None  # (inode, mtime_ns, size) of the registry file last read
+        self._hash_lock_fd = None
+        if fcntl is None:
+            logger.warning("fcntl is unavailable; the document registry is per process")
+        else:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Kept open for the process lifetime: closing any descriptor of a file drops its byte-range locks
+            self._hash_lock_fd = os.open(f"{self.path}.hashlocks", os.O_RDWR | os.O_CREAT, 0o644)
+        self._data = self._read()
+
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read(self) -> dict:
+        self._stamp = self._file_stamp()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        for section in ("bytes", "text", "contents"):
+            data.setdefault(section, {})
+        return data
+
+    def _write(self):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._file_stamp()
+
+    def _refresh(self):
+        """Reload the registry if another process replaced it (caller holds self._lock)."""
+        if self._file_stamp() != self._stamp:
+            self._data = self._read()
+
+    @contextmanager
+    def _update(self):
+        """Read-modify-write of the registry file, exclusive across processes."""
+        with self._lock:
+            fd = None
+            if fcntl is not None:
+                fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                self._data = self._read()
+                yield self._data
+                self._write()
+            finally:
+                if fd is not None:
+                    os.close(fd)
+
+    @contextmanager
+    def lock(self, content_hash: str):
+        """
+        Lock held while a document with this hash is ingested, so concurrent
+        duplicates (in any worker process) wait and reuse.
+        """
+        stripe = int(content_hash[:8], 16) % HASH_LOCK_STRIPES
+        with self._stripe_locks[stripe]:
+            if self._hash_lock_fd is None:
+                yield
+                return
+            fcntl.lockf(self._hash_lock_fd, fcntl.LOCK_EX, 1, stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._hash_lock_fd, fcntl.LOCK_UN, 1, stripe)
+
+    def find(self, bytes_hash: str = None, text_hash: str = None) -> Optional[str]:
+        """Content id registered for a bytes or text hash, if any."""
+        with self._lock:
+            self._refresh()
+            if bytes_hash and bytes_hash in self._data["bytes"]:
+                return self._data["bytes"][bytes_hash]
+            if text_hash and text_hash in self._data["text"]:
+                return self._data["text"][text_hash]
+        return None
+
+    def metadata(self, content_id: str) -> dict:
+        """Stored ingest stats (chunks, pages, truncatedChunks) for a content id."""
+        with self._lock:
+            self._refresh()
+            return dict(self._data["contents"].get(content_id, {}))
+
+    def register(self, content_id: str, bytes_hash: str, text_hash: str = None, **metadata):
+        """Record the hashes and ingest stats of a content-addressed index."""
+        with self._update() as data:
+            data["bytes"][bytes_hash] = content_id
+            if text_hash:
+                data["text"].setdefault(text_hash, content_id)
+            if metadata:
+                data["contents"].setdefault(content_id, {}).update(metadata)
+
+    def forget(self, content_id: str):
+        """Drop every hash pointing at a content id whose index is gone or being deleted."""
+        with self._update() as data:
+            for section in ("bytes", "text"):
+                stale = [h for h, target in data[section].items() if target == content_id]
+                for content_hash in stale:
+                    del data[section][content_hash]
+            data["contents"].pop(content_id, None)
+        logger.info(f"Removed registry entries for {content_id}")
+
+
+# Global instance
+document_registry = DocumentRegistry()
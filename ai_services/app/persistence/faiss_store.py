@@ -1,19 +1,85 @@
 import os
+import shutil
 import faiss
 import numpy as np
 from typing import List, Tuple
 from app.core.config import config
+from app.core.structure import StructureIndex
 import logging
 import pickle
+import json
 
 logger = logging.getLogger(__name__)
 
+# Directory under VECTOR_INDEXES holding content-addressed indexes shared through refs
+CONTENT_DIR = "_content"
+
+
+class IndexWriter:
+    """
+    Incrementally builds a FAISS index from embedding batches.
+
+    The index is created on the first batch (when the dimension is known)
+    and written to disk with its chunks, chunk spans and structural index
+    on close(). Until then everything added is held in memory: the flat
+    index's vectors, the chunk texts and their spans.
+    """
+
+    def __init__(self, store: "FAISSStore", document_id: str):
+        self.store = store
+        self.document_id = document_id
+        self.index = None
+        self.chunks: List[str] = []
+        self.spans: List[list] = []  # [start, end, page_start, page_end] per chunk
+        self.duplicates: List[list] = []  # [start, end, page_start, page_end, kept_chunk_id] per dropped chunk
+        self.structure = StructureIndex()
+
+    def add(self, embeddings: List[List[float]], chunks: List[str], spans: List[list] = None):
+        """Add a batch of embeddings with their chunk texts and optional spans."""
+        if not chunks:
+            return
+        embeddings_array = np.array(embeddings).astype('float32')
+        if self.index is None:
+            self.index = faiss.IndexFlatL2(embeddings_array.shape[1])
+        self.index.add(embeddings_array)
+        for offset, chunk in enumerate(chunks):
+            self.structure.add(len(self.chunks) + offset, chunk)
+        self.chunks.extend(chunks)
+        self.spans.extend(spans or [None] * len(chunks))
+
+    def close(self) -> str:
+        """Write the index, chunks and spans; returns the index path."""
+        if self.index is None:
+            raise ValueError(f"No text could be indexed for document {self.document_id}")
+
+        index_dir = os.path.join(config.VECTOR_INDEXES, self.document_id)
+        os.makedirs(index_dir, exist_ok=True)
+        index_path = os.path.join(index_dir, "index.faiss")
+
+        faiss.write_index(self.index, index_path)
+        with open(os.path.join(index_dir, "chunks.pkl"), 'wb') as f:
+            pickle.dump(self.chunks, f)
+        with open(os.path.join(index_dir, "spans.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.spans, f)
+        with open(os.path.join(index_dir, "structure.json"), 'w', encoding='utf-8') as f:
+            json.dump(self.structure.to_dict(), f)
+        if self.duplicates:
+            with open(os.path.join(index_dir, "duplicates.json"), 'w', encoding='utf-8') as f:
+                json.dump(self.duplicates, f)
+
+        # Drop any stale cached copies
+        self.store._indexes.pop(index_path, None)
+        self.store._structures.pop(index_path, None)
+        logger.info(f"Created FAISS index at {index_path} with {len(self.chunks)} chunks")
+        return index_path
+
 
 class FAISSStore:
     """FAISS vector store manager."""
 
     def __init__(self):
         self._indexes = {}  # Cache for loaded indexes
+        self._structures = {}  # Cache for loaded structural indexes
 
     def create_index(self, embeddings: List[List[float]], chunks: List[str], document_id: str) -> str:
         """
@@ -49,25 +115,215 @@ class FAISSStore:
         logger.info(f"Created FAISS index at {index_path} with {len(chunks)} chunks")
         return index_path
 
+    def open_writer(self, document_id: str) -> IndexWriter:
+        """Start an incremental index build for a document."""
+        return IndexWriter(self, document_id)
+
+    @staticmethod
+    def content_index_path(content_id: str) -> str:
+        """Path of the index.faiss for a content-addressed index."""
+        return os.path.join(config.VECTOR_INDEXES, CONTENT_DIR, content_id, "index.faiss")
+
+    def write_ref(self, document_id: str, content_id: str, content_hash: str = None) -> str:
+        """
+        Point a document at a content-addressed index instead of copying it.
+
+        Args:
+            document_id: Document directory name
+            content_id: Content id of the shared index
+            content_hash: SHA-256 of this document's own bytes, if known
+
+        Returns:
+            The document's own index path, which load_index resolves
+            through ref.json
+        """
+        index_dir = os.path.join(config.VECTOR_INDEXES, document_id)
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, "ref.json"), 'w', encoding='utf-8') as f:
+            json.dump({"contentId": content_id, "contentHash": content_hash or content_id}, f)
+        return os.path.join(index_dir, "index.faiss")
+
+    def read_ref(self, document_id: str) -> dict:
+        """Return a document's ref.json ({contentId, contentHash}), or None if it has none."""
+        ref_path = os.path.join(config.VECTOR_INDEXES, document_id, "ref.json")
+        if not os.path.exists(ref_path):
+            return None
+        with open(ref_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def referenced_content_ids(self) -> set:
+        """Content ids that some document's ref.json still points at."""
+        referenced = set()
+        for entry in os.scandir(config.VECTOR_INDEXES):
+            if entry.name == CONTENT_DIR or not entry.is_dir():
+                continue
+            try:
+                ref = self.read_ref(entry.name)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if ref:
+                referenced.add(ref["contentId"])
+        return referenced
+
+    def _forget_loaded(self, index_dir: str):
+        """Drop cached copies of indexes loaded from (or through) a directory."""
+        for cache in (self._indexes, self._structures):
+            for index_path in [p for p in cache if os.path.dirname(p) == index_dir]:
+                cache.pop(index_path, None)
+
+    def delete_document(self, document_id: str) -> bool:
+        """
+        Remove a document's index directory (its ref.json, or a legacy index).
+
+        Returns:
+            True if the document had an index directory
+        """
+        index_dir = os.path.join(config.VECTOR_INDEXES, document_id)
+        self._forget_loaded(index_dir)
+        if not os.path.isdir(index_dir):
+            return False
+        shutil.rmtree(index_dir, ignore_errors=True)
+        logger.info(f"Deleted index directory of document {document_id}")
+        return True
+
+    def delete_content_index(self, content_id: str):
+        """Remove a content-addressed index; callers check that no ref.json points at it."""
+        index_dir = os.path.dirname(self.content_index_path(content_id))
+        self._forget_loaded(index_dir)
+        shutil.rmtree(index_dir, ignore_errors=True)
+        logger.info(f"Deleted unreferenced content index {content_id}")
+
+    def resolve_index_path(self, index_path: str) -> str:
+        """Follow a document's ref.json to the shared index it references, if it has one."""
+        if os.path.exists(index_path):
+            return index_path
+        ref_path = os.path.join(os.path.dirname(index_path), "ref.json")
+        if not os.path.exists(ref_path):
+            return index_path
+        with open(ref_path, 'r', encoding='utf-8') as f:
+            return self.content_index_path(json.load(f)["contentId"])
+
+    def load_spans(self, index_path: str) -> List[list]:
+        """
+        Load chunk spans ([start, end, page_start, page_end] per chunk).
+
+        Indexes built before spans were recorded return an empty list.
+        """
+        spans_path = os.path.join(os.path.dirname(self.resolve_index_path(index_path)), "spans.json")
+        if not os.path.exists(spans_path):
+            return []
+        with open(spans_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_duplicates(self, index_path: str) -> List[list]:
+        """
+        Load the spans of near-duplicate chunks dropped at ingest, each
+        [start, end, page_start, page_end, kept_chunk_id].
+
+        Indexes built without deduplication return an empty list.
+        """
+        duplicates_path = os.path.join(os.path.dirname(self.resolve_index_path(index_path)), "duplicates.json")
+        if not os.path.exists(duplicates_path):
+            return []
+        with open(duplicates_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_structure(self, index_path: str) -> StructureIndex:
+        """
+        Load the structural (section/clause) index for a document.
+
+        Indexes built before structure was recorded return an empty index.
+        """
+        if index_path in self._structures:
+            return self._structures[index_path]
+
+        structure_path = os.path.join(os.path.dirname(self.resolve_index_path(index_path)), "structure.json")
+        if os.path.exists(structure_path):
+            with open(structure_path, 'r', encoding='utf-8') as f:
+                structure = StructureIndex.from_dict(json.load(f))
+        else:
+            structure = StructureIndex()
+
+        self._structures[index_path] = structure
+        return structure
+
+    def lookup_structure(self, index_path: str, keys: List[str], max_mentions: int = 5) -> List[Tuple[int, str]]:
+        """
+        Return (chunk_id, chunk_text) for chunks matching structural reference keys.
+
+        Args:
+            index_path: Path to the FAISS index
+            keys: Reference keys from find_references
+            max_mentions: Mention chunks used per key without a heading;
+                0 returns heading (definition) matches only
+        """
+        structure = self.load_structure(index_path)
+        chunk_ids = []
+        for key in keys:
+            for chunk_id in structure.lookup(key, max_mentions=max_mentions):
+                if chunk_id not in chunk_ids:
+                    chunk_ids.append(chunk_id)
+        if not chunk_ids:
+            return []
+
+        _, chunks = self.load_index(index_path)
+        return [(chunk_id, chunks[chunk_id]) for chunk_id in chunk_ids if chunk_id < len(chunks)]
+
+    def reconstruct_text(self, index_path: str) -> str:
+        """
+        Rebuild a document's text from its stored chunks.
+
+        With spans, overlapping chunk text is emitted once in document
+        order and gaps left by stripped whitespace become newlines. Spans
+        of near-duplicate chunks dropped at ingest are filled with the text
+        of the chunk kept in their place, so repeated passages are not lost.
+        Indexes without spans fall back to joining the chunks, which
+        repeats the overlaps.
+        """
+        _, chunks = self.load_index(index_path)
+        spans = self.load_spans(index_path)
+        if len(spans) != len(chunks) or any(span is None for span in spans):
+            logger.warning(f"No chunk spans for {index_path}; text will repeat chunk overlaps")
+            return "\n\n".join(chunks)
+
+        pieces = [(span[0], span[1], chunk) for span, chunk in zip(spans, chunks)]
+        pieces.extend(
+            (start, stop, chunks[kept_chunk_id])
+            for start, stop, _, _, kept_chunk_id in self.load_duplicates(index_path)
+            if kept_chunk_id < len(chunks)
+        )
+
+        parts = []
+        end = 0
+        for start, stop, chunk in sorted(pieces, key=lambda item: item[0]):
+            if stop <= end:
+                continue
+            if parts and start > end:
+                parts.append("\n")
+            parts.append(chunk[max(end - start, 0):])
+            end = stop
+        return "".join(parts)
+
     def load_index(self, index_path: str) -> Tuple[faiss.Index, List[str]]:
         """Load FAISS index and associated chunks."""
         if index_path in self._indexes:
             return self._indexes[index_path]
 
-        if not os.path.exists(index_path):
+        resolved_path = self.resolve_index_path(index_path)
+        if not os.path.exists(resolved_path):
             raise FileNotFoundError(f"Index not found: {index_path}")
 
-        index = faiss.read_index(index_path)
+        index = faiss.read_index(resolved_path)
         
         # Load chunks
-        index_dir = os.path.dirname(index_path)
+        index_dir = os.path.dirname(resolved_path)
         chunks_path = os.path.join(index_dir, "chunks.pkl")
         
         with open(chunks_path, 'rb') as f:
             chunks = pickle.load(f)
 
         self._indexes[index_path] = (index, chunks)
-        logger.info(f"Loaded FAISS index from {index_path}")
+        logger.info(f"Loaded FAISS index from {resolved_path}")
         
         return index, chunks
 
@@ -101,6 +357,39 @@ class FAISSStore:
         logger.info(f"Retrieved {len(results)} chunks from FAISS")
         return results
 
+    def search_batch(
+        self,
+        index_path: str,
+        query_embeddings: List[List[float]],
+        k: int = 5
+    ) -> List[List[Tuple[int, str, float]]]:
+        """
+        Search for top-k similar chunks for several queries in one FAISS call.
+        
+        Args:
+            index_path: Path to FAISS index
+            query_embeddings: Query vectors
+            k: Number of results per query
+        
+        Returns:
+            Per-query lists of (chunk_id, chunk_text, distance) tuples
+        """
+        index, chunks = self.load_index(index_path)
+
+        query_vectors = np.array(query_embeddings).astype('float32')
+        distances, indices = index.search(query_vectors, k)
+
+        results = []
+        for row_distances, row_indices in zip(distances, indices):
+            results.append([
+                (int(idx), chunks[idx], float(dist))
+                for dist, idx in zip(row_distances, row_indices)
+                if 0 <= idx < len(chunks)
+            ])
+
+        logger.info(f"Retrieved chunks for {len(results)} queries from FAISS")
+        return results
+
 
 # Global instance
 faiss_store = FAISSStore()
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    Directory of JSON entries with least-recently-used eviction.
+
+    Each entry is `<key>.json`, written atomically. Reads touch the file,
+    so modification time orders eviction. A running size estimate is kept
+    per process; the directory is only scanned when the estimate passes
+    max_bytes (or has not been taken yet), and entries older than
+    max_age_seconds are dropped during that scan.
+
+    Subclasses provide the key scheme and entry layout.
+    """
+
+    name = "file"  # Used in log messages
+
+    def __init__(self, cache_dir: str, max_bytes: int, max_age_seconds: Optional[float] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._approx_bytes = None  # Running size estimate; a full scan only happens when it is exceeded
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        """Delete a file another process may already have removed; True once it is gone."""
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logger.warning(f"Could not remove cache file {path}: {e}")
+            return False
+
+    def _load(self, key: str) -> Optional[dict]:
+        """Read an entry and mark it recently used, or None if missing."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # Touch the file so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _tmp_path(self, key: str) -> str:
+        """Private path an entry is written to before _commit moves it into place."""
+        return f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _store(self, key: str, data: dict):
+        """Write an entry atomically and evict if the cache is over its size limit."""
+        tmp_path = self._tmp_path(key)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        self._commit(key, tmp_path)
+
+    def _commit(self, key: str, tmp_path: str):
+        """Move a fully written temporary file into place as the entry for key."""
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+            over_limit = self._approx_bytes is None or self._approx_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def _discard(self, key: str):
+        """Remove one entry."""
+        self._remove(self._path(key))
+
+    def evict(self) -> int:
+        """
+        Delete expired entries, then least recently used ones until the cache fits max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            total = 0
+            removed = 0
+            for entry in os.scandir(self.cache_dir):
+                if not (entry.is_file() and entry.name.endswith(".json")):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if self.max_age_seconds is not None and now - stat.st_mtime > self.max_age_seconds:
+                    removed += self._remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            if total > self.max_bytes:
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.max_bytes:
+                        break
+                    if self._remove(path):
+                        removed += 1
+                        total -= size
+
+            self._approx_bytes = total
+
+        if removed:
+            logger.info(f"Evicted {removed} {self.name} cache entries")
+        return removed
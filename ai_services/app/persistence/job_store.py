@@ -0,0 +1,98 @@
+import os
+import json
+import threading
+from typing import Optional
+from app.core.config import config
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """
+    Persists ingest job records as one JSON file per job.
+
+    Files live in config.INGEST_JOBS_DIR and are replaced atomically, so a
+    crash mid-write never leaves a truncated record behind. The process
+    running a job holds an exclusive fcntl lock on its `<job_id>.lock`
+    file; the kernel drops the lock when that process exits, so a job is
+    claimable again exactly when nobody is running it.
+    """
+
+    def __init__(self, jobs_dir: str = None):
+        self.jobs_dir = jobs_dir or config.INGEST_JOBS_DIR
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        if fcntl is None:
+            logger.warning("fcntl is unavailable; ingest job claims are per process")
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _lock_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.lock")
+
+    def claim(self, job_id: str) -> Optional[int]:
+        """
+        Take the job's lock without waiting.
+
+        Returns:
+            A descriptor to pass to release(), or None if another process
+            (or another claim in this one) holds the job
+        """
+        fd = os.open(self._lock_path(job_id), os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return fd
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def release(self, fd: int):
+        """Drop a claim taken with claim()."""
+        os.close(fd)
+
+    def delete(self, job_id: str):
+        """Remove a job record and its lock file."""
+        for path in (self._path(job_id), self._lock_path(job_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def save(self, job: dict):
+        """Write a job record."""
+        path = self._path(job["id"])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def load(self, job_id: str) -> Optional[dict]:
+        """Read a job record, or None if it does not exist."""
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def load_all(self) -> list[dict]:
+        """Read every stored job record, oldest submission first."""
+        jobs = []
+        for entry in os.scandir(self.jobs_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                job = self.load(entry.name[:-len(".json")])
+                if job:
+                    jobs.append(job)
+        jobs.sort(key=lambda job: job["timings"].get("submittedAt", 0))
+        return jobs
+
+
+# Global instance
+job_store = JobStore()
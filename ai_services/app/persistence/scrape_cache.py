@@ -0,0 +1,210 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from app.core.config import config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Inserts between trims of expired and surplus rows
+TRIM_EVERY_PUTS = 100
+
+
+@dataclass
+class CachedScrape:
+    content: Optional[str]  # None for a cached "not found"
+    provider: str
+    fetched_at: float
+    stale: bool
+
+
+class ScrapeCache:
+    """
+    SQLite cache of scraped explanations, keyed by provider and term.
+
+    Shared by /scrape and the RAG pipelines. Entries are fresh for
+    SCRAPE_CACHE_TTL_HOURS ("not found" results for
+    SCRAPE_NEGATIVE_TTL_HOURS); after that they are served stale for up to
+    SCRAPE_CACHE_STALE_HOURS while a background task refreshes them. The
+    database runs in WAL mode so several worker processes can share it;
+    every TRIM_EVERY_PUTS inserts, expired rows are deleted and the oldest
+    entries trimmed above SCRAPE_CACHE_MAX_ENTRIES. get/put block on
+    SQLite, so fetch runs them in a worker thread.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self.path = path or config.SCRAPE_CACHE_DB
+        self.max_entries = max_entries or config.SCRAPE_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._puts = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._metrics = {
+            "hits": 0,
+            "staleHits": 0,
+            "negativeHits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refreshErrors": 0,
+        }
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scrapes (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                term TEXT NOT NULL,
+                content TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scrapes_fetched_at ON scrapes (fetched_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, term: str) -> str:
+        return f"{provider}:{' '.join(term.lower().split())}"
+
+    def get(self, provider: str, term: str) -> Optional[CachedScrape]:
+        """Return the cached entry, or None when missing or past its stale window."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, fetched_at, expires_at, stale_until FROM scrapes WHERE key = ?",
+                (self.make_key(provider, term),),
+            ).fetchone()
+
+        now = time.time()
+        if row is None or now > row[3]:
+            return None
+        return CachedScrape(content=row[0], provider=provider, fetched_at=row[1], stale=now > row[2])
+
+    def put(self, provider: str, term: str, content: Optional[str]):
+        """Store a scrape result; content None records a "not found"."""
+        now = time.time()
+        ttl_hours = config.SCRAPE_CACHE_TTL_HOURS if content else config.SCRAPE_NEGATIVE_TTL_HOURS
+        expires_at = now + ttl_hours * 3600
+        stale_until = expires_at + config.SCRAPE_CACHE_STALE_HOURS * 3600
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrapes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.make_key(provider, term), provider, term, content, now, expires_at, stale_until),
+            )
+            self._puts += 1
+            if self._puts % TRIM_EVERY_PUTS == 1:
+                self._trim(now)
+            self._conn.commit()
+
+    def _trim(self, now: float):
+        """Delete rows past their stale window and the oldest rows above max_entries (caller holds the lock)."""
+        self._conn.execute("DELETE FROM scrapes WHERE stale_until < ?", (now,))
+        self._conn.execute(
+            """
+            DELETE FROM scrapes WHERE key IN (
+                SELECT key FROM scrapes ORDER BY fetched_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def _count(self, metric: str):
+        with self._lock:
+            self._metrics[metric] += 1
+
+    async def _refresh(
+        self,
+        key: str,
+        provider: str,
+        term: str,
+        loader: Callable[[], Awaitable[Optional[str]]],
+        had_content: bool,
+    ):
+        try:
+            content = await loader()
+            # An empty refresh may just mean the site is down; keep serving the old text until it ages out
+            if content or not had_content:
+                await asyncio.to_thread(self.put, provider, term, content)
+            self._count("refreshes")
+            logger.info(f"Refreshed stale scrape cache entry: {key}")
+        except Exception as e:
+            self._count("refreshErrors")
+            logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def fetch(
+        self,
+        provider: str,
+        term: str,
+        loader: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """
+        Cached scrape of a term, calling loader on a miss.
+
+        A stale entry is returned immediately and refreshed by a background
+        task (at most one per key). Exceptions from loader on a miss
+        propagate and are not cached.
+
+        Args:
+            provider: Provider name (e.g. "tldrlegal")
+            term: Term being looked up
+            loader: Coroutine function performing the live scrape
+
+        Returns:
+            Scraped text, or None for "not found"
+        """
+        cached = await asyncio.to_thread(self.get, provider, term)
+        if cached is not None:
+            if cached.stale:
+                self._count("staleHits")
+                key = self.make_key(provider, term)
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    task = asyncio.create_task(self._refresh(key, provider, term, loader, bool(cached.content)))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            else:
+                self._count("hits" if cached.content else "negativeHits")
+            return cached.content
+
+        self._count("misses")
+        content = await loader()
+        await asyncio.to_thread(self.put, provider, term, content)
+        return content
+
+    def stats(self) -> dict:
+        """Hit-rate and size metrics (hit counters are per worker process)."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            entries, negative = self._conn.execute(
+                "SELECT COUNT(*), COUNT(*) - COUNT(content) FROM scrapes"
+            ).fetchone()
+
+        lookups = metrics["hits"] + metrics["staleHits"] + metrics["negativeHits"] + metrics["misses"]
+        size_bytes = sum(
+            os.path.getsize(path)
+            for path in (self.path, f"{self.path}-wal")
+            if os.path.exists(path)
+        )
+        return dict(
+            metrics,
+            hitRate=round((lookups - metrics["misses"]) / lookups, 3) if lookups else 0.0,
+            entries=entries,
+            negativeEntries=negative,
+            sizeBytes=size_bytes,
+        )
+
+
+# Global instance
+scrape_cache = ScrapeCache()
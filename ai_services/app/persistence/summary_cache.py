@@ -0,0 +1,57 @@
+import json
+import hashlib
+from datetime import datetime
+from typing import Optional
+from app.core.config import config
+from app.persistence.file_cache import FileCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache(FileCache):
+    """
+    Persistent cache for whole-document and chunk-level summaries.
+
+    Entries are keyed by a hash of the input text, the summarizer model and
+    runtime, and the generation parameters, so changing any of them misses the cache.
+    Files live in config.SUMMARY_CACHE; least recently used entries are
+    evicted once the directory exceeds SUMMARY_CACHE_MAX_MB.
+    """
+
+    name = "summary"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        super().__init__(
+            cache_dir or config.SUMMARY_CACHE,
+            max_bytes or config.SUMMARY_CACHE_MAX_MB * 1024 * 1024,
+        )
+
+    @staticmethod
+    def make_key(kind: str, text: str, params: dict) -> str:
+        """Build a cache key from the input text, model and generation parameters."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(
+            {
+                "kind": kind,
+                "model": config.SUMMARIZER_MODEL,
+                "runtime": config.SUMMARIZER_RUNTIME,
+                "params": params,
+            },
+            sort_keys=True,
+        ).encode('utf-8'))
+        digest.update(b"\0")
+        digest.update(text.encode('utf-8'))
+        return f"{kind}-{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached entry for a key, or None."""
+        return self._load(key)
+
+    def put(self, key: str, value: dict):
+        """Store an entry and evict old entries if the cache is over its size limit."""
+        self._store(key, dict(value, cached_at=datetime.now().isoformat()))
+
+
+# Global instance
+summary_cache = SummaryCache()
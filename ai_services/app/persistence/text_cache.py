@@ -0,0 +1,128 @@
+import json
+import time
+from datetime import datetime
+from typing import Optional
+from app.core.config import config
+from app.persistence.file_cache import FileCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TextCache(FileCache):
+    """
+    Content-addressed cache of extracted document text.
+
+    Entries hold page-segmented text ([page_number, text] pairs) plus
+    extraction metadata, keyed by the SHA-256 of the file bytes and the
+    extractor that produced the text. The on-disk format is shared with
+    processor/text_cache.py, so pointing both at the same TEXT_CACHE_DIR
+    lets the AI service and the Streamlit app reuse each other's entries.
+
+    Entries older than TEXT_CACHE_MAX_AGE_DAYS are treated as misses; least
+    recently used entries are evicted once the directory exceeds
+    TEXT_CACHE_MAX_MB.
+    """
+
+    name = "text"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, max_age_seconds: float = None):
+        super().__init__(
+            cache_dir or config.TEXT_CACHE_DIR,
+            max_bytes or config.TEXT_CACHE_MAX_MB * 1024 * 1024,
+            max_age_seconds or config.TEXT_CACHE_MAX_AGE_DAYS * 86400,
+        )
+
+    @staticmethod
+    def make_key(content_hash: str, extractor: str) -> str:
+        return f"{content_hash}-{extractor}"
+
+    def get(self, content_hash: str, extractor: str) -> Optional[dict]:
+        """Return {"pages": [[number, text], ...], "metadata": {...}}, or None."""
+        key = self.make_key(content_hash, extractor)
+        data = self._load(key)
+        if data is None:
+            return None
+
+        if time.time() - data.get("metadata", {}).get("createdAt", 0) > self.max_age_seconds:
+            self._discard(key)
+            return None
+        return data
+
+    def put(self, content_hash: str, extractor: str, pages: list, **metadata):
+        """Store the extracted pages of a file and evict if over the size limit."""
+        data = {
+            "pages": [[number, text] for number, text in pages],
+            "metadata": dict(
+                metadata,
+                contentHash=content_hash,
+                extractor=extractor,
+                pages=len({number for number, _ in pages}),
+                chars=sum(len(text) for _, text in pages),
+                createdAt=time.time(),
+                cachedAt=datetime.now().isoformat(),
+            ),
+        }
+        self._store(self.make_key(content_hash, extractor), data)
+
+    def open_writer(self, content_hash: str, extractor: str) -> "TextCacheWriter":
+        """Start an entry that is written page by page; see TextCacheWriter."""
+        return TextCacheWriter(self, content_hash, extractor)
+
+
+class TextCacheWriter:
+    """
+    Writes a text cache entry to disk as pages arrive.
+
+    Pages go straight to a temporary file, so a long document is never held
+    in memory to be cached. close() appends the metadata and publishes the
+    entry in the same format as TextCache.put; abort() discards it, so only
+    complete extractions are cached.
+    """
+
+    def __init__(self, cache: TextCache, content_hash: str, extractor: str):
+        self.cache = cache
+        self.content_hash = content_hash
+        self.extractor = extractor
+        self.key = cache.make_key(content_hash, extractor)
+        self.tmp_path = cache._tmp_path(self.key)
+        self.page_numbers = set()
+        self.segments = 0
+        self.chars = 0
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self._file.write('{"pages": [')
+
+    def add(self, number: int, text: str):
+        """Append one page."""
+        if self.segments:
+            self._file.write(", ")
+        json.dump([number, text], self._file)
+        self.segments += 1
+        self.page_numbers.add(number)
+        self.chars += len(text)
+
+    def close(self, **metadata):
+        """Finish the entry with its metadata and make it visible to readers."""
+        metadata = dict(
+            metadata,
+            contentHash=self.content_hash,
+            extractor=self.extractor,
+            pages=len(self.page_numbers),
+            chars=self.chars,
+            createdAt=time.time(),
+            cachedAt=datetime.now().isoformat(),
+        )
+        self._file.write('], "metadata": ')
+        json.dump(metadata, self._file)
+        self._file.write("}")
+        self._file.close()
+        self.cache._commit(self.key, self.tmp_path)
+
+    def abort(self):
+        """Discard a partly written entry."""
+        self._file.close()
+        self.cache._remove(self.tmp_path)
+
+
+# Global instance
+text_cache = TextCache()
@@ -1,11 +1,18 @@
 from langchain.prompts import ChatPromptTemplate
 from app.core.gemini_client import get_gemini_llm, truncate_context
-from app.core.embeddings import embed_query
+from app.core.embeddings import embed_query, embed_queries
 from app.persistence.faiss_store import faiss_store
 from app.core.config import config
+from app.core.deadline import Deadline
+from app.core.compression import compress_chunks
+from app.core.structure import find_references
 from app.scraping.indiankanoon import scrape_indiankanoon
 from app.scraping.tldrlegal import scrape_tldrlegal
+from app.persistence.scrape_cache import scrape_cache
+import asyncio
 import logging
+from functools import partial
+import json
 import re
 
 logger = logging.getLogger(__name__)
@@ -53,12 +60,76 @@ Instructions for Response:
 
 Answer:"""
 
+RAG_BATCH_PROMPT_TEMPLATE = """You are an expert legal analysis assistant specializing in Indian law and the Indian legal system.
+
+Use ONLY the provided context chunks from the uploaded document to answer each of the numbered questions below. Apply your expertise in Indian law to give accurate, detailed answers in natural, professional language.
+
+Context Chunks:
+{context}
+
+Questions:
+{questions}
+
+{user_prompt}
+
+Instructions for Response:
+- Answer every question separately and completely; do not merge answers
+- Cite which chunk numbers you used (e.g., "According to chunks 2 and 7...")
+- If a question cannot be answered from the context, say: "Based on the provided documents, I don't have sufficient information to fully answer this question."
+- When citing Indian statutes, use the standard format (e.g., "Section 498A of the Indian Penal Code")
+- Return ONLY a JSON array with one object per question, in order, of the form:
+  [{{"question": 1, "answer": "..."}}, {{"question": 2, "answer": "..."}}]
+
+JSON:"""
+
+
+NO_BATCH_ANSWER = "No answer was returned for this question. Please ask it again on its own."
+
+NO_SUFFICIENT_INFORMATION_ANSWER = (
+    "Based on the provided documents, I don't have sufficient information to answer this question. "
+    "Please upload relevant legal documents or try rephrasing the query."
+)
+
+
+def _select_adaptive_k(results: list, min_k: int = None, max_k: int = None) -> list:
+    """
+    Choose how many retrieved chunks to keep from the FAISS distance distribution.
+
+    Results beyond the relevance threshold are dropped. Among the rest, the
+    list is cut at the largest jump between consecutive distances (the elbow)
+    at or after min_k, provided that jump is significant.
+
+    Args:
+        results: Search results ordered by ascending distance; the distance is the last tuple item
+        min_k: Minimum number of relevant chunks to keep
+        max_k: Maximum number of chunks to keep
+
+    Returns:
+        Leading slice of results to use as context (empty if nothing is relevant)
+    """
+    min_k = min_k if min_k is not None else config.RAG_MIN_K
+    max_k = max_k if max_k is not None else config.RAG_TOP_K
+
+    relevant = [r for r in results[:max_k] if r[-1] <= config.RAG_RELEVANCE_THRESHOLD]
+    if len(relevant) <= min_k:
+        return relevant
+
+    distances = [r[-1] for r in relevant]
+    gaps = [(distances[i] - distances[i - 1], i) for i in range(max(min_k, 1), len(distances))]
+    largest_gap, cut = max(gaps)
+
+    if largest_gap < config.RAG_ELBOW_MIN_GAP:
+        return relevant
+
+    logger.info(f"Adaptive top-k: keeping {cut} of {len(results)} chunks (elbow gap {largest_gap:.3f})")
+    return relevant[:cut]
+
 
 def _extract_legal_terms(query: str) -> list:
     """Extract potential legal terms from query for web scraping."""
     # Look for IPC sections, Articles, license names, etc.
     patterns = [
-        r'Section\s+\d+[A-Z]?\s*(of\s+)?IPC',
+        r'Section\s+\d+[A-Z]?\s*(?:of\s+)?IPC',
         r'Article\s+\d+[A-Z]?',
         r'CrPC\s+\d+',
         r'GPL|MIT|Apache|BSD',
@@ -72,7 +143,79 @@ def _extract_legal_terms(query: str) -> list:
     return terms
 
 
-def run_rag_query(index_path: str, query: str, user_prompt: str = "") -> dict:
+async def _scrape_term(term: str, max_retries: int) -> tuple[str, str] | None:
+    """Scrape one legal term from the provider that covers it, through the shared cache."""
+    # Try IndianKanoon for Indian legal terms
+    if any(keyword in term.upper() for keyword in ['IPC', 'ARTICLE', 'CRPC']):
+        scraped = await scrape_cache.fetch(
+            "indiankanoon", term, partial(scrape_indiankanoon, term, max_retries=max_retries)
+        )
+        if scraped:
+            logger.info(f"Added IndianKanoon content for: {term}")
+            return (f"<WEB_SOURCE: IndianKanoon>\n{scraped}\n</WEB_SOURCE>", f"IndianKanoon: {term}")
+
+    # Try TLDRLegal for license terms
+    elif any(keyword in term.upper() for keyword in ['GPL', 'MIT', 'APACHE', 'BSD']):
+        scraped = await scrape_cache.fetch(
+            "tldrlegal", term, partial(scrape_tldrlegal, term, max_retries=max_retries)
+        )
+        if scraped:
+            logger.info(f"Added TLDRLegal content for: {term}")
+            return (f"<WEB_SOURCE: TLDRLegal>\n{scraped}\n</WEB_SOURCE>", f"TLDRLegal: {term}")
+
+    return None
+
+
+async def _scrape_legal_context(legal_terms: list, deadline: Deadline) -> tuple[list[str], list[str]]:
+    """
+    Scrape web context for legal terms within the remaining time budget.
+
+    Terms are fetched concurrently over the shared HTTP client; scrapes
+    still running when the budget (less the LLM stage's share) runs out
+    are cancelled and the stage is marked degraded.
+
+    Returns:
+        Tuple of (context_parts, sources)
+    """
+    context_parts = []
+    sources = []
+
+    if not legal_terms or not deadline.allows("scrape", config.SCRAPE_STAGE_MIN_SECONDS):
+        return context_parts, sources
+
+    logger.info(f"Found legal terms to scrape: {legal_terms}")
+
+    # Limit to 2 terms to avoid too many requests; shorten when the budget is tight
+    max_terms, max_retries = 2, 3
+    if deadline.remaining() < config.SCRAPE_STAGE_FULL_SECONDS:
+        deadline.degrade("scrape")
+        max_terms, max_retries = 1, 1
+
+    tasks = [asyncio.create_task(_scrape_term(term, max_retries)) for term in legal_terms[:max_terms]]
+    budget = max(deadline.remaining() - config.LLM_STAGE_MIN_SECONDS, 0.0)
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    if pending:
+        deadline.degrade("scrape")
+        for task in pending:
+            task.cancel()
+
+    # Keep the term order regardless of which scrape finished first
+    for task in tasks:
+        if task not in done:
+            continue
+        try:
+            scraped = task.result()
+        except Exception as e:
+            logger.warning(f"Legal context scrape failed: {e}")
+            continue
+        if scraped:
+            context_parts.append(scraped[0])
+            sources.append(scraped[1])
+
+    return context_parts, sources
+
+
+async def run_rag_query(index_path: str, query: str, user_prompt: str = "", deadline: Deadline = None) -> dict:
     """
     Execute RAG pipeline: retrieve relevant chunks and generate answer.
     Now includes web scraping for legal terms not found in documents.
@@ -81,60 +224,69 @@ def run_rag_query(index_path: str, query: str, user_prompt: str = "") -> dict:
         index_path: Path to FAISS index
         query: User question
         user_prompt: Additional user instructions/context for answer generation
+        deadline: Request time budget checked before each stage
     
     Returns:
-        Dict with 'answer' and 'sources' keys
+        Dict with 'answer', 'sources' and 'degraded' keys
     """
-    logger.info(f"RAG query: {query}")
+    deadline = deadline or Deadline()
+    logger.info(f"RAG query: {query} ({deadline.remaining():.1f}s budget)")
     if user_prompt:
         logger.info(f"User prompt: {user_prompt}")
 
-    # Step 1: Embed query
-    query_embedding = embed_query(query)
+    # Step 1: Structural fast path - a query naming a section/clause the document defines
+    # gets exactly those passages; mere mentions fall through to vector search
+    references = find_references(query)
+    structural = []
+    if references:
+        structural = await asyncio.to_thread(faiss_store.lookup_structure, index_path, references, max_mentions=0)
+    if structural:
+        logger.info(f"Structural lookup matched {len(structural)} chunks for {references}")
 
-    # Step 2: Retrieve top-k chunks
-    results = faiss_store.search(
-        index_path=index_path,
-        query_embedding=query_embedding,
-        k=config.RAG_TOP_K,
-    )
+    # Step 2: Embed query and retrieve top-k chunks unless the fast path matched
+    deadline.check("embed")
+    query_embedding = await asyncio.to_thread(embed_query, query)
+
+    if structural:
+        results = [(chunk_text, 0.0) for _, chunk_text in structural]
+    else:
+        deadline.check("search")
+        results = await asyncio.to_thread(
+            faiss_store.search,
+            index_path=index_path,
+            query_embedding=query_embedding,
+            k=config.RAG_TOP_K,
+        )
+        results = _select_adaptive_k(results)
+
+    # Step 3: Build context from the selected chunks
+    chunk_texts = [chunk_text for chunk_text, distance in results]
+    context_texts = chunk_texts
+    if chunk_texts and config.RAG_COMPRESSION_ENABLED:
+        context_texts, _ = await asyncio.to_thread(compress_chunks, [query_embedding], chunk_texts)
 
-    # Step 3: Build context from document chunks
     context_parts = []
     sources = []
     
-    if results:
-        for idx, (chunk_text, distance) in enumerate(results, 1):
-            context_parts.append(f"<CHUNK {idx}>\n{chunk_text}\n</CHUNK {idx}>")
+    for chunk_text, context_text in zip(chunk_texts, context_texts):
+        if context_text:
+            idx = len(context_parts) + 1
+            context_parts.append(f"<CHUNK {idx}>\n{context_text}\n</CHUNK {idx}>")
             sources.append(chunk_text[:200])  # First 200 chars for citation
     
-    # Step 4: Try to enhance with web scraping for specific legal terms
-    legal_terms = _extract_legal_terms(query)
-    
-    if legal_terms:
-        logger.info(f"Found legal terms to scrape: {legal_terms}")
-        
-        for term in legal_terms[:2]:  # Limit to 2 terms to avoid too many requests
-            # Try IndianKanoon for Indian legal terms
-            if any(keyword in term.upper() for keyword in ['IPC', 'ARTICLE', 'CRPC']):
-                scraped = scrape_indiankanoon(term)
-                if scraped:
-                    context_parts.append(f"<WEB_SOURCE: IndianKanoon>\n{scraped}\n</WEB_SOURCE>")
-                    sources.append(f"IndianKanoon: {term}")
-                    logger.info(f"Added IndianKanoon content for: {term}")
-            
-            # Try TLDRLegal for license terms
-            elif any(keyword in term.upper() for keyword in ['GPL', 'MIT', 'APACHE', 'BSD']):
-                scraped = scrape_tldrlegal(term)
-                if scraped:
-                    context_parts.append(f"<WEB_SOURCE: TLDRLegal>\n{scraped}\n</WEB_SOURCE>")
-                    sources.append(f"TLDRLegal: {term}")
-                    logger.info(f"Added TLDRLegal content for: {term}")
-    
+    # Step 4: Try to enhance with web scraping for legal terms the document did not cover
+    legal_terms = [] if structural else _extract_legal_terms(query)
+    web_parts, web_sources = await _scrape_legal_context(legal_terms, deadline)
+    context_parts.extend(web_parts)
+    sources.extend(web_sources)
+
+    # Nothing close enough to the query: answer directly without an LLM call
     if not context_parts:
+        logger.info("No chunk within relevance threshold; skipping LLM call")
         return {
-            "answer": "No relevant context found in the document. Please upload relevant legal documents or try a different query.",
+            "answer": NO_SUFFICIENT_INFORMATION_ANSWER,
             "sources": [],
+            "degraded": deadline.degraded,
         }
 
     context = "\n\n".join(context_parts)
@@ -149,14 +301,184 @@ def run_rag_query(index_path: str, query: str, user_prompt: str = "") -> dict:
     messages = prompt.format_messages(context=context, query=query, user_prompt=user_prompt_section)
 
     # Step 6: Query Gemini with enhanced configuration
+    deadline.check("llm", config.LLM_STAGE_MIN_SECONDS)
     logger.info("Calling Gemini for detailed answer generation")
     llm = get_gemini_llm(temperature=config.RAG_TEMPERATURE)
-    response = llm.invoke(messages)
+    response = await deadline.within("llm", llm.ainvoke(messages))
 
     answer = response.content
 
-    logger.info("RAG query complete")
+    logger.info(f"RAG query complete ({deadline.remaining():.1f}s left, degraded: {deadline.degraded})")
     return {
         "answer": answer,
         "sources": sources,
+        "degraded": deadline.degraded,
+    }
+
+
+def _parse_batch_answers(content: str, count: int) -> list[str]:
+    """
+    Parse the JSON answer array returned for a batch prompt.
+
+    Questions the model left out (or answered with an unusable item) get
+    NO_BATCH_ANSWER; the other parsed answers are kept. Only a response
+    that is not a JSON array at all falls back to the raw text.
+    """
+    text = content.strip()
+    # Strip markdown code fences the model sometimes adds
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+
+    try:
+        parsed = json.loads(text[text.index('['):text.rindex(']') + 1])
+        if not isinstance(parsed, list):
+            raise ValueError("Batch answer JSON is not an array")
+    except ValueError as e:
+        logger.warning(f"Could not parse batch answer JSON: {e}")
+        # Fall back to the raw response rather than losing the answer
+        return [content] * count
+
+    answers = [""] * count
+    for position, item in enumerate(parsed):
+        try:
+            number = int(item.get("question", position + 1)) - 1
+            answer = str(item.get("answer", "")).strip()
+        except (ValueError, TypeError, AttributeError):
+            logger.warning(f"Skipping malformed batch answer item {position + 1}")
+            continue
+        if 0 <= number < count and answer:
+            answers[number] = answer
+
+    missing = [number + 1 for number, answer in enumerate(answers) if not answer]
+    if missing:
+        logger.warning(f"Batch answer JSON is missing questions {missing}")
+    return [answer or NO_BATCH_ANSWER for answer in answers]
+
+
+async def run_rag_batch_query(
+    index_path: str,
+    questions: list[str],
+    user_prompt: str = "",
+    deadline: Deadline = None,
+) -> dict:
+    """
+    Answer several questions about one document with shared retrieval.
+
+    All questions are embedded in one batch and searched in one FAISS call.
+    Retrieved chunks are deduplicated into a single context and answered
+    with one structured Gemini call.
+    
+    Args:
+        index_path: Path to FAISS index
+        questions: User questions
+        user_prompt: Additional user instructions/context for answer generation
+        deadline: Request time budget checked before each stage
+    
+    Returns:
+        Dict with 'answers' (per-question 'question', 'answer', 'sources') and 'degraded' keys
+    """
+    deadline = deadline or Deadline()
+    logger.info(f"RAG batch query: {len(questions)} questions ({deadline.remaining():.1f}s budget)")
+
+    # Step 1: Embed all questions at once
+    deadline.check("embed")
+    query_embeddings = await asyncio.to_thread(embed_queries, questions)
+
+    # Step 2: Retrieve top-k chunks for every question in one search
+    deadline.check("search")
+    results = await asyncio.to_thread(
+        faiss_store.search_batch,
+        index_path=index_path,
+        query_embeddings=query_embeddings,
+        k=config.RAG_TOP_K,
+    )
+
+    # Step 3: Build one deduplicated context, numbered by first appearance
+    chunk_numbers = {}
+    unique_chunks = []
+    question_sources = []
+
+    for question_results in results:
+        sources = []
+        for chunk_id, chunk_text, distance in _select_adaptive_k(question_results):
+            if chunk_id not in chunk_numbers:
+                chunk_numbers[chunk_id] = len(chunk_numbers) + 1
+                unique_chunks.append(chunk_text)
+            sources.append(chunk_text[:200])  # First 200 chars for citation
+        question_sources.append(sources)
+
+    context_texts = unique_chunks
+    if unique_chunks and config.RAG_COMPRESSION_ENABLED:
+        context_texts, _ = await asyncio.to_thread(compress_chunks, query_embeddings, unique_chunks)
+
+    context_parts = [
+        f"<CHUNK {number}>\n{text}\n</CHUNK {number}>"
+        for number, text in enumerate(context_texts, 1)
+        if text
+    ]
+
+    logger.info(
+        f"Batch context: {len(context_parts)} unique chunks "
+        f"for {sum(len(r) for r in results)} retrieved"
+    )
+
+    # Step 4: Web context for legal terms across all questions
+    question_terms = [_extract_legal_terms(q) for q in questions]
+    legal_terms = list(dict.fromkeys(t for terms in question_terms for t in terms))
+    web_parts, web_sources = await _scrape_legal_context(legal_terms, deadline)
+    context_parts.extend(web_parts)
+
+    # Questions with nothing relevant are answered directly and left out of the prompt
+    answerable = [
+        i for i in range(len(questions))
+        if question_sources[i] or (web_parts and question_terms[i])
+    ]
+    answers = [NO_SUFFICIENT_INFORMATION_ANSWER] * len(questions)
+
+    if not answerable:
+        logger.info("No chunk within relevance threshold for any question; skipping LLM call")
+        return {
+            "answers": [
+                {"question": question, "answer": answer, "sources": []}
+                for question, answer in zip(questions, answers)
+            ],
+            "degraded": deadline.degraded,
+        }
+
+    context = truncate_context("\n\n".join(context_parts))
+
+    # Step 5: Build one prompt carrying all questions
+    user_prompt_section = ""
+    if user_prompt:
+        user_prompt_section = f"\nAdditional User Instructions:\n{user_prompt}\n"
+    numbered_questions = "\n".join(
+        f"{number}. {questions[i]}" for number, i in enumerate(answerable, 1)
+    )
+
+    prompt = ChatPromptTemplate.from_template(RAG_BATCH_PROMPT_TEMPLATE)
+    messages = prompt.format_messages(
+        context=context,
+        questions=numbered_questions,
+        user_prompt=user_prompt_section,
+    )
+
+    # Step 6: Single Gemini call for all answers
+    deadline.check("llm", config.LLM_STAGE_MIN_SECONDS)
+    logger.info("Calling Gemini for batch answer generation")
+    llm = get_gemini_llm(temperature=config.RAG_TEMPERATURE)
+    response = await deadline.within("llm", llm.ainvoke(messages))
+
+    for i, answer in zip(answerable, _parse_batch_answers(response.content, len(answerable))):
+        answers[i] = answer
+
+    logger.info(f"RAG batch query complete ({deadline.remaining():.1f}s left, degraded: {deadline.degraded})")
+    return {
+        "answers": [
+            {
+                "question": question,
+                "answer": answer,
+                "sources": sources + (web_sources if terms else []),
+            }
+            for question, answer, sources, terms in zip(questions, answers, question_sources, question_terms)
+        ],
+        "degraded": deadline.degraded,
     }
@@ -1,29 +1,128 @@
-from transformers import pipeline
+import hashlib
+import multiprocessing
+import queue
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterator, Optional
+from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM, TextIteratorStreamer
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.config import config
+from app.core.deadline import Deadline
+from app.persistence.summary_cache import summary_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Global summarizer instance
 _summarizer = None
+_tokenizer = None
+_pool: ProcessPoolExecutor = None
+
+# Called as on_progress(stage, done, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def configure_threads(intra_op: int = None, inter_op: int = None):
+    """
+    Set torch intra-op and inter-op thread counts for this process.
+
+    Defaults split the cores between uvicorn workers and summarizer pool
+    workers so concurrent processes do not oversubscribe the CPU.
+    """
+    import torch
+
+    intra_op = intra_op or config.SUMMARIZER_INTRA_OP_THREADS
+    inter_op = inter_op or config.SUMMARIZER_INTER_OP_THREADS
+
+    torch.set_num_threads(intra_op)
+    try:
+        torch.set_num_interop_threads(inter_op)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work has started
+        logger.debug("Inter-op threads already initialized; keeping current setting")
+
+    logger.info(f"Torch threads: intra-op={torch.get_num_threads()}, inter-op={torch.get_num_interop_threads()}")
+
+
+def build_summarizer(runtime: str = None):
+    """
+    Build a summarization pipeline for the given runtime.
+
+    Args:
+        runtime: "fp32" (reference), "int8" (dynamic int8 quantization of
+            Linear layers) or "onnx" (ONNX Runtime export; needs
+            optimum[onnxruntime], falls back to int8)
+
+    Returns:
+        text2text-generation pipeline on CPU
+    """
+    runtime = runtime or config.SUMMARIZER_RUNTIME
+    tokenizer = AutoTokenizer.from_pretrained(config.SUMMARIZER_MODEL)
+
+    if runtime == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = config.SUMMARIZER_INTRA_OP_THREADS
+            options.inter_op_num_threads = config.SUMMARIZER_INTER_OP_THREADS
+            model = ORTModelForSeq2SeqLM.from_pretrained(
+                config.SUMMARIZER_MODEL,
+                export=True,
+                session_options=options,
+                cache_dir=config.MODELS_DIR,
+            )
+            return pipeline("text2text-generation", model=model, tokenizer=tokenizer, device=-1)
+        except ImportError:
+            logger.warning("optimum[onnxruntime] not installed; falling back to int8 runtime")
+            runtime = "int8"
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(config.SUMMARIZER_MODEL)
+    model.eval()
+
+    if runtime == "int8":
+        import torch
+
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif runtime != "fp32":
+        raise ValueError(f"Unsupported summarizer runtime: {runtime}")
+
+    return pipeline(
+        "text2text-generation",
+        model=model,
+        tokenizer=tokenizer,
+        device=-1,  # CPU (use 0 for GPU if available)
+    )
 
 
 def get_summarizer():
     """Load and cache T5 summarization model."""
     global _summarizer
-    
+
     if _summarizer is None:
-        logger.info(f"Loading summarizer model: {config.SUMMARIZER_MODEL}")
-        _summarizer = pipeline(
-            "text2text-generation",
-            model=config.SUMMARIZER_MODEL,
-            device=-1,  # CPU (use 0 for GPU if available)
-        )
+        logger.info(f"Loading summarizer model: {config.SUMMARIZER_MODEL} ({config.SUMMARIZER_RUNTIME})")
+        configure_threads()
+        _summarizer = build_summarizer()
         logger.info("Summarizer loaded")
-    
+
     return _summarizer
 
 
+def get_summarizer_tokenizer():
+    """Load and cache the summarizer tokenizer without loading the model."""
+    global _tokenizer
+
+    if _tokenizer is None:
+        if _summarizer is not None:
+            _tokenizer = _summarizer.tokenizer
+        else:
+            _tokenizer = AutoTokenizer.from_pretrained(config.SUMMARIZER_MODEL)
+
+    return _tokenizer
+
+
 LEGAL_SUMMARY_PROMPT = """You are a legal summarization assistant. Convert the following contract text into concise bullet points focusing on:
 - Parties & Effective Date
 - Payment & Financial Obligations
@@ -39,34 +138,590 @@ Text:
 
 Return 8-15 bullet points, each starting with a hyphen."""
 
+# Prefix for chunk-level (map) and intermediate (reduce) summaries
+CHUNK_SUMMARY_PREFIX = "summarize: "
+
+# Generation limits for the final bullet-point summary
+SUMMARY_MAX_LENGTH = 512
+SUMMARY_MIN_LENGTH = 100
+
+
+def _count_tokens(texts: list[str]) -> list[int]:
+    """Count summarizer tokens for several texts in one batched tokenizer call."""
+    encoded = get_summarizer_tokenizer()(texts, add_special_tokens=True, return_attention_mask=False)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+# Paragraph and page breaks (pages are joined with a blank line, some extractors emit form feeds)
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n+|\f')
+
+
+def _is_anchor(paragraph: str, tokens: int, target_tokens: int) -> bool:
+    """
+    Whether a chunk boundary follows this paragraph.
 
-def summarize_document(text: str) -> str:
+    Decided by the paragraph's own content, with probability tokens / target_tokens,
+    so chunks average target_tokens and an edit cannot move boundaries elsewhere.
+    """
+    digest = int.from_bytes(hashlib.blake2b(paragraph.encode("utf-8"), digest_size=8).digest(), "big")
+    return digest < (tokens / target_tokens) * 2 ** 64
+
+
+def _split_for_window(text: str, max_tokens: int) -> list[str]:
+    """
+    Split text into pieces that fit the summarizer window.
+
+    Boundaries sit on paragraph and page breaks chosen by content (see
+    _is_anchor), not by filling each window greedily, so editing one
+    paragraph changes only the chunk that holds it and the partial
+    summaries of every other chunk stay cached. A run between anchors that
+    outgrows the window is packed paragraph by paragraph, and a paragraph
+    larger than the window is split on lines, sentences and words.
+    """
+    paragraphs = [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+    if not paragraphs:
+        return []
+
+    splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+        get_summarizer_tokenizer(),
+        chunk_size=max_tokens,
+        chunk_overlap=0,
+        separators=["\n", ". ", " ", ""],
+    )
+    target_tokens = max(1, max_tokens // 2)
+
+    chunks = []
+    current, current_tokens = [], 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        current, current_tokens = [], 0
+
+    for paragraph, tokens in zip(paragraphs, _count_tokens(paragraphs)):
+        if tokens > max_tokens:
+            flush()
+            chunks.extend(splitter.split_text(paragraph))
+            continue
+        if current_tokens + tokens > max_tokens:
+            flush()
+        current.append(paragraph)
+        current_tokens += tokens
+        if _is_anchor(paragraph, tokens, target_tokens):
+            flush()
+    flush()
+
+    return chunks
+
+
+def _select_within_cap(chunks: list[str], cap: int) -> list[str]:
+    """Keep at most `cap` chunks, evenly spaced and always including the first and last."""
+    if len(chunks) <= cap:
+        return chunks
+    if cap == 1:
+        return chunks[:1]
+    step = (len(chunks) - 1) / (cap - 1)
+    return [chunks[round(i * step)] for i in range(cap)]
+
+
+def _init_pool_worker():
+    """Process pool initializer: load the model once per worker (threads are set on load)."""
+    get_summarizer()
+
+
+def _generate_batch(prompts: list[str], max_length: int, min_length: int) -> list[str]:
+    """Run one batch of prompts through the summarizer pipeline."""
+    results = get_summarizer()(
+        prompts,
+        batch_size=config.SUMMARY_BATCH_SIZE,
+        max_length=max_length,
+        min_length=min_length,
+        do_sample=False,
+        truncation=True,
+    )
+    return [r['generated_text'] for r in results]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the summarizer worker pool on first use."""
+    global _pool
+
+    if _pool is None:
+        workers = config.SUMMARY_WORKERS
+        logger.info(f"Starting summarizer pool: {workers} workers x {config.SUMMARIZER_INTRA_OP_THREADS} threads")
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_worker,
+        )
+
+    return _pool
+
+
+def _generate(
+    prompts: list[str],
+    max_length: int,
+    min_length: int,
+    stage: str,
+    deadline: Deadline,
+    on_progress: Optional[ProgressCallback] = None,
+) -> list[str]:
+    """
+    Summarize prompts in batches, in-process or fanned out to the worker pool.
+
+    Prompts with a cached partial summary are not regenerated. Batches that
+    cannot start before the deadline reserve are dropped and the stage is
+    recorded as degraded; results keep the input order.
+    """
+    params = {"max_length": max_length, "min_length": min_length}
+    keys = [summary_cache.make_key("partial", prompt, params) for prompt in prompts]
+    cached = {}
+    for i, key in enumerate(keys):
+        entry = summary_cache.get(key)
+        if entry is not None:
+            cached[i] = entry["summary"]
+    if cached:
+        logger.info(f"Summarization {stage}: {len(cached)}/{len(prompts)} partial summaries cached")
+
+    missing = [i for i in range(len(prompts)) if i not in cached]
+    generated = _generate_uncached(
+        [prompts[i] for i in missing], max_length, min_length, stage, deadline,
+        on_progress, done_offset=len(cached), total=len(prompts),
+    )
+    for i, summary in zip(missing, generated):
+        if summary is not None:
+            summary_cache.put(keys[i], {"summary": summary})
+            cached[i] = summary
+
+    return [cached[i] for i in range(len(prompts)) if i in cached]
+
+
+def _generate_uncached(
+    prompts: list[str],
+    max_length: int,
+    min_length: int,
+    stage: str,
+    deadline: Deadline,
+    on_progress: Optional[ProgressCallback],
+    done_offset: int,
+    total: int,
+) -> list[Optional[str]]:
+    """Run prompts through the model; entries are None for batches dropped by the deadline."""
+    size = config.SUMMARY_BATCH_SIZE
+    batches = [prompts[i:i + size] for i in range(0, len(prompts), size)]
+    reserve = config.SUMMARY_MAX_SECONDS * 0.25  # Time kept back for the final pass
+    outputs: list[list[str] | None] = [None] * len(batches)
+    done = done_offset
+
+    def report():
+        if on_progress:
+            on_progress(stage, done, total)
+        logger.info(f"Summarization {stage}: {done}/{total}")
+
+    if config.SUMMARY_WORKERS <= 1:
+        for i, batch in enumerate(batches):
+            if not deadline.allows(stage, reserve):
+                break
+            outputs[i] = _generate_batch(batch, max_length, min_length)
+            done += len(batch)
+            report()
+    else:
+        pool = _get_pool()
+        futures = {pool.submit(_generate_batch, batch, max_length, min_length): i for i, batch in enumerate(batches)}
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, timeout=max(deadline.remaining() - reserve, 0), return_when=FIRST_COMPLETED)
+            if not finished:
+                deadline.degrade(stage)
+                for future in pending:
+                    future.cancel()
+                break
+            for future in finished:
+                outputs[futures[future]] = future.result()
+                done += len(batches[futures[future]])
+            report()
+
+    return [
+        text
+        for batch, output in zip(batches, outputs)
+        for text in (output if output is not None else [None] * len(batch))
+    ]
+
+
+def _map_reduce(
+    text: str,
+    deadline: Deadline,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[str, int]:
+    """
+    Summarize chunks of the whole document, then reduce the partial summaries
+    recursively until they fit the model window with the legal summary prompt.
+
+    Returns:
+        Tuple of (reduced text to feed the final prompt, number of chunks mapped)
+    """
+    window = config.SUMMARIZER_MAX_INPUT_TOKENS
+    prefix_tokens = _count_tokens([CHUNK_SUMMARY_PREFIX])[0]
+    final_budget = window - _count_tokens([LEGAL_SUMMARY_PROMPT.format(document_text="")])[0]
+
+    chunks = _split_for_window(text, window - prefix_tokens)
+    if len(chunks) > config.SUMMARY_MAX_CHUNKS:
+        logger.warning(f"Document has {len(chunks)} chunks; summarizing {config.SUMMARY_MAX_CHUNKS} evenly spaced")
+        deadline.degrade("chunk_cap")
+        chunks = _select_within_cap(chunks, config.SUMMARY_MAX_CHUNKS)
+
+    # Map: one short summary per chunk
+    partials = _generate(
+        [CHUNK_SUMMARY_PREFIX + chunk for chunk in chunks],
+        max_length=config.SUMMARY_MAP_MAX_LENGTH,
+        min_length=min(20, config.SUMMARY_MAP_MAX_LENGTH // 2),
+        stage="map",
+        deadline=deadline,
+        on_progress=on_progress,
+    )
+    if not partials:
+        # No map batch fit the budget: fall back to the head of the document
+        return text[:window * 4], len(chunks)
+
+    # Reduce: group partial summaries into window-sized prompts until they fit
+    depth = 0
+    while len(partials) > 1 and sum(_count_tokens(partials)) > final_budget:
+        if depth >= config.SUMMARY_MAX_REDUCE_DEPTH or not deadline.allows("reduce", config.SUMMARY_MAX_SECONDS * 0.25):
+            break
+
+        groups, current, current_tokens = [], [], prefix_tokens
+        for partial, tokens in zip(partials, _count_tokens(partials)):
+            if current and current_tokens + tokens > window:
+                groups.append(current)
+                current, current_tokens = [], prefix_tokens
+            current.append(partial)
+            current_tokens += tokens
+        groups.append(current)
+
+        reduced = _generate(
+            [CHUNK_SUMMARY_PREFIX + "\n".join(group) for group in groups],
+            max_length=config.SUMMARY_MAP_MAX_LENGTH,
+            min_length=min(20, config.SUMMARY_MAP_MAX_LENGTH // 2),
+            stage=f"reduce_{depth + 1}",
+            deadline=deadline,
+            on_progress=on_progress,
+        )
+        if len(reduced) < len(groups):
+            break  # Out of budget mid-level; the final pass truncates instead
+        partials = reduced
+        depth += 1
+
+    return "\n".join(partials), len(chunks)
+
+
+def _document_cache_key(text: str, mode: str) -> str:
+    return summary_cache.make_key("document", text, {
+        "mode": mode,
+        "max_length": SUMMARY_MAX_LENGTH,
+        "min_length": SUMMARY_MIN_LENGTH,
+        "max_chunks": config.SUMMARY_MAX_CHUNKS,
+    })
+
+
+def _resolve_mode(text: str, mode: str) -> str:
+    """Resolve "auto" to map_reduce when the text does not fit the model window."""
+    if mode == "auto":
+        fits = _count_tokens([LEGAL_SUMMARY_PROMPT.format(document_text=text)])[0] <= config.SUMMARIZER_MAX_INPUT_TOKENS
+        return "truncate" if fits else "map_reduce"
+    if mode not in ("truncate", "map_reduce"):
+        raise ValueError(f"Unsupported summarization mode: {mode}")
+    return mode
+
+
+def _prepare_document_text(
+    text: str,
+    mode: str,
+    deadline: Deadline,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[str, int]:
+    """
+    Produce the text for the final legal summary prompt.
+
+    Returns:
+        Tuple of (document text, number of chunks summarized)
+    """
+    if mode == "map_reduce":
+        return _map_reduce(text, deadline, on_progress)
+
+    # Truncate if too long (T5 has token limits)
+    max_input_tokens = 1024
+    return text[:max_input_tokens * 4], 1  # Rough estimate
+
+
+def _cache_summary(cache_key: str, summary: str, chunks: int, deadline: Deadline):
+    # Time-capped summaries are not cached so a retry can complete them from cached partials
+    if set(deadline.degraded) <= {"chunk_cap"}:
+        summary_cache.put(cache_key, {"summary": summary, "chunks": chunks, "degraded": deadline.degraded})
+
+
+def summarize_document(
+    text: str,
+    mode: str = "auto",
+    on_progress: Optional[ProgressCallback] = None,
+) -> dict:
     """
     Generate legal summary of document.
-    
+
     Args:
         text: Full document text
-    
+        mode: "truncate" summarizes the head of the document, "map_reduce"
+            summarizes the whole document, "auto" picks map_reduce when the
+            text does not fit the model window
+        on_progress: Optional callback receiving (stage, done, total)
+
     Returns:
-        Bullet-point summary
+        Dict with 'summary' (bullet points), 'mode', 'chunks', 'degraded' and 'cached' keys
     """
+    deadline = Deadline(config.SUMMARY_MAX_SECONDS)
+    mode = _resolve_mode(text, mode)
+
+    cache_key = _document_cache_key(text, mode)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Summary cache hit")
+        return {
+            "summary": cached["summary"],
+            "mode": mode,
+            "chunks": cached["chunks"],
+            "degraded": cached["degraded"],
+            "cached": True,
+        }
+
     summarizer = get_summarizer()
-    
-    # Truncate if too long (T5 has token limits)
-    max_input_tokens = 1024
-    truncated_text = text[:max_input_tokens * 4]  # Rough estimate
-    
-    prompt = LEGAL_SUMMARY_PROMPT.format(document_text=truncated_text)
-    
-    logger.info("Generating summary")
+    document_text, chunks = _prepare_document_text(text, mode, deadline, on_progress)
+    prompt = LEGAL_SUMMARY_PROMPT.format(document_text=document_text)
+
+    logger.info(f"Generating summary ({mode}, {chunks} chunks)")
     result = summarizer(
         prompt,
-        max_length=512,
-        min_length=100,
+        max_length=SUMMARY_MAX_LENGTH,
+        min_length=SUMMARY_MIN_LENGTH,
         do_sample=False,
+        truncation=True,
     )
-    
+
     summary = result[0]['generated_text']
-    logger.info("Summary generated")
-    
-    return summary
+    if on_progress:
+        on_progress("final", 1, 1)
+    logger.info(f"Summary generated (degraded: {deadline.degraded})")
+
+    _cache_summary(cache_key, summary, chunks, deadline)
+
+    return {
+        "summary": summary,
+        "mode": mode,
+        "chunks": chunks,
+        "degraded": deadline.degraded,
+        "cached": False,
+    }
+
+
+# Bullet boundary: a hyphen marker at the start of a line, so "Section 5 - Termination" stays one bullet
+_BULLET_MARKER = re.compile(r'(?m)^\s*-\s+')
+
+
+def split_bullets(text: str) -> list[str]:
+    """Split generated summary text into bullet point strings."""
+    return [part.strip() for part in _BULLET_MARKER.split(text) if part.strip()]
+
+
+def stream_summary(text: str, mode: str = "auto") -> Iterator[dict]:
+    """
+    Generate a legal summary, yielding events while the model decodes.
+
+    Preparation (map-reduce) and decoding run on a background thread; the
+    final pass uses a TextIteratorStreamer so each bullet point is yielded
+    as soon as the next one starts.
+
+    Yields:
+        Dicts with an 'event' key: "progress" (stage, done, total), "bullet"
+        (text), "done" (the summarize_document result) or "error" (detail)
+    """
+    events: queue.Queue = queue.Queue()
+    finished = object()
+
+    def bullet_events(summary: str):
+        for bullet in split_bullets(summary):
+            events.put({"event": "bullet", "text": bullet})
+
+    def worker():
+        try:
+            deadline = Deadline(config.SUMMARY_MAX_SECONDS)
+            resolved = _resolve_mode(text, mode)
+            cache_key = _document_cache_key(text, resolved)
+
+            cached = summary_cache.get(cache_key)
+            if cached is not None:
+                bullet_events(cached["summary"])
+                events.put({
+                    "event": "done",
+                    "summary": cached["summary"],
+                    "mode": resolved,
+                    "chunks": cached["chunks"],
+                    "degraded": cached["degraded"],
+                    "cached": True,
+                })
+                return
+
+            summarizer = get_summarizer()
+            document_text, chunks = _prepare_document_text(
+                text, resolved, deadline,
+                on_progress=lambda stage, done, total: events.put(
+                    {"event": "progress", "stage": stage, "done": done, "total": total}
+                ),
+            )
+
+            tokenizer = summarizer.tokenizer
+            inputs = tokenizer(
+                LEGAL_SUMMARY_PROMPT.format(document_text=document_text),
+                return_tensors="pt",
+                truncation=True,
+                max_length=config.SUMMARIZER_MAX_INPUT_TOKENS,
+            )
+            # The timeout bounds the wait for each decoded piece, so a stuck generate cannot hang the stream
+            streamer = TextIteratorStreamer(
+                tokenizer, skip_special_tokens=True, timeout=config.SUMMARY_MAX_SECONDS,
+            )
+            generation_errors = []
+
+            def generate():
+                try:
+                    summarizer.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        max_length=SUMMARY_MAX_LENGTH,
+                        min_length=SUMMARY_MIN_LENGTH,
+                        do_sample=False,
+                    )
+                except Exception as e:
+                    generation_errors.append(e)
+                    streamer.end()  # Unblock the reader below
+
+            generation = threading.Thread(target=generate, daemon=True)
+            generation.start()
+
+            # Emit every bullet except the last, which may still be growing
+            summary = ""
+            emitted = 0
+            try:
+                for piece in streamer:
+                    summary += piece
+                    bullets = split_bullets(summary)
+                    for bullet in bullets[emitted:-1]:
+                        events.put({"event": "bullet", "text": bullet})
+                    emitted = max(emitted, len(bullets) - 1)
+            except queue.Empty:
+                raise TimeoutError(f"Summary generation produced no output for {config.SUMMARY_MAX_SECONDS}s")
+            generation.join()
+            if generation_errors:
+                raise generation_errors[0]
+
+            for bullet in split_bullets(summary)[emitted:]:
+                events.put({"event": "bullet", "text": bullet})
+
+            summary = summary.strip()
+            _cache_summary(cache_key, summary, chunks, deadline)
+            events.put({
+                "event": "done",
+                "summary": summary,
+                "mode": resolved,
+                "chunks": chunks,
+                "degraded": deadline.degraded,
+                "cached": False,
+            })
+        except Exception as e:
+            logger.error(f"Streaming summarization failed: {e}")
+            events.put({"event": "error", "detail": str(e)})
+        finally:
+            events.put(finished)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    while True:
+        event = events.get()
+        if event is finished:
+            break
+        yield event
+
+
+def summarize_documents(documents: list[tuple[str, str]]) -> Iterator[dict]:
+    """
+    Summarize many documents, yielding each result as soon as it is ready.
+
+    Cached summaries are yielded first. Documents that fit the model window
+    are sorted by token length and run through the pipeline in batches of
+    SUMMARY_BATCH_SIZE, so each batch pads to similar lengths. Longer
+    documents go through map-reduce one at a time; their chunk batches are
+    batched the same way.
+
+    Args:
+        documents: (document_id, text) pairs
+
+    Yields:
+        Dicts with 'id' plus the summarize_document keys, or 'id' and 'error'
+    """
+    prompts = [LEGAL_SUMMARY_PROMPT.format(document_text=text) for _, text in documents]
+    lengths = _count_tokens(prompts) if prompts else []
+
+    short, long = [], []
+    for i, ((doc_id, text), length) in enumerate(zip(documents, lengths)):
+        mode = "truncate" if length <= config.SUMMARIZER_MAX_INPUT_TOKENS else "map_reduce"
+        cached = summary_cache.get(_document_cache_key(text, mode))
+        if cached is not None:
+            yield {
+                "id": doc_id,
+                "summary": cached["summary"],
+                "mode": mode,
+                "chunks": cached["chunks"],
+                "degraded": cached["degraded"],
+                "cached": True,
+            }
+        elif mode == "truncate":
+            short.append(i)
+        else:
+            long.append(i)
+
+    logger.info(f"Batch summarization: {len(short)} short, {len(long)} long, "
+                f"{len(documents) - len(short) - len(long)} cached")
+
+    # Short documents: length-sorted batches through the pipeline
+    short.sort(key=lambda i: lengths[i])
+    size = config.SUMMARY_BATCH_SIZE
+    for start in range(0, len(short), size):
+        batch = short[start:start + size]
+        try:
+            summaries = _generate_batch([prompts[i] for i in batch], SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH)
+        except Exception as e:
+            logger.error(f"Batch summarization failed: {e}")
+            for i in batch:
+                yield {"id": documents[i][0], "error": str(e)}
+            continue
+
+        for i, summary in zip(batch, summaries):
+            summary_cache.put(
+                _document_cache_key(documents[i][1], "truncate"),
+                {"summary": summary, "chunks": 1, "degraded": []},
+            )
+            yield {
+                "id": documents[i][0],
+                "summary": summary,
+                "mode": "truncate",
+                "chunks": 1,
+                "degraded": [],
+                "cached": False,
+            }
+
+    # Long documents: map-reduce, each within its own time budget
+    for i in long:
+        doc_id, text = documents[i]
+        try:
+            yield {"id": doc_id, **summarize_document(text, mode="map_reduce")}
+        except Exception as e:
+            logger.error(f"Summarization failed for {doc_id}: {e}")
+            yield {"id": doc_id, "error": str(e)}
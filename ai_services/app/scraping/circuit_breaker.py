@@ -0,0 +1,156 @@
+"""
+Per-provider circuit breakers for the scrapers.
+
+A breaker opens after SCRAPE_BREAKER_FAILURES consecutive failed fetches
+(retries exhausted on timeouts, 5xx, 429 or connection errors). While
+open, requests to the provider fail immediately with ProviderUnavailable,
+so callers fall back to the scrape cache or go without web context
+instead of waiting out retries and timeouts. After
+SCRAPE_BREAKER_RESET_SECONDS the breaker half-opens and lets up to
+SCRAPE_BREAKER_HALF_OPEN_PROBES requests through: a success closes it,
+a failure opens it again. Breaker state is per worker process.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from app.core.config import config
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderUnavailable(Exception):
+    """Raised when a provider is failing or its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker guarding one scrape provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = None,
+        reset_seconds: float = None,
+        probes: int = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.SCRAPE_BREAKER_FAILURES
+        self.reset_seconds = reset_seconds or config.SCRAPE_BREAKER_RESET_SECONDS
+        self.probes = probes or config.SCRAPE_BREAKER_HALF_OPEN_PROBES
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._metrics = {"trips": 0, "rejected": 0, "successes": 0, "failures": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> tuple[bool, bool]:
+        """
+        Check whether a request may go to the provider.
+
+        Every allowed request must be followed by exactly one release(),
+        passing back the probe flag returned here.
+
+        Returns:
+            Tuple of (allowed, whether the request is a half-open probe)
+        """
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                logger.info(f"Circuit for {self.name} half-open; probing")
+                self._state = HALF_OPEN
+                self._probes_in_flight = 0
+
+            if self._state == CLOSED:
+                return True, False
+            if self._state == HALF_OPEN and self._probes_in_flight < self.probes:
+                self._probes_in_flight += 1
+                return True, True
+
+            self._metrics["rejected"] += 1
+            return False, False
+
+    def release(self, success: Optional[bool], probe: bool = False):
+        """
+        Record the outcome of an allowed request.
+
+        Only probes decide a half-open breaker; a request allowed while the
+        breaker was closed that finishes after it tripped just counts.
+
+        Args:
+            success: True if the provider answered, False if it failed,
+                None if the request was abandoned (e.g. cancelled)
+            probe: The probe flag allow() returned for this request
+        """
+        with self._lock:
+            if probe:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if success is None:
+                return
+
+            deciding = probe and self._state == HALF_OPEN
+            if success:
+                self._metrics["successes"] += 1
+                self._failures = 0
+                if deciding:
+                    logger.info(f"Circuit for {self.name} closed after a successful probe")
+                    self._state = CLOSED
+                return
+
+            self._metrics["failures"] += 1
+            self._failures += 1
+            if deciding or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                logger.warning(
+                    f"Circuit for {self.name} opened after {self._failures} consecutive failures; "
+                    f"retrying in {self.reset_seconds:.0f}s"
+                )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._metrics["trips"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(self.reset_seconds - (time.monotonic() - self._opened_at), 0.0)
+            opened_at = None
+            if self._metrics["trips"]:
+                opened_at = datetime.fromtimestamp(time.time() - (time.monotonic() - self._opened_at)).isoformat()
+            return dict(
+                self._metrics,
+                state=self._state,
+                consecutiveFailures=self._failures,
+                lastOpenedAt=opened_at,
+                retryInSeconds=round(retry_in, 1),
+            )
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Breaker for a provider, created on first use."""
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def breaker_stats() -> dict:
+    """State and counters of every provider's breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
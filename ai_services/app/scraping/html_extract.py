@@ -0,0 +1,234 @@
+"""
+Single-pass HTML extraction for the scrapers.
+
+extract_page parses a page with lxml and walks the tree once, collecting
+every visible string into one flat list. Elements of interest (block
+containers, selector matches) only record the [start, end) range of
+strings they cover, so the text of any element, and its length, is
+available without calling get_text on nested containers again. Total
+work is linear in the page size however deeply containers nest.
+
+Selectors are the simple forms the scrapers use: "tag", ".class", "#id"
+and "tag.class", comma-separated for alternatives.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Pattern
+from urllib.parse import urljoin
+from lxml import etree, html as lxml_html
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Subtrees never holding readable content
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "head"}
+
+# Containers recorded as text blocks
+BLOCK_TAGS = {"article", "main", "section", "div", "p", "td", "li", "blockquote", "pre"}
+
+_SIMPLE_SELECTOR = re.compile(r'^([A-Za-z0-9]*)(?:([.#])([\w-]+))?$')
+
+
+def _parse_selector(selector: str) -> list[tuple[str, str, str]]:
+    """Split "h1.doc_title, .doctitle" into (tag, kind, name) alternatives."""
+    parsed = []
+    for part in selector.split(","):
+        match = _SIMPLE_SELECTOR.match(part.strip())
+        if not match:
+            raise ValueError(f"Unsupported selector: {part.strip()!r}")
+        parsed.append((match.group(1).lower(), match.group(2) or "", match.group(3) or ""))
+    return parsed
+
+
+def _matches(tag: str, element, alternatives: list[tuple[str, str, str]]) -> bool:
+    for want_tag, kind, name in alternatives:
+        if want_tag and want_tag != tag:
+            continue
+        if kind == "." and name not in (element.get("class") or "").split():
+            continue
+        if kind == "#" and element.get("id") != name:
+            continue
+        return True
+    return False
+
+
+@dataclass
+class ExtractedPage:
+    """Text, selector matches, blocks, links and citations of one page."""
+
+    pieces: list[str] = field(default_factory=list)
+    matches: dict[str, tuple[int, int]] = field(default_factory=dict)
+    blocks: list[tuple[str, int, int]] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+    citations: list[str] = field(default_factory=list)
+    _offsets: list[int] = field(default_factory=list, repr=False)
+
+    def __post_init__(self):
+        self._index()
+
+    def _index(self):
+        """Prefix sums of piece lengths, so span lengths cost O(1)."""
+        total = 0
+        self._offsets = [0]
+        for piece in self.pieces:
+            total += len(piece)
+            self._offsets.append(total)
+
+    def span_length(self, start: int, end: int) -> int:
+        """Characters in a span joined with a one-character separator."""
+        if end <= start:
+            return 0
+        return self._offsets[end] - self._offsets[start] + (end - start - 1)
+
+    def text(self, span: tuple[int, int] = None, separator: str = " ") -> str:
+        """Text of a span of pieces (the whole page by default)."""
+        start, end = span or (0, len(self.pieces))
+        return separator.join(self.pieces[start:end])
+
+    def match_text(self, name: str, separator: str = " ") -> Optional[str]:
+        """Text of the first element matching a named selector, or None."""
+        span = self.matches.get(name)
+        if span is None:
+            return None
+        return self.text(span, separator) or None
+
+    @property
+    def metadata(self) -> dict[str, Optional[str]]:
+        """Text of every named selector match."""
+        return {name: self.match_text(name) for name in self.matches}
+
+    def block_texts(self, tags: set[str], min_chars: int = 0, separator: str = " ") -> list[str]:
+        """Texts of blocks with the given tags longer than min_chars, in document order."""
+        return [
+            self.text((start, end), separator)
+            for tag, start, end in self.blocks
+            if tag in tags and self.span_length(start, end) > min_chars
+        ]
+
+    def longest_block(self, tags: set[str], min_chars: int = 0) -> Optional[str]:
+        """Text of the longest block with one of the given tags, if longer than min_chars."""
+        best, best_length = None, min_chars
+        for tag, start, end in self.blocks:
+            if tag in tags:
+                length = self.span_length(start, end)
+                if length > best_length:
+                    best, best_length = (start, end), length
+        return self.text(best) if best else None
+
+
+def extract_page(
+    page_html: str,
+    selectors: dict[str, str] = None,
+    base_url: str = None,
+    link_pattern: Pattern = None,
+    citation_patterns: list[Pattern] = None,
+    scope: str = None,
+) -> ExtractedPage:
+    """
+    Extract text, metadata, links and citations from a page in one traversal.
+
+    Args:
+        page_html: Page markup
+        selectors: Name -> selector; the first matching element's text is
+            available as page.match_text(name)
+        base_url: Resolves relative link targets
+        link_pattern: Only links whose absolute URL matches are kept
+        citation_patterns: Regexes run once over the collected text
+        scope: Selector restricting text collection to matching subtrees
+            (plus selector matches); everything else is skipped
+
+    Returns:
+        ExtractedPage
+    """
+    named = {name: _parse_selector(selector) for name, selector in (selectors or {}).items()}
+    scoped = _parse_selector(scope) if scope else None
+
+    pieces: list[str] = []
+    matches: dict[str, tuple[int, int]] = {}
+    claimed: set[str] = set()  # Names whose first match has started
+    blocks: list[tuple[str, int, int]] = []
+    links: list[str] = []
+    seen_links: set[str] = set()
+
+    try:
+        root = lxml_html.document_fromstring(page_html)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse HTML: {e}")
+        return ExtractedPage()
+
+    # Per open element: (block slot or None, piece index at start, match names, collecting before)
+    stack = []
+    collecting = scoped is None
+
+    def add_tail(element):
+        # A tail belongs to the parent, after the element
+        if collecting and element.tail:
+            text = element.tail.strip()
+            if text:
+                pieces.append(text)
+
+    walker = etree.iterwalk(root, events=("start", "end", "comment", "pi"))
+    for event, element in walker:
+        if event in ("comment", "pi"):
+            add_tail(element)
+            continue
+
+        tag = element.tag.lower() if isinstance(element.tag, str) else ""
+
+        if event == "start":
+            if tag in SKIP_TAGS:
+                walker.skip_subtree()
+                stack.append((None, len(pieces), (), collecting))
+                continue
+
+            pending = tuple(
+                name for name, alternatives in named.items()
+                if name not in claimed and _matches(tag, element, alternatives)
+            )
+            claimed.update(pending)
+            was_collecting = collecting
+            if scoped is not None and (pending or _matches(tag, element, scoped)):
+                collecting = True
+
+            # Reserve the block's slot now so blocks stay in document order
+            slot = None
+            if tag in BLOCK_TAGS:
+                slot = len(blocks)
+                blocks.append(None)
+            stack.append((slot, len(pieces), pending, was_collecting))
+
+            if tag == "a":
+                href = element.get("href")
+                if href:
+                    url = urljoin(base_url, href) if base_url else href
+                    if (link_pattern is None or link_pattern.search(url)) and url not in seen_links:
+                        seen_links.add(url)
+                        links.append(url)
+
+            if collecting and element.text:
+                text = element.text.strip()
+                if text:
+                    pieces.append(text)
+
+        else:
+            slot, start, pending, was_collecting = stack.pop()
+            end = len(pieces)
+            if slot is not None:
+                blocks[slot] = (tag, start, end)
+            for name in pending:
+                matches[name] = (start, end)
+            collecting = was_collecting
+            add_tail(element)
+
+    blocks = [block for block in blocks if block and block[2] > block[1]]
+    page = ExtractedPage(pieces=pieces, matches=matches, blocks=blocks, links=links)
+
+    if citation_patterns:
+        full_text = page.text()
+        citations = {}
+        for pattern in citation_patterns:
+            for match in pattern.finditer(full_text):
+                citations.setdefault(match.group(0), None)
+        page.citations = list(citations)
+
+    return page
@@ -0,0 +1,198 @@
+"""
+Shared async HTTP client for the scrapers.
+
+One pooled httpx.AsyncClient keeps connections (and TLS sessions) alive
+across requests, caps concurrent requests per host, and optionally
+negotiates HTTP/2. Every attempt first takes a token from the shared
+per-host rate limiter. Retries with exponential backoff live here so
+every scraper handles 429s, 5xx responses and timeouts the same way;
+outcomes feed the caller's circuit breaker.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from app.core.config import config
+from app.scraping.rate_limiter import HostRateLimiter, rate_limiter as default_rate_limiter
+from app.scraping.circuit_breaker import CircuitBreaker, ProviderUnavailable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ScrapeHTTPClient:
+    """
+    Pooled async HTTP client with per-host concurrency limits.
+
+    The underlying httpx client is bound to the event loop it was created
+    in; a client used from a different loop (e.g. a test with its own
+    loop) is transparently recreated, and the old one closed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        per_host: int = None,
+        http2: bool = None,
+        timeout: float = None,
+        rate_limiter: HostRateLimiter = None,
+    ):
+        self.max_connections = max_connections or config.SCRAPE_MAX_CONNECTIONS
+        self.per_host = per_host or config.SCRAPE_PER_HOST_CONCURRENCY
+        self.timeout = timeout or config.SCRAPE_TIMEOUT_SECONDS
+        self.rate_limiter = rate_limiter or default_rate_limiter
+
+        http2 = config.SCRAPE_HTTP2 if http2 is None else http2
+        if http2 and not _http2_available():
+            logger.warning("SCRAPE_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            previous = self._client
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers=DEFAULT_HEADERS,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=config.SCRAPE_KEEPALIVE_SECONDS,
+                ),
+            )
+            self._loop = loop
+            self._host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+            # Swapped in first so concurrent callers share the new client; then release the old pool
+            if previous is not None:
+                await self._close_previous(previous)
+        return self._client
+
+    @staticmethod
+    async def _close_previous(client: httpx.AsyncClient):
+        """Close a client left behind by another event loop."""
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Its loop may already be closed; the sockets then go with it
+            logger.debug(f"Could not close scrape client from a previous event loop: {e}")
+
+    async def get(
+        self,
+        url: str,
+        headers: dict = None,
+        max_retries: int = 3,
+        timeout: float = None,
+        breaker: CircuitBreaker = None,
+    ) -> Optional[httpx.Response]:
+        """
+        GET a URL with retries and exponential backoff.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers (e.g. User-Agent)
+            max_retries: Maximum attempts
+            timeout: Per-request timeout overriding the client default
+            breaker: Circuit breaker of the provider being scraped
+
+        Returns:
+            The successful response, or None if the server answers with a
+            client error
+
+        Raises:
+            ProviderUnavailable: Retries are exhausted, or the breaker is open
+        """
+        probe = False
+        if breaker is not None:
+            allowed, probe = breaker.allow()
+            if not allowed:
+                raise ProviderUnavailable(f"Circuit for {breaker.name} is open")
+            if probe:
+                max_retries = 1  # Probes are single attempts
+
+        outcome = None
+        try:
+            response = await self._get_with_retries(url, headers, max_retries, timeout)
+            outcome = True
+            return response
+        except ProviderUnavailable:
+            outcome = False
+            raise
+        finally:
+            if breaker is not None:
+                breaker.release(outcome, probe)
+
+    async def _get_with_retries(
+        self,
+        url: str,
+        headers: Optional[dict],
+        max_retries: int,
+        timeout: Optional[float],
+    ) -> Optional[httpx.Response]:
+        client = await self._get_client()
+        host = urlsplit(url).netloc
+
+        for attempt in range(max_retries):
+            backoff = 2 ** attempt
+            try:
+                await self.rate_limiter.acquire(host)
+                async with self._host_limits[host]:
+                    logger.debug(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
+                    response = await client.get(url, headers=headers, timeout=timeout or self.timeout)
+
+                if response.status_code == 429:
+                    backoff = 2 ** (attempt + 1)
+                    logger.warning(f"Rate limited by {host}. Waiting {backoff}s")
+                elif response.status_code >= 500:
+                    logger.warning(f"Server error {response.status_code} from {host}. Backing off {backoff}s")
+                else:
+                    response.raise_for_status()
+                    return response
+
+            except httpx.TimeoutException:
+                logger.warning(f"Timeout fetching {url} on attempt {attempt + 1}")
+            except httpx.HTTPStatusError as e:
+                # The site answered; the page just is not there
+                logger.error(f"Request error for {url}: {e}")
+                return None
+            except httpx.HTTPError as e:
+                logger.error(f"Request error for {url}: {e}")
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(backoff)
+
+        raise ProviderUnavailable(f"{host} failed {max_retries} attempts for {url}")
+
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        if self._loop is asyncio.get_running_loop():
+            await client.aclose()
+        else:
+            await self._close_previous(client)
+
+
+# Global instance
+http_client = ScrapeHTTPClient()
@@ -1,33 +1,34 @@
 """
 IndianKanoon Scraper - Comprehensive Implementation
 Crawls IndianKanoon search results and judgment pages with:
-- Rate limiting and retry logic
+- Rate limiting, retry logic and a circuit breaker
 - Multiple selector fallbacks
 - Citation extraction
 - Metadata parsing
 - Polite, resumable operation
 """
-import requests
+import httpx
 from bs4 import BeautifulSoup
 import logging
-import time
 import re
 import hashlib
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 from urllib.parse import urljoin, quote
+from app.core.config import config
+from app.scraping.http_client import http_client
+from app.scraping.html_extract import ExtractedPage, extract_page
+from app.scraping.circuit_breaker import ProviderUnavailable, get_breaker
 
 logger = logging.getLogger(__name__)
 
 # Configuration
-BASE_URL = "https://indiankanoon.org"
-RATE_LIMIT = 1.0  # 1 request per second
 MAX_RETRIES = 3
 TIMEOUT = 15
 USER_AGENT = "AbsolaLegalScraper/1.0 (Educational)"
 
-# Rate limiting state
-_last_request_time = 0
+# Opens when IndianKanoon keeps failing, so queries stop waiting on it
+circuit_breaker = get_breaker("indiankanoon")
 
 # Citation patterns for Indian law
 CITATION_PATTERNS = [
@@ -37,150 +38,107 @@ CITATION_PATTERNS = [
     r'Section\s+\d+[A-Z]?\s+(of\s+)?IPC',
     r'Article\s+\d+[A-Z]?',
 ]
+CITATION_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in CITATION_PATTERNS]
 
+DOC_LINK = re.compile(r'/doc/(\d+)')
 
-def _rate_limit():
-    """Enforce rate limiting between requests."""
-    global _last_request_time
-    current_time = time.time()
-    time_since_last = current_time - _last_request_time
-    
-    if time_since_last < RATE_LIMIT:
-        sleep_time = RATE_LIMIT - time_since_last
-        logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
-        time.sleep(sleep_time)
-    
-    _last_request_time = time.time()
+# Judgment page fields, extracted in one pass
+JUDGMENT_SELECTORS = {
+    'title': 'h1.doc_title, .doctitle, h1',
+    'court': '.docsource_main, .court_name',
+    'date': '.doc_date, .judgment_date',
+    'body': '#judgments, .judgment_text, .doc_text',
+}
 
 
-def _make_request(url: str, max_retries: int = MAX_RETRIES) -> Optional[requests.Response]:
+async def _make_request(url: str, max_retries: int = MAX_RETRIES) -> Optional[httpx.Response]:
     """
-    Make HTTP request with retry logic and exponential backoff.
+    Make a rate-limited HTTP request through the pooled client with retry logic and exponential backoff.
     
     Args:
         url: URL to fetch
         max_retries: Maximum retry attempts
         
     Returns:
-        Response object or None on failure
+        Response object, or None if the page does not exist
+
+    Raises:
+        ProviderUnavailable: IndianKanoon is failing or its circuit is open
     """
     headers = {
         'User-Agent': USER_AGENT,
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate',
         'DNT': '1',
-        'Connection': 'keep-alive',
     }
-    
-    for attempt in range(max_retries):
-        try:
-            _rate_limit()
-            
-            logger.debug(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
-            
-            response = requests.get(
-                url,
-                headers=headers,
-                timeout=TIMEOUT,
-                allow_redirects=True
-            )
-            
-            # Handle rate limiting
-            if response.status_code == 429:
-                backoff = 2 ** (attempt + 1)
-                logger.warning(f"Rate limited. Waiting {backoff}s")
-                time.sleep(backoff)
-                continue
-            
-            # Handle server errors
-            if response.status_code >= 500:
-                backoff = 2 ** attempt
-                logger.warning(f"Server error {response.status_code}. Backing off {backoff}s")
-                time.sleep(backoff)
-                continue
-            
-            response.raise_for_status()
-            return response
-            
-        except requests.exceptions.Timeout:
-            logger.warning(f"Timeout on attempt {attempt + 1}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
-    
-    return None
+    return await http_client.get(
+        url,
+        headers=headers,
+        max_retries=max_retries,
+        timeout=TIMEOUT,
+        breaker=circuit_breaker,
+    )
+
 
+def _extract_judgment_page(page_html: str) -> ExtractedPage:
+    """
+    Extract judgment fields, citations and cited documents in one pass.
 
-def _extract_citations(text: str) -> List[str]:
-    """Extract legal citations from text."""
-    citations = []
-    for pattern in CITATION_PATTERNS:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        citations.extend(matches)
-    return list(set(citations))  # Remove duplicates
+    Text collection is restricted to the judgment body and metadata
+    elements, so citations come from the judgment rather than navigation
+    or sidebars. Pages without a recognised body are re-read whole so
+    the paragraph fallback still has text to work with.
+    """
+    options = dict(
+        selectors=JUDGMENT_SELECTORS,
+        base_url=config.INDIANKANOON_BASE_URL,
+        link_pattern=DOC_LINK,
+        citation_patterns=CITATION_REGEXES,
+    )
+    page = extract_page(page_html, scope=JUDGMENT_SELECTORS['body'], **options)
+    if 'body' not in page.matches:
+        page = extract_page(page_html, **options)
+    return page
 
 
-def _extract_metadata(soup: BeautifulSoup) -> Dict[str, any]:
+def _extract_metadata(page: ExtractedPage) -> Dict[str, any]:
     """
-    Extract structured metadata from judgment page.
+    Extract structured metadata from an extracted judgment page.
     
     Returns dict with: title, court, date, citation, judges, parties, etc.
     """
-    metadata = {
-        'title': None,
-        'court': None,
-        'date': None,
-        'citation': [],
+    return {
+        'title': page.match_text('title'),
+        'court': page.match_text('court'),
+        'date': page.match_text('date'),
+        'citation': page.citations,
         'judges': [],
         'parties': {},
     }
-    
-    # Extract title
-    title_elem = soup.select_one('h1.doc_title, .doctitle, h1')
-    if title_elem:
-        metadata['title'] = title_elem.get_text(strip=True)
-    
-    # Extract court info
-    court_elem = soup.select_one('.docsource_main, .court_name')
-    if court_elem:
-        metadata['court'] = court_elem.get_text(strip=True)
-    
-    # Extract date
-    date_elem = soup.select_one('.doc_date, .judgment_date')
-    if date_elem:
-        metadata['date'] = date_elem.get_text(strip=True)
-    
-    # Extract citations from full text
-    full_text = soup.get_text(separator=' ')
-    metadata['citation'] = _extract_citations(full_text)
-    
-    return metadata
 
 
-def search_indiankanoon(query: str, max_results: int = 10) -> List[Dict[str, str]]:
+async def search_indiankanoon(query: str, max_results: int = 10, max_retries: int = MAX_RETRIES) -> List[Dict[str, str]]:
     """
     Search IndianKanoon and return list of results with URLs.
     
     Args:
         query: Search term (e.g., "Section 498A IPC")
         max_results: Maximum number of results to return
+        max_retries: Maximum retry attempts per request
         
     Returns:
         List of dicts with 'title', 'url', 'snippet', 'date', 'court'
+
+    Raises:
+        ProviderUnavailable: IndianKanoon is failing or its circuit is open
     """
-    search_url = f"{BASE_URL}/search/?formInput={quote(query)}"
+    base_url = config.INDIANKANOON_BASE_URL
+    search_url = f"{base_url}/search/?formInput={quote(query)}"
     
-    response = _make_request(search_url)
+    response = await _make_request(search_url, max_retries=max_retries)
     if not response:
         logger.error(f"Failed to search for '{query}'")
         return []
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(response.text, 'lxml')
     results = []
     
     # Extract search results
@@ -193,10 +151,10 @@ def search_indiankanoon(query: str, max_results: int = 10) -> List[Dict[str, str
         title_link = div.select_one('a.result_title, a[href*="/doc/"]')
         if title_link:
             result['title'] = title_link.get_text(strip=True)
-            result['url'] = urljoin(BASE_URL, title_link.get('href', ''))
+            result['url'] = urljoin(base_url, title_link.get('href', ''))
             
             # Extract doc ID from URL
-            match = re.search(r'/doc/(\d+)', result['url'])
+            match = DOC_LINK.search(result['url'])
             if match:
                 result['doc_id'] = f"indiankanoon-{match.group(1)}"
         
@@ -218,25 +176,29 @@ def search_indiankanoon(query: str, max_results: int = 10) -> List[Dict[str, str
     return results
 
 
-def fetch_judgment(url: str) -> Optional[Dict[str, any]]:
+async def fetch_judgment(url: str, max_retries: int = MAX_RETRIES) -> Optional[Dict[str, any]]:
     """
     Fetch full judgment from IndianKanoon document URL.
     
     Args:
         url: Full URL to judgment page
+        max_retries: Maximum retry attempts
         
     Returns:
-        Dict with structured data or None on failure
+        Dict with structured data or None if the page does not exist
+
+    Raises:
+        ProviderUnavailable: IndianKanoon is failing or its circuit is open
     """
-    response = _make_request(url)
+    response = await _make_request(url, max_retries=max_retries)
     if not response:
         return None
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    page = _extract_judgment_page(response.text)
     
     # Extract doc ID
     doc_id = None
-    match = re.search(r'/doc/(\d+)', url)
+    match = DOC_LINK.search(url)
     if match:
         doc_id = f"indiankanoon-{match.group(1)}"
     else:
@@ -244,26 +206,16 @@ def fetch_judgment(url: str) -> Optional[Dict[str, any]]:
         doc_id = f"indiankanoon-{hashlib.md5(url.encode()).hexdigest()[:12]}"
     
     # Get metadata
-    metadata = _extract_metadata(soup)
+    metadata = _extract_metadata(page)
     
     # Extract full judgment text
-    full_text_elem = soup.select_one('#judgments, .judgment_text, .doc_text')
-    if full_text_elem:
-        full_text = full_text_elem.get_text(separator='\n', strip=True)
-    else:
+    full_text = page.match_text('body', separator='\n')
+    if not full_text:
         # Fallback: get all paragraphs
-        paragraphs = soup.select('p')
-        full_text = '\n\n'.join(p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 50)
+        full_text = '\n\n'.join(page.block_texts({'p'}, min_chars=50))
     
-    # Extract citations and links
-    cited_docs = []
-    for link in soup.select('a[href*="/doc/"]'):
-        href = link.get('href', '')
-        if href and '/doc/' in href:
-            cited_url = urljoin(BASE_URL, href)
-            match = re.search(r'/doc/(\d+)', cited_url)
-            if match:
-                cited_docs.append(f"indiankanoon-{match.group(1)}")
+    # Cited documents from the links collected in the same pass
+    cited_docs = [f"indiankanoon-{DOC_LINK.search(link).group(1)}" for link in page.links]
     
     return {
         'doc_id': doc_id,
@@ -281,7 +233,7 @@ def fetch_judgment(url: str) -> Optional[Dict[str, any]]:
     }
 
 
-def scrape_indiankanoon(term: str, max_retries: int = 3) -> Optional[str]:
+async def scrape_indiankanoon(term: str, max_retries: int = 3) -> Optional[str]:
     """
     Simple scraper for quick legal term lookup (backward compatible).
     
@@ -295,7 +247,7 @@ def scrape_indiankanoon(term: str, max_retries: int = 3) -> Optional[str]:
     logger.info(f"IndianKanoon: Searching for '{term}'")
     
     # Search for the term
-    results = search_indiankanoon(term, max_results=1)
+    results = await search_indiankanoon(term, max_results=1, max_retries=max_retries)
     
     if not results:
         logger.warning(f"IndianKanoon: No results found for '{term}'")
@@ -304,8 +256,12 @@ def scrape_indiankanoon(term: str, max_retries: int = 3) -> Optional[str]:
     # Get first result
     first_result = results[0]
     
-    # Try to fetch full judgment
-    judgment = fetch_judgment(first_result['url'])
+    # Try to fetch full judgment; the search snippet still helps if that fails
+    try:
+        judgment = await fetch_judgment(first_result['url'], max_retries=max_retries)
+    except ProviderUnavailable as e:
+        logger.warning(f"IndianKanoon: Could not fetch judgment for '{term}': {e}")
+        judgment = None
     
     if judgment and judgment.get('full_text'):
         # Return summary: title + snippet of text (max 1500 chars)
@@ -0,0 +1,184 @@
+"""
+Per-host token-bucket rate limiter for the scrapers.
+
+Each host has a bucket refilled at SCRAPE_RATE_PER_SECOND up to
+SCRAPE_RATE_BURST tokens. Bucket state lives in a small JSON file per host
+under SCRAPE_RATE_STATE_DIR, updated under an exclusive fcntl lock, so all
+uvicorn workers on the machine share one budget per site. Where fcntl is
+unavailable (Windows) buckets fall back to process-local state.
+
+A caller takes a token by reserving the next free slot and then sleeping
+with asyncio.sleep until it arrives; the event loop is never blocked.
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from app.core.config import config
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class HostRateLimiter:
+    """
+    Token bucket per host, shared across threads and worker processes.
+    """
+
+    def __init__(self, rate: float = None, burst: int = None, state_dir: str = None):
+        self.rate = rate or config.SCRAPE_RATE_PER_SECOND
+        self.burst = max(burst or config.SCRAPE_RATE_BURST, 1)
+        self.state_dir = state_dir or config.SCRAPE_RATE_STATE_DIR
+        self.shared = fcntl is not None
+        if not self.shared:
+            logger.warning("fcntl is unavailable; scrape rate limits are per process")
+
+        self._lock = threading.Lock()  # Serializes bucket updates (held across the file lock)
+        self._metrics_lock = threading.Lock()  # Taken on the event loop; never held while waiting on files
+        self._buckets: dict[str, tuple[float, float]] = {}  # Process-local fallback: host -> (tokens, updated)
+        self._metrics = defaultdict(lambda: {
+            "acquired": 0,
+            "delayed": 0,
+            "waiting": 0,
+            "totalWaitSeconds": 0.0,
+            "maxWaitSeconds": 0.0,
+        })
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _reserve_slot(self, tokens: float, updated: float, now: float) -> tuple[float, float]:
+        """Refill a bucket, take one token and return (tokens left, seconds to wait)."""
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate) - 1.0
+        return tokens, max(-tokens / self.rate, 0.0)
+
+    def _refund_slot(self, tokens: float, updated: float, now: float) -> tuple[float, float]:
+        """Refill a bucket and give back one unused token."""
+        return min(float(self.burst), tokens + (now - updated) * self.rate + 1.0), 0.0
+
+    def _state_path(self, host: str) -> str:
+        return os.path.join(self.state_dir, re.sub(r'[^A-Za-z0-9.-]', '_', host) + ".json")
+
+    def _update_shared(self, host: str, update) -> float:
+        """Apply update(tokens, updated, now) -> (tokens, result) to the host's state file under its lock."""
+        fd = os.open(self._state_path(host), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            now = time.time()
+            try:
+                state = json.loads(raw)
+                tokens, updated = float(state["tokens"]), float(state["updated"])
+            except (ValueError, KeyError, TypeError):
+                tokens, updated = float(self.burst), now
+
+            tokens, result = update(tokens, updated, now)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({"tokens": tokens, "updated": now}).encode())
+            return result
+        finally:
+            os.close(fd)  # Also releases the lock
+
+    def _update_local(self, host: str, update) -> float:
+        now = time.time()
+        tokens, updated = self._buckets.get(host, (float(self.burst), now))
+        tokens, result = update(tokens, updated, now)
+        self._buckets[host] = (tokens, now)
+        return result
+
+    def _update(self, host: str, update) -> float:
+        with self._lock:
+            if self.shared:
+                try:
+                    return self._update_shared(host, update)
+                except OSError as e:
+                    logger.warning(f"Rate limit state for {host} unavailable, using local bucket: {e}")
+            return self._update_local(host, update)
+
+    def _reserve(self, host: str) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        return self._update(host, self._reserve_slot)
+
+    def _refund(self, host: str):
+        """Return a token that was reserved but never used."""
+        self._update(host, self._refund_slot)
+
+    def _refund_cancelled(self, host: str):
+        """Done-callback for a reservation whose caller was cancelled."""
+        def refund(reservation: asyncio.Future):
+            if reservation.cancelled() or reservation.exception() is not None:
+                return
+            try:
+                asyncio.get_running_loop().run_in_executor(None, self._refund, host)
+            except RuntimeError:  # Loop shutting down
+                self._refund(host)
+        return refund
+
+    async def acquire(self, host: str) -> float:
+        """
+        Wait until a request to host is allowed.
+
+        Args:
+            host: Host (netloc) the request goes to
+
+        Returns:
+            Seconds spent waiting for a token
+        """
+        with self._metrics_lock:
+            metrics = self._metrics[host]
+            metrics["waiting"] += 1
+        wait = 0.0
+        # The file lock may be contended by other workers; keep it off the event loop
+        reservation = asyncio.ensure_future(asyncio.to_thread(self._reserve, host))
+        try:
+            # Shielded so a cancelled caller still learns when the thread has taken the token
+            wait = await asyncio.shield(reservation)
+            if wait > 0:
+                logger.debug(f"Rate limiting {host}: waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # The reserved token (taken now or once the thread finishes) will never be used
+            reservation.add_done_callback(self._refund_cancelled(host))
+            raise
+        finally:
+            with self._metrics_lock:
+                metrics["waiting"] -= 1
+
+        with self._metrics_lock:
+            metrics["acquired"] += 1
+            if wait > 0:
+                metrics["delayed"] += 1
+                metrics["totalWaitSeconds"] += wait
+                metrics["maxWaitSeconds"] = max(metrics["maxWaitSeconds"], wait)
+        return wait
+
+    def stats(self) -> dict:
+        """Queue-wait metrics per host for this process."""
+        hosts = {}
+        with self._metrics_lock:
+            snapshot = {host: dict(metrics) for host, metrics in self._metrics.items()}
+        for host, metrics in snapshot.items():
+            acquired = metrics["acquired"]
+            hosts[host] = dict(
+                metrics,
+                totalWaitSeconds=round(metrics["totalWaitSeconds"], 3),
+                maxWaitSeconds=round(metrics["maxWaitSeconds"], 3),
+                avgWaitSeconds=round(metrics["totalWaitSeconds"] / acquired, 3) if acquired else 0.0,
+            )
+        return {
+            "ratePerSecond": self.rate,
+            "burst": self.burst,
+            "sharedAcrossProcesses": self.shared,
+            "hosts": hosts,
+        }
+
+
+# Global instance
+rate_limiter = HostRateLimiter()
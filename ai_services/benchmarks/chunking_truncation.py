@@ -0,0 +1,64 @@
+"""
+Chunking truncation benchmark.
+
+Chunks documents with the previous character-based splitter (1,200 chars,
+200 overlap) and with the token-based splitter, and reports how many chunks
+exceed the embedder's max_seq_length (and so lose their tail at encoding
+time) plus the padding wasted in 16-chunk encode batches.
+
+Usage (from ai_services/):
+    python -m benchmarks.chunking_truncation path/to/document.pdf [more files...]
+"""
+import argparse
+import time
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from app.api.ingest import extract_text
+from app.core.chunking import SEPARATORS, chunk_text
+from app.core.embeddings import get_embedding_model
+
+LEGACY_CHUNK_SIZE = 1200
+LEGACY_CHUNK_OVERLAP = 200
+
+
+def _stats(chunks: list[str], batch_size: int = 16) -> dict:
+    model = get_embedding_model()
+    lengths = [len(ids) for ids in model.tokenizer(chunks, return_attention_mask=False)["input_ids"]]
+    truncated = sum(1 for n in lengths if n > model.max_seq_length)
+    lost = sum(max(n - model.max_seq_length, 0) for n in lengths)
+
+    # Padding: every chunk in a batch is padded to the batch's longest (capped) sequence
+    capped = [min(n, model.max_seq_length) for n in lengths]
+    padding = 0
+    for start in range(0, len(capped), batch_size):
+        batch = capped[start:start + batch_size]
+        padding += max(batch) * len(batch) - sum(batch)
+
+    return {"chunks": len(chunks), "truncated": truncated, "lost_tokens": lost, "padding_tokens": padding}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="PDF, DOCX or TXT files")
+    args = parser.parse_args()
+
+    legacy = RecursiveCharacterTextSplitter(
+        chunk_size=LEGACY_CHUNK_SIZE,
+        chunk_overlap=LEGACY_CHUNK_OVERLAP,
+        length_function=len,
+        separators=SEPARATORS,
+    )
+
+    print(f"{'file':<40} {'splitter':<8} {'chunks':>7} {'trunc.':>7} {'lost tok':>9} {'pad tok':>8} {'sec':>6}")
+    for path in args.files:
+        text = extract_text(path)
+        for name, split in [("chars", legacy.split_text), ("tokens", chunk_text)]:
+            started = time.perf_counter()
+            chunks = split(text)
+            elapsed = time.perf_counter() - started
+            stats = _stats(chunks)
+            print(f"{path[-40:]:<40} {name:<8} {stats['chunks']:>7} {stats['truncated']:>7} "
+                  f"{stats['lost_tokens']:>9} {stats['padding_tokens']:>8} {elapsed:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
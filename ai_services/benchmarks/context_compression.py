@@ -0,0 +1,102 @@
+"""
+Context compression benchmark.
+
+Runs a fixed question set against a FAISS index and reports, per question,
+the estimated prompt tokens with and without extractive compression. With
+--with-llm, both contexts are also answered by Gemini and the token-level
+F1 overlap between the two answers is reported.
+
+Usage (from ai_services/):
+    python -m benchmarks.context_compression --index data/vector_indexes/<id>/index.faiss
+"""
+import argparse
+import json
+import re
+from collections import Counter
+from langchain.prompts import ChatPromptTemplate
+from app.core.compression import compress_chunks
+from app.core.config import config
+from app.core.embeddings import embed_query
+from app.core.gemini_client import get_gemini_llm
+from app.persistence.faiss_store import faiss_store
+from app.pipelines.rag_chain import RAG_PROMPT_TEMPLATE
+
+DEFAULT_QUESTIONS = [
+    "Who are the parties to this agreement and what is the effective date?",
+    "What are the payment terms and financial obligations?",
+    "Under what conditions can the agreement be terminated?",
+    "What confidentiality obligations apply to the parties?",
+    "Who owns the intellectual property created under this agreement?",
+    "What are the limitations of liability and indemnification clauses?",
+    "Which law governs the agreement and where are disputes resolved?",
+    "What penalties apply for breach of contract?",
+]
+
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r'\w+', text.lower())
+
+
+def answer_overlap(reference: str, candidate: str) -> float:
+    """Token-level F1 between two answers."""
+    ref, cand = Counter(_tokens(reference)), Counter(_tokens(candidate))
+    common = sum((ref & cand).values())
+    if not common:
+        return 0.0
+    precision = common / sum(cand.values())
+    recall = common / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _answer(context_chunks: list[str], question: str) -> str:
+    context = "\n\n".join(
+        f"<CHUNK {i}>\n{chunk}\n</CHUNK {i}>" for i, chunk in enumerate(context_chunks, 1) if chunk
+    )
+    messages = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE).format_messages(
+        context=context, query=question, user_prompt=""
+    )
+    return get_gemini_llm(temperature=0).invoke(messages).content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", required=True, help="Path to index.faiss")
+    parser.add_argument("--questions", help="JSON file with a list of questions (default: built-in set)")
+    parser.add_argument("--budget", type=int, default=config.RAG_CONTEXT_TOKEN_BUDGET, help="Token budget")
+    parser.add_argument("--with-llm", action="store_true", help="Also compare Gemini answers")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, 'r', encoding='utf-8') as f:
+            questions = json.load(f)
+
+    totals = Counter()
+    overlaps = []
+    print(f"{'question':<60} {'full':>7} {'compr.':>7} {'saved':>6} {'F1':>6}")
+    for question in questions:
+        query_embedding = embed_query(question)
+        results = faiss_store.search(args.index, query_embedding, k=config.RAG_TOP_K)
+        chunks = [chunk for chunk, _ in results]
+        compressed, stats = compress_chunks([query_embedding], chunks, token_budget=args.budget)
+
+        totals["original"] += stats["original_tokens"]
+        totals["compressed"] += stats["compressed_tokens"]
+        saved = 1 - stats["compressed_tokens"] / max(stats["original_tokens"], 1)
+
+        overlap = ""
+        if args.with_llm:
+            score = answer_overlap(_answer(chunks, question), _answer(compressed, question))
+            overlaps.append(score)
+            overlap = f"{score:.2f}"
+
+        print(f"{question[:60]:<60} {stats['original_tokens']:>7} {stats['compressed_tokens']:>7} {saved:>6.0%} {overlap:>6}")
+
+    reduction = 1 - totals["compressed"] / max(totals["original"], 1)
+    print(f"\nTotal tokens: {totals['original']} -> {totals['compressed']} ({reduction:.0%} reduction)")
+    if overlaps:
+        print(f"Mean answer overlap (token F1): {sum(overlaps) / len(overlaps):.2f}")
+
+
+if __name__ == "__main__":
+    main()
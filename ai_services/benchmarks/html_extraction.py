@@ -0,0 +1,126 @@
+"""
+HTML extraction benchmark.
+
+Times the previous BeautifulSoup extraction against the single-pass lxml
+extractor on the same pages: the TLDRLegal longest-block fallback and the
+IndianKanoon judgment fields (metadata, body text, citations, links).
+Pages come from a directory of saved .html files, or are generated with
+nested containers, which is where the old get_text-per-container approach
+goes quadratic.
+
+Usage (from ai_services/):
+    python -m benchmarks.html_extraction --depth 8 --paragraphs 400
+    python -m benchmarks.html_extraction --fixtures path/to/saved_pages
+"""
+import argparse
+import glob
+import os
+import re
+import time
+from bs4 import BeautifulSoup
+from app.scraping.html_extract import extract_page
+from app.scraping.indiankanoon import CITATION_PATTERNS, _extract_judgment_page
+from app.scraping.tldrlegal import _longest_text_block
+
+
+def synthetic_page(depth: int, paragraphs: int) -> str:
+    """A judgment-like page with paragraphs inside depth levels of nested divs."""
+    body = "".join(
+        f"<p>Paragraph {i}: relying on AIR 1978 SC {i} and Article {i % 30}, the court "
+        f"considered the appeal under Section {i % 500} of IPC and <a href='/doc/{i}/'>cited</a> "
+        f"the earlier ruling before reaching its conclusion.</p>"
+        for i in range(paragraphs)
+    )
+    for level in range(depth):
+        body = f"<div class='content level{level}'><section>{body}</section></div>"
+    return (
+        "<html><head><title>Judgment</title><script>var x = 1;</script></head><body>"
+        "<nav>Home | Search | Article 1</nav><h1 class='doc_title'>State v. Example</h1>"
+        "<div class='docsource_main'>Supreme Court of India</div>"
+        f"<div class='doc_date'>1 January 2020</div><div id='judgments'>{body}</div>"
+        "</body></html>"
+    )
+
+
+def old_longest_block(page_html: str) -> str | None:
+    """Previous tldrlegal fallback: get_text on every candidate container."""
+    soup = BeautifulSoup(page_html, 'html.parser')
+    candidates = []
+    for sel in ['article', 'main', 'div.card-body', 'div.content', 'div.entry-content', 'section', 'div']:
+        for el in soup.select(sel):
+            text = el.get_text(separator=' ', strip=True)
+            if text and len(text) > 100:
+                candidates.append(text)
+    return max(candidates, key=len) if candidates else None
+
+
+def old_judgment(page_html: str) -> dict:
+    """Previous fetch_judgment parsing: html.parser, select per field, full-page get_text for citations."""
+    soup = BeautifulSoup(page_html, 'html.parser')
+    fields = {}
+    for name, selector in [
+        ('title', 'h1.doc_title, .doctitle, h1'),
+        ('court', '.docsource_main, .court_name'),
+        ('date', '.doc_date, .judgment_date'),
+    ]:
+        element = soup.select_one(selector)
+        fields[name] = element.get_text(strip=True) if element else None
+    full_text = soup.get_text(separator=' ')
+    fields['citation'] = list({m for p in CITATION_PATTERNS for m in re.findall(p, full_text, re.IGNORECASE)})
+    body = soup.select_one('#judgments, .judgment_text, .doc_text')
+    fields['full_text'] = body.get_text(separator='\n', strip=True) if body else ""
+    fields['cites'] = [link.get('href') for link in soup.select('a[href*="/doc/"]')]
+    return fields
+
+
+def new_longest_block(page_html: str) -> str | None:
+    return _longest_text_block(extract_page(page_html))
+
+
+def new_judgment(page_html: str) -> dict:
+    page = _extract_judgment_page(page_html)
+    return dict(page.metadata, citation=page.citations, cites=page.links)
+
+
+def _time(fn, page_html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(page_html)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Directory of saved .html pages (default: synthetic pages)")
+    parser.add_argument("--depth", type=int, default=8, help="Nesting depth of synthetic pages")
+    parser.add_argument("--paragraphs", type=int, default=400, help="Paragraphs per synthetic page")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [
+            (f"synthetic d={depth} p={args.paragraphs}", synthetic_page(depth, args.paragraphs))
+            for depth in sorted({1, max(args.depth // 2, 1), args.depth})
+        ]
+
+    print(f"{'page':<28} {'KB':>6} {'block old':>10} {'block new':>10} {'judg. old':>10} {'judg. new':>10}")
+    for name, page_html in pages:
+        timings = [
+            _time(fn, page_html, args.repeat)
+            for fn in (old_longest_block, new_longest_block, old_judgment, new_judgment)
+        ]
+        print(
+            f"{name[:28]:<28} {len(page_html) / 1024:>6.0f} "
+            + " ".join(f"{seconds * 1000:>8.1f}ms" for seconds in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Scraper HTTP client benchmark.
+
+Serves a TLDRLegal-style page from a local keep-alive fixture server and
+fetches it N times, once with a bare requests.get per call (the old
+scraper behaviour) and once through scrape_tldrlegal on the pooled async
+client. Reports wall time and the number of TCP connections the server
+accepted for each run. The pooled run uses an effectively unlimited rate
+limiter with its own state directory.
+
+Usage (from ai_services/):
+    python -m benchmarks.scrape_client --requests 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from app.core.config import config
+from app.scraping import tldrlegal
+from app.scraping.http_client import ScrapeHTTPClient
+from app.scraping.rate_limiter import HostRateLimiter
+
+FIXTURE_PAGE = (
+    "<html><body><div class='summary'>"
+    + "The MIT License is a short and simple permissive license. " * 10
+    + "</div></body></html>"
+).encode("utf-8")
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def _handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep connections open between requests
+        disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(FIXTURE_PAGE)))
+            self.end_headers()
+            self.wfile.write(FIXTURE_PAGE)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def run_requests(base_url: str, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        requests.get(f"{base_url}/search?q=MIT", timeout=10).raise_for_status()
+    return time.perf_counter() - started
+
+
+async def run_pooled(count: int, concurrency: int) -> float:
+    limiter = HostRateLimiter(rate=1e6, burst=count, state_dir=tempfile.mkdtemp())
+    client = ScrapeHTTPClient(per_host=concurrency, rate_limiter=limiter)
+    tldrlegal.http_client = client
+    started = time.perf_counter()
+    results = await asyncio.gather(*(tldrlegal.scrape_tldrlegal("MIT") for _ in range(count)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    assert all(results), "fixture page was not parsed"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Fetches per run")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Server-side delay per response")
+    parser.add_argument("--concurrency", type=int, default=config.SCRAPE_PER_HOST_CONCURRENCY,
+                        help="Per-host concurrency for the pooled client")
+    args = parser.parse_args()
+
+    server = FixtureServer(("127.0.0.1", 0), _handler(args.latency_ms / 1000.0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    config.TLDRLEGAL_BASE_URL = base_url
+
+    try:
+        print(f"{'client':<22} {'seconds':>8} {'req/s':>8} {'connections':>12}")
+
+        server.connections = 0
+        elapsed = run_requests(base_url, args.requests)
+        print(f"{'requests.get':<22} {elapsed:>8.2f} {args.requests / elapsed:>8.1f} {server.connections:>12}")
+
+        server.connections = 0
+        elapsed = asyncio.run(run_pooled(args.requests, args.concurrency))
+        label = f"pooled (x{args.concurrency})"
+        print(f"{label:<22} {elapsed:>8.2f} {args.requests / elapsed:>8.1f} {server.connections:>12}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Summarizer runtime benchmark.
+
+Summarizes the same inputs with the fp32 reference pipeline and an
+optimized runtime (int8 or onnx), then reports per-runtime latency and the
+ROUGE-L drift of the optimized output against the fp32 output.
+
+Usage (from ai_services/):
+    python -m benchmarks.summarizer_runtime --runtime int8 --inputs path/to/texts/
+"""
+import argparse
+import os
+import statistics
+import time
+from app.core.config import config
+from app.pipelines.summarize_chain import (
+    LEGAL_SUMMARY_PROMPT,
+    SUMMARY_MAX_LENGTH,
+    SUMMARY_MIN_LENGTH,
+    build_summarizer,
+    configure_threads,
+)
+
+SAMPLE_TEXT = """This Services Agreement is entered into on 1 April 2024 between Absola Legal Services Private Limited,
+a company incorporated under the Companies Act, 2013 ("Service Provider"), and Meridian Traders LLP ("Client").
+The Client shall pay the Service Provider a monthly fee of INR 2,50,000 within fifteen days of receipt of an invoice.
+Late payments carry interest at 12% per annum. The agreement has an initial term of two years and renews automatically
+for successive one-year terms unless either party gives ninety days' written notice of non-renewal. Either party may
+terminate for material breach that remains uncured thirty days after notice. Each party shall keep confidential all
+non-public information disclosed by the other, and all intellectual property created in the course of the services
+vests in the Client upon full payment. The Service Provider's aggregate liability is capped at the fees paid in the
+twelve months preceding the claim, and each party indemnifies the other against third-party claims arising from its
+negligence. This agreement is governed by the laws of India and the courts at Mumbai have exclusive jurisdiction."""
+
+
+def _tokens(text: str) -> list[str]:
+    return text.lower().split()
+
+
+def rouge_l(reference: str, candidate: str) -> float:
+    """ROUGE-L F1 between two texts (longest common subsequence over tokens)."""
+    ref, cand = _tokens(reference), _tokens(candidate)
+    if not ref or not cand:
+        return 0.0
+    previous = [0] * (len(cand) + 1)
+    for r in ref:
+        current = [0]
+        for j, c in enumerate(cand, 1):
+            current.append(previous[j - 1] + 1 if r == c else max(previous[j], current[j - 1]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(cand), lcs / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _load_inputs(path: str | None) -> list[str]:
+    if not path:
+        return [SAMPLE_TEXT]
+    texts = []
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".txt"):
+            with open(os.path.join(path, name), 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+    return texts
+
+
+def _run(summarizer, texts: list[str], repeats: int) -> tuple[list[str], list[float]]:
+    outputs, latencies = [], []
+    for text in texts:
+        prompt = LEGAL_SUMMARY_PROMPT.format(document_text=text[:4096])
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = summarizer(
+                prompt,
+                max_length=SUMMARY_MAX_LENGTH,
+                min_length=SUMMARY_MIN_LENGTH,
+                do_sample=False,
+                truncation=True,
+            )
+            latencies.append(time.perf_counter() - started)
+        outputs.append(result[0]['generated_text'])
+    return outputs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runtime", default="int8", choices=["int8", "onnx"], help="Optimized runtime to compare")
+    parser.add_argument("--inputs", help="Directory of .txt documents (default: built-in sample)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per input")
+    args = parser.parse_args()
+
+    configure_threads()
+    texts = _load_inputs(args.inputs)
+
+    results = {}
+    for runtime in ["fp32", args.runtime]:
+        summarizer = build_summarizer(runtime)
+        _run(summarizer, texts[:1], 1)  # Warm-up
+        results[runtime] = _run(summarizer, texts, args.repeats)
+
+    print(f"{len(texts)} inputs x {args.repeats} runs, {config.SUMMARIZER_INTRA_OP_THREADS} intra-op threads\n")
+    print(f"{'runtime':<8} {'mean s':>8} {'p50 s':>8} {'max s':>8}")
+    for runtime, (_, latencies) in results.items():
+        print(f"{runtime:<8} {statistics.mean(latencies):>8.2f} {statistics.median(latencies):>8.2f} {max(latencies):>8.2f}")
+
+    reference, optimized = results["fp32"][0], results[args.runtime][0]
+    drift = [rouge_l(ref, opt) for ref, opt in zip(reference, optimized)]
+    speedup = statistics.mean(results["fp32"][1]) / statistics.mean(results[args.runtime][1])
+    print(f"\nSpeed-up: {speedup:.2f}x")
+    print(f"ROUGE-L vs fp32: mean {statistics.mean(drift):.3f}, min {min(drift):.3f}")
+
+
+if __name__ == "__main__":
+    main()
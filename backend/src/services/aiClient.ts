@@ -3,18 +3,28 @@ import { config } from '../config/env';
 import { logger } from '../config/logger';
 import {
   IngestResponse,
+  IngestJobResponse,
   SummaryResponse,
   QueryResponse,
   ScrapeResponse,
 } from '../types';
 
+const REQUEST_TIMEOUT_MS = 120000; // 2 minutes for long operations
+// Budget advertised to the AI service so it stops work before we give up waiting
+const AI_DEADLINE_MS = REQUEST_TIMEOUT_MS - 5000;
+// Ingest runs as a background job on the AI service; poll until it finishes
+const INGEST_POLL_INTERVAL_MS = 2000;
+const INGEST_MAX_WAIT_MS = 60 * 60 * 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 class AIClient {
   private client: AxiosInstance;
 
   constructor() {
     this.client = axios.create({
       baseURL: config.ai.baseUrl,
-      timeout: 120000, // 2 minutes for long operations
+      timeout: REQUEST_TIMEOUT_MS,
       headers: {
         'Content-Type': 'application/json',
       },
@@ -24,22 +34,39 @@ class AIClient {
   async ingest(filepath: string): Promise<IngestResponse> {
     try {
       logger.info({ filepath }, 'AI: Ingesting document');
-      const response = await this.client.post<IngestResponse>('/ingest', {
+      const submitted = await this.client.post<IngestJobResponse>('/ingest/jobs', {
         filepath,
       });
-      logger.info({ result: response.data }, 'AI: Ingest complete');
-      return response.data;
+      const jobId = submitted.data.jobId;
+      const startedAt = Date.now();
+
+      while (Date.now() - startedAt < INGEST_MAX_WAIT_MS) {
+        await sleep(INGEST_POLL_INTERVAL_MS);
+        const { data: job } = await this.client.get<IngestJobResponse>(`/ingest/${jobId}`);
+
+        if (job.status === 'completed' && job.result) {
+          logger.info({ jobId, result: job.result, timings: job.timings }, 'AI: Ingest complete');
+          return job.result;
+        }
+        if (job.status === 'failed') {
+          throw new Error(job.error || 'Ingest job failed');
+        }
+        logger.debug({ jobId, stage: job.stage, progress: job.progress }, 'AI: Ingest in progress');
+      }
+
+      throw new Error(`Ingest job ${jobId} did not finish in time`);
     } catch (error) {
       logger.error({ error }, 'AI: Ingest failed');
       throw new Error('Failed to ingest document');
     }
   }
 
-  async summarize(text: string): Promise<SummaryResponse> {
+  async summarize(filepath: string): Promise<SummaryResponse> {
     try {
-      logger.info('AI: Generating summary');
+      logger.info({ filepath }, 'AI: Generating summary');
+      // The AI service reads the file itself (served from its extracted-text cache after ingest)
       const response = await this.client.post<SummaryResponse>('/summarize', {
-        text,
+        filepath,
       });
       logger.info('AI: Summary complete');
       return response.data;
@@ -56,11 +83,18 @@ class AIClient {
   ): Promise<QueryResponse> {
     try {
       logger.info({ query, hasUserPrompt: !!userPrompt }, 'AI: Processing query');
-      const response = await this.client.post<QueryResponse>('/query', {
-        query,
-        faissIndexPath,
-        userPrompt,
-      });
+      const response = await this.client.post<QueryResponse>(
+        '/query',
+        {
+          query,
+          faissIndexPath,
+          userPrompt,
+        },
+        { headers: { 'X-Request-Timeout-Ms': String(AI_DEADLINE_MS) } }
+      );
+      if (response.data.degraded?.length) {
+        logger.warn({ degraded: response.data.degraded }, 'AI: Query degraded to meet deadline');
+      }
       logger.info('AI: Query complete');
       return response.data;
     } catch (error) {
@@ -69,6 +103,21 @@ class AIClient {
     }
   }
 
+  async deleteIndex(documentId: string): Promise<boolean> {
+    try {
+      logger.info({ documentId }, 'AI: Deleting document index');
+      // The AI service also removes the shared content index once no document references it
+      await this.client.delete(`/documents/${encodeURIComponent(documentId)}/index`);
+      return true;
+    } catch (error) {
+      if (axios.isAxiosError(error) && error.response?.status === 404) {
+        return false;
+      }
+      logger.error({ error }, 'AI: Index delete failed');
+      throw new Error('Failed to delete document index');
+    }
+  }
+
   async scrape(term: string): Promise<ScrapeResponse> {
     try {
       logger.info({ term }, 'AI: Scraping context');
@@ -55,9 +55,13 @@ export class DocumentService {
     const docPath = getDocumentPath(id);
     await fs.rm(docPath, { recursive: true, force: true });
 
-    // Delete FAISS index if exists
+    // Delete FAISS index if exists (its directory only holds a ref.json to the shared index)
     if (doc.faissIndexPath) {
-      await fs.rm(doc.faissIndexPath, { recursive: true, force: true });
+      try {
+        await aiClient.deleteIndex(id);
+      } catch (error) {
+        logger.warn({ documentId: id, error }, 'Document index could not be deleted');
+      }
     }
 
     await Document.findByIdAndDelete(id);
@@ -101,8 +105,7 @@ export class DocumentService {
     }
 
     // Generate summary
-    const fileContent = await fs.readFile(doc.localFilepath, 'utf-8');
-    const result = await aiClient.summarize(fileContent);
+    const result = await aiClient.summarize(doc.localFilepath);
 
     // Cache summary
     doc.summary = result.summary;
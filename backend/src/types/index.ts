@@ -35,6 +35,33 @@ export interface ApiResponse<T = any> {
 export interface IngestResponse {
   faissIndexPath: string;
   chunks: number;
+  pages?: number;
+  truncatedChunks?: number;
+  extractSeconds?: number;
+}
+
+export interface IngestJobResponse {
+  jobId: string;
+  filepath: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  stage: string;
+  progress: {
+    pages: number;
+    totalPages: number;
+    chunks: number;
+    percent: number;
+  };
+  timings: {
+    submittedAt: number;
+    startedAt?: number;
+    finishedAt?: number;
+    queueSeconds?: number;
+    runSeconds?: number;
+    stageSeconds: Record<string, number>;
+  };
+  attempts: number;
+  result?: IngestResponse;
+  error?: string;
 }
 
 export interface SummaryResponse {
@@ -44,6 +71,7 @@ export interface SummaryResponse {
 export interface QueryResponse {
   answer: string;
   sources: string[];
+  degraded?: string[];
 }
 
 export interface ScrapeResponse {
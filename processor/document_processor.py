@@ -4,22 +4,46 @@ Handles text extraction and preprocessing.
 """
 
 import logging
+import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pypdf import PdfReader
 import pdfplumber
 from docx import Document
 
+from .text_cache import TextCache, hash_file
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Text cache extractor names. Both drop empty pages/paragraphs, which the AI
+# service's extractors ("pypdf2", "docx-paragraphs") keep, so the keys differ.
+PDFPLUMBER = "pdfplumber"
+PYPDF = "pypdf-nonempty"
+DOCX = "docx-nonempty"
+
 
 class DocumentProcessor:
     """Process and extract text from various document formats."""
 
-    def __init__(self):
-        """Initialize document processor."""
+    def __init__(self, text_cache: Optional[TextCache] = None, use_cache: bool = True):
+        """
+        Initialize document processor.
+
+        Args:
+            text_cache: Extracted-text cache (default: created on first use)
+            use_cache: Consult and fill the text cache in process_document
+        """
         self.supported_formats = [".pdf", ".docx"]
+        self.use_cache = use_cache
+        self._text_cache = text_cache
+
+    @property
+    def text_cache(self) -> TextCache:
+        """Extracted-text cache, created on first use."""
+        if self._text_cache is None:
+            self._text_cache = TextCache()
+        return self._text_cache
 
     def is_supported(self, file_path: str) -> bool:
         """
@@ -44,43 +68,69 @@ class DocumentProcessor:
         Returns:
             Extracted text
         """
+        return "\n\n".join(text for _, text in self.extract_pdf_pages(file_path, use_pdfplumber))
+
+    def extract_pdf_pages(self, file_path: str, use_pdfplumber: bool = True) -> List[Tuple[int, str]]:
+        """
+        Extract text from PDF file page by page.
+
+        Args:
+            file_path: Path to PDF file
+            use_pdfplumber: Use pdfplumber (better for complex PDFs) vs PyPDF2
+
+        Returns:
+            (page_number, text) pairs for pages with text
+        """
+        return self._extract_pdf_pages(file_path, use_pdfplumber)[0]
+
+    def _extract_pdf_pages(self, file_path: str, use_pdfplumber: bool = True) -> Tuple[List[Tuple[int, str]], str]:
+        """
+        Extract PDF pages, falling back to the other library on failure.
+
+        Returns:
+            Tuple of ((page_number, text) pairs, name of the extractor that produced them)
+        """
+        order = [PDFPLUMBER, PYPDF] if use_pdfplumber else [PYPDF, PDFPLUMBER]
+        extract = {PDFPLUMBER: self._pages_with_pdfplumber, PYPDF: self._pages_with_pypdf2}
         try:
-            if use_pdfplumber:
-                return self._extract_with_pdfplumber(file_path)
-            else:
-                return self._extract_with_pypdf2(file_path)
+            return extract[order[0]](file_path), order[0]
         except Exception as e:
             logger.error(f"Error extracting PDF text: {e}")
             # Try alternate method
             try:
-                if use_pdfplumber:
-                    return self._extract_with_pypdf2(file_path)
-                else:
-                    return self._extract_with_pdfplumber(file_path)
+                return extract[order[1]](file_path), order[1]
             except Exception as e2:
                 logger.error(f"Alternate extraction also failed: {e2}")
                 raise
 
     def _extract_with_pdfplumber(self, file_path: str) -> str:
         """Extract text using pdfplumber."""
-        text = []
+        return "\n\n".join(text for _, text in self._pages_with_pdfplumber(file_path))
+
+    def _extract_with_pypdf2(self, file_path: str) -> str:
+        """Extract text using pypdf."""
+        return "\n\n".join(text for _, text in self._pages_with_pypdf2(file_path))
+
+    def _pages_with_pdfplumber(self, file_path: str) -> List[Tuple[int, str]]:
+        """Extract (page_number, text) pairs using pdfplumber."""
+        pages = []
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
+            for number, page in enumerate(pdf.pages, 1):
                 page_text = page.extract_text()
                 if page_text:
-                    text.append(page_text)
-        return "\n\n".join(text)
+                    pages.append((number, page_text))
+        return pages
 
-    def _extract_with_pypdf2(self, file_path: str) -> str:
-        """Extract text using pypdf."""
-        text = []
+    def _pages_with_pypdf2(self, file_path: str) -> List[Tuple[int, str]]:
+        """Extract (page_number, text) pairs using pypdf."""
+        pages = []
         with open(file_path, "rb") as file:
             pdf_reader = PdfReader(file)
-            for page in pdf_reader.pages:
+            for number, page in enumerate(pdf_reader.pages, 1):
                 page_text = page.extract_text()
                 if page_text:
-                    text.append(page_text)
-        return "\n\n".join(text)
+                    pages.append((number, page_text))
+        return pages
 
     def extract_text_from_docx(self, file_path: str) -> str:
         """
@@ -92,17 +142,66 @@ class DocumentProcessor:
         Returns:
             Extracted text
         """
+        return "\n\n".join(text for _, text in self.extract_docx_paragraphs(file_path))
+
+    def extract_docx_paragraphs(self, file_path: str) -> List[Tuple[int, str]]:
+        """
+        Extract non-empty paragraphs from DOCX file.
+
+        Args:
+            file_path: Path to DOCX file
+
+        Returns:
+            (1, paragraph) pairs; DOCX files have no pages
+        """
         try:
             doc = Document(file_path)
-            text = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text.append(paragraph.text)
-            return "\n\n".join(text)
+            return [(1, paragraph.text) for paragraph in doc.paragraphs if paragraph.text.strip()]
         except Exception as e:
             logger.error(f"Error extracting DOCX text: {e}")
             raise
 
+    def extract_pages(self, file_path: str) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        Extract page-segmented text, consulting the text cache first.
+
+        Args:
+            file_path: Path to the document
+
+        Returns:
+            Tuple of ((page_number, text) pairs, whether they came from the cache)
+        """
+        suffix = Path(file_path).suffix.lower()
+        # A PDF that pdfplumber failed on is cached under the pypdf fallback's name
+        extractors = [PDFPLUMBER, PYPDF] if suffix == ".pdf" else [DOCX]
+
+        content_hash = None
+        if self.use_cache:
+            content_hash = hash_file(file_path)
+            for extractor in extractors:
+                cached = self.text_cache.get(content_hash, extractor)
+                if cached:
+                    logger.info(f"Text cache hit for {Path(file_path).name} ({extractor})")
+                    return [(number, text) for number, text in cached["pages"]], True
+
+        started = time.perf_counter()
+        if suffix == ".pdf":
+            pages, extractor = self._extract_pdf_pages(file_path)
+        elif suffix == ".docx":
+            pages, extractor = self.extract_docx_paragraphs(file_path), DOCX
+        else:
+            raise ValueError(f"Unsupported format: {suffix}")
+
+        if self.use_cache:
+            self.text_cache.put(
+                content_hash,
+                extractor,
+                pages,
+                filename=Path(file_path).name,
+                extractSeconds=round(time.perf_counter() - started, 3),
+            )
+        return pages, False
+
     def process_document(self, file_path: str) -> dict:
         """
         Process a document and extract metadata and text.
@@ -121,13 +220,9 @@ class DocumentProcessor:
 
         logger.info(f"Processing document: {file_path_obj.name}")
 
-        # Extract text based on format
-        if suffix == ".pdf":
-            text = self.extract_text_from_pdf(file_path)
-        elif suffix == ".docx":
-            text = self.extract_text_from_docx(file_path)
-        else:
-            raise ValueError(f"Unsupported format: {suffix}")
+        # Extract text based on format, reusing earlier extractions of the same bytes
+        pages, cached = self.extract_pages(file_path)
+        text = "\n\n".join(page_text for _, page_text in pages)
 
         # Calculate basic statistics
         words = text.split()
@@ -139,6 +234,7 @@ class DocumentProcessor:
             "word_count": len(words),
             "char_count": len(text),
             "page_estimate": len(text) // 3000 + 1,  # Rough estimate
+            "cached": cached,
         }
 
         logger.info(f"Extracted {result['word_count']} words from {result['filename']}")
@@ -0,0 +1,192 @@
+"""
+Content-addressed cache of extracted document text.
+Shares its on-disk format and eviction rules with
+ai_services/app/persistence/text_cache.py (built on file_cache.FileCache
+there); the Streamlit app runs without the ai_services package, so the
+logic is mirrored here rather than imported.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("data", "cache", "text")
+
+
+def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file's bytes.
+
+    Args:
+        file_path: Path to the file
+        block_size: Bytes read per step
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """
+    Cache of page-segmented extracted text keyed by file hash and extractor.
+
+    Each entry is a JSON file holding [page_number, text] pairs and
+    extraction metadata. Set TEXT_CACHE_DIR to the AI service's cache
+    directory to share entries with it. Entries older than max_age_days
+    are misses; least recently used entries are evicted above max_mb.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_mb: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+    ):
+        """
+        Initialize the text cache.
+
+        Args:
+            cache_dir: Cache directory (default: TEXT_CACHE_DIR or data/cache/text)
+            max_mb: Size limit in megabytes (default: TEXT_CACHE_MAX_MB or 512)
+            max_age_days: Entry lifetime in days (default: TEXT_CACHE_MAX_AGE_DAYS or 30)
+        """
+        self.cache_dir = cache_dir or os.getenv("TEXT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_mb or os.getenv("TEXT_CACHE_MAX_MB", "512")) * 1024 * 1024
+        self.max_age_seconds = float(max_age_days or os.getenv("TEXT_CACHE_MAX_AGE_DAYS", "30")) * 86400
+        self._lock = threading.Lock()
+        self._approx_bytes = None  # Running size estimate; a full scan only happens when it is exceeded
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, content_hash: str, extractor: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}-{extractor}.json")
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        """Delete a file another process may already have removed; True once it is gone."""
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logger.warning(f"Could not remove cache file {path}: {e}")
+            return False
+
+    def get(self, content_hash: str, extractor: str) -> Optional[dict]:
+        """
+        Look up cached text.
+
+        Args:
+            content_hash: SHA-256 of the file bytes
+            extractor: Name of the extraction method
+
+        Returns:
+            {"pages": [[number, text], ...], "metadata": {...}} or None
+        """
+        path = self._path(content_hash, extractor)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if time.time() - data.get("metadata", {}).get("createdAt", 0) > self.max_age_seconds:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, content_hash: str, extractor: str, pages: List[Tuple[int, str]], **metadata) -> None:
+        """
+        Store extracted pages and evict old entries if needed.
+
+        Args:
+            content_hash: SHA-256 of the file bytes
+            extractor: Name of the extraction method
+            pages: (page_number, text) pairs
+            **metadata: Extra extraction metadata to record
+        """
+        data = {
+            "pages": [[number, text] for number, text in pages],
+            "metadata": dict(
+                metadata,
+                contentHash=content_hash,
+                extractor=extractor,
+                pages=len({number for number, _ in pages}),
+                chars=sum(len(text) for _, text in pages),
+                createdAt=time.time(),
+                cachedAt=datetime.now().isoformat(),
+            ),
+        }
+        path = self._path(content_hash, extractor)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+            over_limit = self._approx_bytes is None or self._approx_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least recently used ones over the size limit.
+
+        put() only calls this when its running size estimate passes the
+        limit, so the directory is not rescanned on every write.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            now = time.time()
+            entries = []
+            total = 0
+            removed = 0
+            for entry in os.scandir(self.cache_dir):
+                if not (entry.is_file() and entry.name.endswith(".json")):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    removed += self._remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            if total > self.max_bytes:
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.max_bytes:
+                        break
+                    if self._remove(path):
+                        removed += 1
+                        total -= size
+
+            self._approx_bytes = total
+
+        if removed:
+            logger.info(f"Evicted {removed} text cache entries")
+        return removed
@@ -1,7 +1,19 @@
 """Common test fixtures and configuration."""
 
+import os
+import sys
+import tempfile
+
 import pytest
 
+# Its config creates data directories on import; keep them out of the checkout
+os.environ.setdefault("DATA_ROOT", tempfile.mkdtemp(prefix="ai-services-tests-"))
+
+# The AI service runs from its own directory and imports itself as `app`. Bind
+# that package now, before the repo root (with the Streamlit app.py) can shadow it.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai_services"))
+import app  # noqa: E402,F401
+
 
 @pytest.fixture
 def sample_text():
@@ -0,0 +1,71 @@
+"""Tests for streaming chunking in the AI service."""
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("sentence_transformers")
+
+from app.core import chunking  # noqa: E402
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word."""
+
+    def __call__(self, texts, add_special_tokens=False, return_attention_mask=False):
+        return {"input_ids": [[0] * len(text.split()) for text in texts]}
+
+
+def make_page(number: int) -> str:
+    sentences = [f"Clause {number}.{i} binds the parties to term {i}." for i in range(1 + number % 4)]
+    return "\n".join(sentences)
+
+
+@pytest.fixture
+def word_splitter(monkeypatch):
+    monkeypatch.setattr(chunking, "STREAM_BUFFER_CHARS", 600)
+    monkeypatch.setattr(chunking, "new_splitter", lambda: chunking.TokenTextSplitter(
+        chunking.TokenLengthCounter(WordTokenizer()),
+        chunk_size=40,
+        chunk_overlap=8,
+        separators=chunking.SEPARATORS,
+    ))
+
+
+def test_iter_chunks_offsets_slice_back_to_chunk_text(word_splitter):
+    """Test that offsets and pages of streamed chunks point at their source text."""
+    # Page 11 has no text layer (e.g. a scanned image)
+    pages = [(number, "" if number == 11 else make_page(number)) for number in range(1, 41)]
+    document = chunking.PAGE_SEPARATOR.join(text for _, text in pages)
+
+    page_starts = []
+    offset = 0
+    for number, text in pages:
+        page_starts.append((offset, number))
+        offset += len(text) + len(chunking.PAGE_SEPARATOR)
+
+    def page_at(position):
+        return [number for start, number in page_starts if start <= position][-1]
+
+    chunks = list(chunking.iter_chunks(iter(pages)))
+
+    assert len(chunks) > 5
+    for chunk in chunks:
+        assert document[chunk.start:chunk.end] == chunk.text
+        assert chunk.page_start == page_at(chunk.start)
+        assert chunk.page_end == page_at(chunk.end - 1)
+    assert any(chunk.page_start != chunk.page_end for chunk in chunks)
+    assert chunks[-1].end == len(document)
+
+
+def test_chunker_tokenizer_is_a_private_copy(monkeypatch):
+    """Test that chunking never calls the tokenizer that embedding uses."""
+    class Model:
+        tokenizer = WordTokenizer()
+        max_seq_length = 5
+
+    monkeypatch.setattr(chunking, "get_embedding_model", lambda: Model)
+    monkeypatch.setattr(chunking, "_tokenizer", None)
+
+    assert chunking.get_tokenizer() is not Model.tokenizer
+    assert chunking.get_tokenizer() is chunking.get_tokenizer()
+    assert chunking.count_truncated(["one two three", "one two three four five six"]) == 1
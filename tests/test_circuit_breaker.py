@@ -0,0 +1,124 @@
+"""Tests for the scrapers' circuit breaker state machine."""
+
+import pytest
+
+from app.scraping import circuit_breaker
+from app.scraping.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    """Stands in for the time module with settable monotonic() and time()."""
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+def fail(breaker: CircuitBreaker, times: int = 1):
+    for _ in range(times):
+        allowed, probe = breaker.allow()
+        assert allowed
+        breaker.release(False, probe)
+
+
+def trip(breaker: CircuitBreaker, clock: Clock):
+    """Open the breaker and wait out its cooldown."""
+    fail(breaker, breaker.failure_threshold)
+    clock.now += breaker.reset_seconds
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    """Test closed -> open only once the threshold is reached without a success in between."""
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30, probes=1)
+
+    fail(breaker, 2)
+    breaker.release(True, breaker.allow()[1])  # A success resets the count
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.allow() == (False, False)
+    assert breaker.stats()["trips"] == 1
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_opens_after_cooldown(clock):
+    """Test open -> half-open once reset_seconds have passed, not before."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30, probes=1)
+    fail(breaker, 2)
+
+    clock.now += 29
+    assert breaker.allow() == (False, False)
+    assert breaker.state == OPEN
+
+    clock.now += 1
+    assert breaker.allow() == (True, True)
+    assert breaker.state == HALF_OPEN
+
+
+def test_only_one_probe_at_a_time(clock):
+    """Test that a half-open breaker admits a single probe until it reports back."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30, probes=1)
+    trip(breaker, clock)
+
+    assert breaker.allow() == (True, True)
+    assert breaker.allow() == (False, False)
+    assert breaker.allow() == (False, False)
+
+    breaker.release(None, True)  # An abandoned probe frees its slot without deciding
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() == (True, True)
+
+
+def test_probe_success_closes(clock):
+    """Test half-open -> closed on a successful probe."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30, probes=1)
+    trip(breaker, clock)
+
+    allowed, probe = breaker.allow()
+    breaker.release(True, probe)
+
+    assert breaker.state == CLOSED
+    assert breaker.allow() == (True, False)
+    assert breaker.stats()["consecutiveFailures"] == 0
+
+
+def test_probe_failure_reopens(clock):
+    """Test half-open -> open on a failed probe, with a fresh cooldown."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30, probes=1)
+    trip(breaker, clock)
+
+    allowed, probe = breaker.allow()
+    breaker.release(False, probe)
+
+    assert breaker.state == OPEN
+    assert breaker.stats()["trips"] == 2
+    clock.now += 29
+    assert breaker.allow() == (False, False)
+    clock.now += 1
+    assert breaker.allow() == (True, True)
+
+
+def test_late_non_probe_result_does_not_decide_half_open(clock):
+    """Test that a request let through while closed cannot close a half-open breaker."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=30, probes=1)
+    allowed, straggler_probe = breaker.allow()  # Allowed while closed, finishes late
+    trip(breaker, clock)
+    assert breaker.allow() == (True, True)
+
+    breaker.release(True, straggler_probe)
+
+    assert breaker.state == HALF_OPEN
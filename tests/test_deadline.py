@@ -0,0 +1,48 @@
+"""Tests for per-request deadlines."""
+
+import asyncio
+
+import pytest
+
+from app.core.deadline import Deadline, DeadlineExceeded
+
+
+def test_check_raises_when_budget_is_spent():
+    """Test that a required stage cannot start without budget."""
+    deadline = Deadline(0)
+
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("llm")
+
+
+def test_allows_records_degraded_stage():
+    """Test that an optional stage that does not fit is recorded as degraded."""
+    deadline = Deadline(1)
+
+    assert deadline.allows("scrape", 0.5) is True
+    assert deadline.allows("scrape", 5) is False
+    assert deadline.degraded == ["scrape"]
+
+
+def test_within_returns_result_inside_budget():
+    """Test that a stage finishing in time returns its result."""
+    deadline = Deadline(5)
+
+    assert asyncio.run(deadline.within("llm", asyncio.sleep(0.01, result="answer"))) == "answer"
+
+
+def test_within_cancels_stage_at_deadline():
+    """Test that a stage outliving the budget is cancelled with DeadlineExceeded."""
+    deadline = Deadline(0.05)
+    cancelled = []
+
+    async def slow_llm():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(DeadlineExceeded, match="llm"):
+        asyncio.run(deadline.within("llm", slow_llm()))
+    assert cancelled == [True]
@@ -0,0 +1,115 @@
+"""Tests for ingest-time boilerplate stripping and near-duplicate detection."""
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.core import dedup  # noqa: E402
+from app.core.chunking import Chunk  # noqa: E402
+from app.core.structure import StructureIndex  # noqa: E402
+
+
+PAGE_BODY = "The appellant was convicted under Section 302 and the High Court confirmed the sentence."
+
+WITNESSES = ["Asha", "Bala", "Chitra", "Dev", "Esha", "Farid", "Gita", "Hari", "Indu", "Jai"]
+
+
+def make_page(number: int) -> str:
+    """A page with a running header, a distinct body and a page-number footer."""
+    return (
+        "IN THE SUPREME COURT OF INDIA\nCivil Appeal No. 1234 of 2019\n"
+        f"{PAGE_BODY} Witness {WITNESSES[number - 1]} was examined.\nPage {number} of 10"
+    )
+
+
+def test_near_duplicate_filter_finds_every_signature_within_max_distance(monkeypatch):
+    """Test that banding never misses a signature within DEDUP_MAX_HAMMING bits."""
+    monkeypatch.setattr(dedup, "simhash", lambda text: int(text))
+    rng = random.Random(42)
+
+    for _ in range(500):
+        near_duplicates = dedup.NearDuplicateFilter(max_distance=3)
+        original = rng.getrandbits(64)
+        assert near_duplicates.check(0, str(original)) is None
+
+        flipped = original
+        for bit in rng.sample(range(64), rng.randint(0, 3)):
+            flipped ^= 1 << bit
+        assert near_duplicates.check(1, str(flipped)) == 0
+
+
+def test_near_duplicate_filter_keeps_distant_signatures(monkeypatch):
+    """Test that signatures further apart than the limit are both kept."""
+    monkeypatch.setattr(dedup, "simhash", lambda text: int(text))
+    near_duplicates = dedup.NearDuplicateFilter(max_distance=3)
+
+    original = 0
+    distant = 0b1111  # 4 bits apart, all in the lowest band
+    assert near_duplicates.check(0, str(original)) is None
+    assert near_duplicates.check(1, str(distant)) is None
+
+
+def test_identical_text_is_a_near_duplicate():
+    """Test detection with real SimHash signatures."""
+    near_duplicates = dedup.NearDuplicateFilter()
+    text = " ".join([PAGE_BODY] * 3)
+
+    assert near_duplicates.check(0, text) is None
+    assert near_duplicates.check(1, text) == 0
+    assert near_duplicates.check(2, "too short to sign") is None
+
+
+def test_blank_preserves_offsets():
+    """Test that blanked furniture keeps the text length and body offsets."""
+    pages = [(number, make_page(number)) for number in range(1, 6)]
+    furniture = dedup._learn_furniture(pages)
+    text = pages[2][1]
+
+    cleaned, lines, chars = dedup._blank(text, furniture)
+
+    assert len(cleaned) == len(text)
+    assert lines == 3
+    assert "SUPREME COURT" not in cleaned
+    assert "Page 3 of 10" not in cleaned
+    body_start = text.index(PAGE_BODY)
+    assert cleaned[body_start:body_start + len(PAGE_BODY)] == PAGE_BODY
+    assert [i for i, c in enumerate(cleaned) if c == "\n"] == [i for i, c in enumerate(text) if c == "\n"]
+    assert chars == len("IN THE SUPREME COURT OF INDIA") + len("Civil Appeal No. 1234 of 2019") + len("Page 3 of 10")
+
+
+def test_strip_furniture_keeps_page_lengths():
+    """Test that stripping streams every page back with its original length."""
+    pages = [(number, make_page(number)) for number in range(1, 11)]
+    stats = {}
+
+    cleaned = list(dedup.strip_furniture(iter(pages), stats))
+
+    assert [number for number, _ in cleaned] == list(range(1, 11))
+    assert [len(text) for _, text in cleaned] == [len(text) for _, text in pages]
+    assert stats["boilerplate_lines"] == 30
+    assert all(PAGE_BODY in text for _, text in cleaned)
+
+
+def test_dropped_duplicates_keep_their_structure(monkeypatch):
+    """Test that headings and references in a dropped chunk resolve to the chunk kept for it."""
+    # Every chunk whose text mentions "Schedule" has the same signature
+    monkeypatch.setattr(dedup, "simhash", lambda text: 1 if "Schedule" in text else hash(text) & (2 ** 64 - 1))
+    chunks = [
+        Chunk("Schedule I - Fees\nThe fees are payable monthly.", 0, 45, 1, 1),
+        Chunk("Section 5 - Notices\nNotices must be in writing.", 47, 95, 2, 2),
+        Chunk("Schedule II - Fees\nThe fees are payable monthly under Section 5.", 97, 160, 3, 3),
+    ]
+    duplicates = []
+    structure = StructureIndex()
+
+    kept = list(dedup.drop_near_duplicates(iter(chunks), duplicates, structure))
+    for chunk_id, chunk in enumerate(kept):
+        structure.add(chunk_id, chunk.text)
+
+    assert [chunk.text for chunk in kept] == [chunks[0].text, chunks[1].text]
+    assert duplicates == [[97, 160, 3, 3, 0]]
+    assert structure.lookup("schedule:ii") == [0]
+    assert structure.lookup("section:5") == [1]
+    assert StructureIndex.from_dict(structure.to_dict()).lookup("schedule:i") == [0]
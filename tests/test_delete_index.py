@@ -0,0 +1,61 @@
+"""Tests for deleting content-addressed document indexes in the AI service."""
+
+import os
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("PyPDF2")
+pytest.importorskip("docx")
+pytest.importorskip("starlette")
+
+from app.api import ingest  # noqa: E402
+from app.core.config import config  # noqa: E402
+from app.persistence.document_registry import document_registry  # noqa: E402
+from app.persistence.faiss_store import faiss_store  # noqa: E402
+
+
+@pytest.fixture
+def indexes(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "VECTOR_INDEXES", str(tmp_path))
+    return tmp_path
+
+
+def make_content_index(content_id: str):
+    """A stand-in for a built content index, registered under its own hash."""
+    index_dir = os.path.dirname(faiss_store.content_index_path(content_id))
+    os.makedirs(index_dir)
+    open(os.path.join(index_dir, "index.faiss"), "w").close()
+    document_registry.register(content_id, content_id, f"text-{content_id}", chunks=1)
+
+
+def test_shared_index_is_kept_until_the_last_reference_goes(indexes):
+    """Test that deleting one of two duplicates keeps the shared index."""
+    make_content_index("aaa")
+    faiss_store.write_ref("doc-1", "aaa")
+    faiss_store.write_ref("doc-2", "aaa")
+
+    assert ingest.delete_index("doc-1") is True
+    assert not os.path.exists(indexes / "doc-1")
+    assert os.path.exists(faiss_store.content_index_path("aaa"))
+    assert document_registry.find(bytes_hash="aaa") == "aaa"
+
+    assert ingest.delete_index("doc-2") is True
+    assert not os.path.exists(indexes / "_content" / "aaa")
+    assert document_registry.find(bytes_hash="aaa") is None
+    assert document_registry.find(text_hash="text-aaa") is None
+
+
+def test_unknown_document_is_not_deleted(indexes):
+    """Test that a document without an index reports nothing deleted."""
+    make_content_index("bbb")
+
+    assert ingest.delete_index("missing") is False
+    assert os.path.exists(faiss_store.content_index_path("bbb"))
+
+
+@pytest.mark.parametrize("document_id", ["", "..", "_content", "a/b"])
+def test_rejects_paths_outside_a_document(indexes, document_id):
+    """Test that only plain document ids are accepted."""
+    with pytest.raises(ValueError):
+        ingest.delete_index(document_id)
@@ -0,0 +1,47 @@
+"""Tests for the AI service's shared embedding model."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from app.core import embeddings  # noqa: E402
+
+
+class RecordingModel:
+    """Stands in for SentenceTransformer and records overlapping encode calls."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def encode(self, texts, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return [[float(len(text))] for text in texts]
+
+
+def test_encode_calls_never_overlap(monkeypatch):
+    """Test that ingest, query and compression encodes share one lock."""
+    model = RecordingModel()
+    monkeypatch.setattr(embeddings, "_embedding_model", model)
+    callers = [
+        lambda: embeddings.encode(["chunk one", "chunk two"], batch_size=16),
+        lambda: embeddings.encode(["query"]),
+        lambda: embeddings.encode(["a sentence"], batch_size=64, normalize_embeddings=True),
+    ] * 4
+
+    threads = [threading.Thread(target=caller) for caller in callers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert model.max_active == 1
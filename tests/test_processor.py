@@ -50,3 +50,81 @@ def test_preprocess_text():
     text_with_null = "Hello\x00World"
     cleaned = processor.preprocess_text(text_with_null)
     assert "\x00" not in cleaned
+
+
+def test_text_cache_roundtrip(tmp_path):
+    """Test storing and loading page-segmented text."""
+    from processor.text_cache import TextCache
+
+    cache = TextCache(cache_dir=str(tmp_path))
+    cache.put("abc123", "pdfplumber", [(1, "First page"), (2, "Second page")], filename="a.pdf")
+
+    entry = cache.get("abc123", "pdfplumber")
+    assert entry["pages"] == [[1, "First page"], [2, "Second page"]]
+    assert entry["metadata"]["pages"] == 2
+    assert entry["metadata"]["filename"] == "a.pdf"
+    assert cache.get("abc123", "docx-nonempty") is None
+
+
+def test_text_cache_expires_old_entries(tmp_path):
+    """Test that entries past their age limit are misses."""
+    from processor.text_cache import TextCache
+
+    cache = TextCache(cache_dir=str(tmp_path), max_age_days=1)
+    cache.put("abc123", "pdfplumber", [(1, "text")])
+
+    cache.max_age_seconds = -1
+    assert cache.get("abc123", "pdfplumber") is None
+
+
+def test_text_cache_evicts_over_size_limit(tmp_path):
+    """Test least recently used eviction once the cache exceeds its size."""
+    from processor.text_cache import TextCache
+
+    cache = TextCache(cache_dir=str(tmp_path))
+    cache.max_bytes = 3000
+    for i in range(5):
+        cache.put(f"hash{i}", "pdfplumber", [(1, "x" * 1000)])
+
+    remaining = [i for i in range(5) if cache.get(f"hash{i}", "pdfplumber")]
+    assert 0 < len(remaining) < 5
+    assert 4 in remaining
+
+
+def test_process_document_uses_text_cache(tmp_path, monkeypatch):
+    """Test that a second extraction of the same file is served from the cache."""
+    from docx import Document
+    from processor.text_cache import TextCache
+
+    path = tmp_path / "contract.docx"
+    doc = Document()
+    doc.add_paragraph("Article 1: Introduction")
+    doc.add_paragraph("Article 2: Terms and Conditions")
+    doc.save(str(path))
+
+    processor = DocumentProcessor(text_cache=TextCache(cache_dir=str(tmp_path / "cache")))
+    first = processor.process_document(str(path))
+    assert first["cached"] is False
+
+    def fail(*args, **kwargs):
+        raise AssertionError("document was parsed again")
+
+    monkeypatch.setattr(processor, "extract_docx_paragraphs", fail)
+    second = processor.process_document(str(path))
+    assert second["cached"] is True
+    assert second["text"] == first["text"]
+
+
+def test_extractor_keys_differ_from_ai_service():
+    """Test that text cache keys never collide with the AI service's.
+
+    The processor drops empty pages and paragraphs while the AI service
+    keeps them, so sharing a key would serve one the other's page layout.
+    """
+    from processor.document_processor import PDFPLUMBER, PYPDF, DOCX
+
+    for module in ("PyPDF2", "docx", "faiss", "starlette"):
+        pytest.importorskip(module)
+    from app.api.ingest import EXTRACTORS
+
+    assert not {PDFPLUMBER, PYPDF, DOCX} & set(EXTRACTORS.values())
@@ -0,0 +1,45 @@
+"""Tests for the AI service RAG chain helpers."""
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from app.core.config import config  # noqa: E402
+from app.pipelines import rag_chain  # noqa: E402
+
+
+def make_results(distances):
+    """Search results shaped like faiss_store.search output."""
+    return [(i, f"chunk {i}", distance) for i, distance in enumerate(distances)]
+
+
+@pytest.mark.parametrize("distances, expected", [
+    # Flat curve: no gap reaches RAG_ELBOW_MIN_GAP, every relevant chunk is kept
+    ([0.50, 0.52, 0.54, 0.56, 0.58, 0.60, 0.62], 7),
+    # Sharp elbow after the fourth chunk
+    ([0.30, 0.32, 0.35, 0.37, 0.90, 0.92, 0.95], 4),
+    # Elbow before min_k is ignored; the cut falls at the next significant gap
+    ([0.10, 0.60, 0.62, 0.64, 0.66, 1.00, 1.02], 5),
+    # Everything above the relevance threshold
+    ([1.40, 1.50, 1.60, 1.70], 0),
+    # Fewer relevant chunks than min_k are returned as they are
+    ([0.40, 0.45, 1.50, 1.60], 2),
+])
+def test_select_adaptive_k(monkeypatch, distances, expected):
+    """Test the cut-off on flat, elbowed and irrelevant distance curves."""
+    monkeypatch.setattr(config, "RAG_RELEVANCE_THRESHOLD", 1.3)
+    monkeypatch.setattr(config, "RAG_ELBOW_MIN_GAP", 0.08)
+    results = make_results(distances)
+
+    selected = rag_chain._select_adaptive_k(results, min_k=3, max_k=20)
+
+    assert selected == results[:expected]
+
+
+def test_select_adaptive_k_respects_max_k(monkeypatch):
+    """Test that no more than max_k chunks are considered."""
+    monkeypatch.setattr(config, "RAG_RELEVANCE_THRESHOLD", 1.3)
+    monkeypatch.setattr(config, "RAG_ELBOW_MIN_GAP", 0.08)
+    results = make_results([0.5 + 0.01 * i for i in range(30)])
+
+    assert rag_chain._select_adaptive_k(results, min_k=3, max_k=10) == results[:10]
@@ -0,0 +1,102 @@
+"""Tests for the SQLite scrape cache."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import config
+from app.persistence import scrape_cache as scrape_cache_module
+from app.persistence.scrape_cache import ScrapeCache
+
+HOUR = 3600
+
+
+class Clock:
+    """Stands in for the time module with a settable time()."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scrape_cache_module, "time", clock)
+    monkeypatch.setattr(config, "SCRAPE_CACHE_TTL_HOURS", 1)
+    monkeypatch.setattr(config, "SCRAPE_NEGATIVE_TTL_HOURS", 0.25)
+    monkeypatch.setattr(config, "SCRAPE_CACHE_STALE_HOURS", 2)
+    return clock
+
+
+def count_rows(cache: ScrapeCache) -> int:
+    return cache._conn.execute("SELECT COUNT(*) FROM scrapes").fetchone()[0]
+
+
+def test_entries_go_stale_then_expire(tmp_path, clock):
+    """Test fresh, stale and expired lookups against the TTLs."""
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.db"))
+    cache.put("tldrlegal", "MIT License", "Permissive licence")
+
+    clock.now += 0.5 * HOUR
+    entry = cache.get("tldrlegal", "mit   license")
+    assert entry.content == "Permissive licence" and not entry.stale
+
+    clock.now += 1 * HOUR
+    assert cache.get("tldrlegal", "MIT License").stale
+
+    clock.now += 2 * HOUR
+    assert cache.get("tldrlegal", "MIT License") is None
+
+
+def test_not_found_results_expire_sooner(tmp_path, clock):
+    """Test that a cached "not found" uses the negative TTL."""
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.db"))
+    cache.put("indiankanoon", "Section 999 IPC", None)
+
+    clock.now += 0.5 * HOUR
+    entry = cache.get("indiankanoon", "Section 999 IPC")
+    assert entry.content is None and entry.stale
+
+
+def test_fetch_serves_stale_and_refreshes(tmp_path, clock):
+    """Test that a stale hit is returned at once and refreshed in the background."""
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.db"))
+    cache.put("tldrlegal", "GPL", "old text")
+    clock.now += 1.5 * HOUR
+    calls = []
+
+    async def loader():
+        calls.append(True)
+        return "new text"
+
+    async def scenario():
+        first = await cache.fetch("tldrlegal", "GPL", loader)
+        await asyncio.gather(*cache._tasks)
+        return first, await cache.fetch("tldrlegal", "GPL", loader)
+
+    assert asyncio.run(scenario()) == ("old text", "new text")
+    assert calls == [True]
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_puts_trim_every_n_inserts(tmp_path, clock, monkeypatch):
+    """Test that expired and surplus rows are removed on every TRIM_EVERY_PUTS-th insert."""
+    monkeypatch.setattr(scrape_cache_module, "TRIM_EVERY_PUTS", 5)
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.db"), max_entries=3)
+
+    cache.put("tldrlegal", "expired", "text")  # First put trims (an empty table)
+    clock.now += 4 * HOUR  # Past its stale window
+    for i in range(4):
+        clock.now += 1
+        cache.put("tldrlegal", f"term {i}", "text")
+    assert count_rows(cache) == 5  # No trim between
+
+    clock.now += 1
+    cache.put("tldrlegal", "term 4", "text")  # Sixth put trims
+
+    assert count_rows(cache) == 3
+    assert cache.get("tldrlegal", "expired") is None
+    assert [cache.get("tldrlegal", f"term {i}") is not None for i in range(5)] == [False, False, True, True, True]
@@ -0,0 +1,125 @@
+"""Tests for the scrapers' pooled HTTP client against a local server."""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.scraping.circuit_breaker import ProviderUnavailable
+from app.scraping.http_client import ScrapeHTTPClient
+from app.scraping.rate_limiter import HostRateLimiter
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Keep-alive handler: /ok answers 200, /missing 404, /error 503."""
+
+    protocol_version = "HTTP/1.1"
+    statuses = {"/ok": 200, "/missing": 404, "/error": 503}
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.opened += 1
+
+    def finish(self):
+        super().finish()
+        with self.server.lock:
+            self.server.closed += 1
+
+    def do_GET(self):
+        body = self.path.encode()
+        self.send_response(self.statuses.get(self.path, 404))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.opened = httpd.closed = 0
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(tmp_path):
+    limiter = HostRateLimiter(rate=1000, burst=1000, state_dir=str(tmp_path))
+    return ScrapeHTTPClient(max_connections=4, per_host=4, http2=False, timeout=5, rate_limiter=limiter)
+
+
+def url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def wait_for(condition, seconds: float = 2.0) -> bool:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_sequential_requests_reuse_one_connection(server, client):
+    """Test that the pool keeps the connection alive between requests."""
+    async def fetch():
+        bodies = [(await client.get(url(server, "/ok"))).text for _ in range(5)]
+        await client.aclose()
+        return bodies
+
+    assert asyncio.run(fetch()) == ["/ok"] * 5
+    assert server.opened == 1
+
+
+def test_client_error_returns_none(server, client):
+    """Test that a 404 is an answer, not a provider failure."""
+    async def fetch():
+        try:
+            return await client.get(url(server, "/missing"))
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(fetch()) is None
+
+
+def test_server_error_raises_after_retries(server, client):
+    """Test that exhausted retries on 5xx raise ProviderUnavailable."""
+    async def fetch():
+        try:
+            return await client.get(url(server, "/error"), max_retries=1)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(ProviderUnavailable):
+        asyncio.run(fetch())
+
+
+def test_client_from_previous_loop_is_closed(server, client):
+    """Test that switching event loops closes the replaced client and its connections."""
+    async def fetch():
+        await client.get(url(server, "/ok"))
+        return client._client
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+
+    assert first is not second
+    assert first.is_closed
+    assert not second.is_closed
+    assert wait_for(lambda: server.closed >= 1)
+    assert server.opened == 2
+
+    asyncio.run(client.aclose())
+    assert second.is_closed
+    assert wait_for(lambda: server.closed == 2)
@@ -0,0 +1,68 @@
+"""Tests for structural reference detection in the AI service."""
+
+import pytest
+
+from app.core.structure import StructureIndex, find_references
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Is Section 498A bailable?", ["section:498a"]),
+    ("See cl. 14.2 of the agreement", ["clause:14.2"]),
+    ("convicted under s. 302 IPC", ["section:302"]),
+    ("as listed in Schedule II", ["schedule:ii"]),
+    ("Compare Sections 3 and 4", ["section:3", "section:4"]),
+    ("Articles 14, 19 and 21 of the Constitution", ["article:14", "article:19", "article:21"]),
+    ("ss. 302 and 304B", ["section:302", "section:304b"]),
+    ("Schedules I and II", ["schedule:i", "schedule:ii"]),
+    ("Section 3 and Article 4", ["section:3", "article:4"]),
+    ("Section 5, I think, applies; section 5 again", ["section:5"]),
+    ("Mr. Rao said s. I was wrong", []),
+])
+def test_find_references(text, expected):
+    """Test singular, abbreviated, plural and listed references."""
+    assert find_references(text) == expected
+
+
+def test_lookup_prefers_definitions_over_mentions():
+    """Test that a heading chunk wins over chunks that only cite it."""
+    index = StructureIndex()
+    index.add(0, "The accused relied on Section 14 and Sections 15 and 16.")
+    index.add(1, "Section 14 - Termination\nEither party may terminate on notice.")
+    index.add(2, "Notice under Section 14 must be in writing.")
+
+    assert index.lookup("section:14") == [1]
+    assert index.lookup("section:15") == [0]
+    assert index.lookup("section:16") == [0]
+
+
+def test_lookup_falls_back_to_numbered_headings():
+    """Test that "14.2 Termination" answers a clause 14.2 query."""
+    index = StructureIndex()
+    index.add(0, "The notice cites clause 14.2 of the contract.")
+    index.add(3, "14.2 Termination for convenience\nThe buyer may terminate.")
+
+    assert index.lookup("clause:14.2") == [3]
+    assert index.lookup("schedule:14.2") == []  # Schedules are not numbered headings
+
+
+def test_lookup_caps_mentions():
+    """Test that mentions are capped and can be switched off."""
+    index = StructureIndex()
+    for chunk_id in range(8):
+        index.add(chunk_id, f"As held under Article 21 in case {chunk_id}.")
+
+    assert index.lookup("article:21", max_mentions=3) == [0, 1, 2]
+    assert index.lookup("article:21", max_mentions=0) == []
+    assert index.lookup("article:99") == []
+
+
+def test_round_trips_through_dict():
+    """Test that a saved index answers lookups like the original."""
+    index = StructureIndex()
+    index.add(0, "Article 21 - Protection of life\nNo person shall be deprived.")
+    index.add(1, "Under Articles 14 and 21 the court held.")
+
+    restored = StructureIndex.from_dict(index.to_dict())
+
+    assert restored.lookup("article:21") == [0]
+    assert restored.lookup("article:14") == [1]
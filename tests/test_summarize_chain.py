@@ -0,0 +1,74 @@
+"""Tests for map-reduce chunking in the AI service summarizer."""
+
+import pytest
+
+pytest.importorskip("transformers")
+pytest.importorskip("langchain")
+
+from app.pipelines import summarize_chain  # noqa: E402
+
+
+class WordTokenizer:
+    """One token per word, plus an end-of-sequence token like T5."""
+
+    def __call__(self, texts, add_special_tokens=True, return_attention_mask=False):
+        return {"input_ids": [[0] * (len(text.split()) + 1) for text in texts]}
+
+
+WORDS = ["appeal", "court", "contract", "party", "notice", "term", "clause", "breach", "damages", "licence"]
+
+
+def make_paragraph(number: int) -> str:
+    """A short paragraph of 12-30 words that differs from every other one."""
+    words = [WORDS[(number * 7 + i) % len(WORDS)] for i in range(12 + number % 19)]
+    return f"Paragraph {number}: " + " ".join(words) + "."
+
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    monkeypatch.setattr(summarize_chain, "get_summarizer_tokenizer", lambda: WordTokenizer())
+
+
+def test_split_for_window_fits_window(word_tokenizer):
+    """Test that every chunk fits the window and no text is lost."""
+    paragraphs = [make_paragraph(n) for n in range(80)]
+
+    chunks = summarize_chain._split_for_window("\n\n".join(paragraphs), max_tokens=100)
+
+    assert all(summarize_chain._count_tokens([chunk])[0] <= 100 for chunk in chunks)
+    assert "\n\n".join(chunks) == "\n\n".join(paragraphs)
+
+
+def test_editing_one_paragraph_changes_only_its_chunk(word_tokenizer):
+    """Test that a one-paragraph edit invalidates only that chunk's partial summary."""
+    paragraphs = [make_paragraph(n) for n in range(80)]
+    edited_at = 40
+    original = paragraphs[edited_at]
+    tokens = summarize_chain._count_tokens([original])[0]
+    anchor = summarize_chain._is_anchor(original, tokens, 50)
+
+    # Same length and the same boundary decision, so only the paragraph's content changes
+    edited = next(
+        candidate
+        for candidate in (original.replace("Paragraph", f"Amended{i}") for i in range(1000))
+        if summarize_chain._is_anchor(candidate, tokens, 50) == anchor
+    )
+    before = summarize_chain._split_for_window("\n\n".join(paragraphs), max_tokens=100)
+    paragraphs[edited_at] = edited
+    after = summarize_chain._split_for_window("\n\n".join(paragraphs), max_tokens=100)
+
+    removed = [chunk for chunk in before if chunk not in after]
+    added = [chunk for chunk in after if chunk not in before]
+    assert len(before) > 5
+    assert len(removed) == 1 and original in removed[0]
+    assert len(added) == 1 and edited in added[0]
+    assert removed[0].replace(original, edited) == added[0]
+
+
+def test_page_breaks_are_boundaries(word_tokenizer):
+    """Test that chunks never span a form feed."""
+    text = "\f".join(make_paragraph(n) for n in range(30))
+
+    chunks = summarize_chain._split_for_window(text, max_tokens=100)
+
+    assert all("\f" not in chunk for chunk in chunks)
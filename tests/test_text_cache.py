@@ -0,0 +1,37 @@
+"""Tests for the AI service's extracted-text cache."""
+
+import os
+
+from app.persistence.text_cache import TextCache
+
+
+def test_writer_streams_pages_into_a_readable_entry(tmp_path):
+    """Test that a streamed entry reads back like one stored with put()."""
+    cache = TextCache(cache_dir=str(tmp_path), max_bytes=1024 * 1024, max_age_seconds=3600)
+    pages = [(1, "First page"), (2, ""), (3, 'Quotes " and\nnewlines')]
+
+    writer = cache.open_writer("abc", "pypdf2")
+    for number, text in pages:
+        writer.add(number, text)
+    assert cache.get("abc", "pypdf2") is None  # Not visible until closed
+    writer.close(filename="doc.pdf")
+
+    streamed = cache.get("abc", "pypdf2")
+    cache.put("def", "pypdf2", pages, filename="doc.pdf")
+    stored = cache.get("def", "pypdf2")
+    assert streamed["pages"] == stored["pages"] == [list(page) for page in pages]
+    assert streamed["metadata"]["pages"] == 3
+    assert streamed["metadata"]["chars"] == stored["metadata"]["chars"]
+    assert streamed["metadata"]["filename"] == "doc.pdf"
+
+
+def test_aborted_writer_leaves_nothing_behind(tmp_path):
+    """Test that an interrupted extraction is not cached."""
+    cache = TextCache(cache_dir=str(tmp_path), max_bytes=1024 * 1024, max_age_seconds=3600)
+
+    writer = cache.open_writer("abc", "pypdf2")
+    writer.add(1, "First page")
+    writer.abort()
+
+    assert cache.get("abc", "pypdf2") is None
+    assert os.listdir(tmp_path) == []